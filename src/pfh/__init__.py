@@ -1,5 +1,37 @@
-from pfh import composites, containment, landsat, spectral, utils
+from pfh import (
+    accuracy,
+    cache,
+    composites,
+    containment,
+    geotiff,
+    landsat,
+    profiling,
+    regions,
+    sampling,
+    snic,
+    spatial,
+    spectral,
+    store,
+    tasks,
+    utils,
+)
 
 __version__ = "0.1.0"
 
-__all__ = ["composites", "containment", "landsat", "spectral", "utils"]
+__all__ = [
+    "accuracy",
+    "cache",
+    "composites",
+    "containment",
+    "geotiff",
+    "landsat",
+    "profiling",
+    "regions",
+    "sampling",
+    "snic",
+    "spatial",
+    "spectral",
+    "store",
+    "tasks",
+    "utils",
+]
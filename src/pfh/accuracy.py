@@ -0,0 +1,336 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def bootstrap_indices(
+    groups: np.ndarray, n_resamples: int, *, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """Draw every bootstrap resample of a set of samples at once, resampling with
+    replacement within each group so that group sizes are preserved.
+
+    Parameters
+    ----------
+    groups : np.ndarray
+        The integer group of each sample, e.g. a combined stratum code.
+    n_resamples : int
+        The number of resamples to draw.
+    rng : np.random.Generator, optional
+        The random number generator.
+
+    Returns
+    -------
+    np.ndarray
+        The indexes of the samples in each resample, with shape (n_resamples, n).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    groups = np.asarray(groups).reshape(-1)
+    order = np.argsort(groups, kind="stable")
+    _, starts, sizes = np.unique(groups[order], return_index=True, return_counts=True)
+
+    # Each position draws a random sample from the group at that position
+    group_start = np.repeat(starts, sizes)
+    group_size = np.repeat(sizes, sizes)
+    offsets = (rng.random((n_resamples, len(groups))) * group_size).astype(np.int64)
+    return order[group_start + offsets]
+
+
+def compute_confusion_matrices(
+    reference: np.ndarray,
+    mapped: np.ndarray,
+    *,
+    strata: list[np.ndarray] | None = None,
+    n_strata: list[int] | None = None,
+    n_classes: int = 2,
+    indices: np.ndarray | None = None,
+) -> np.ndarray:
+    """Count the confusion matrices of every stratum, and optionally of every
+    resample, in a single bincount over combined codes.
+
+    Parameters
+    ----------
+    reference, mapped : np.ndarray
+        The reference (e.g. interpreted) and mapped class of each sample, between 0 and
+        `n_classes`.
+    strata : list[np.ndarray], optional
+        Integer codes for each stratification of the samples, e.g. severity and owner.
+    n_strata : list[int], optional
+        The number of classes in each stratification.
+    n_classes : int, optional
+        The number of reference and mapped classes.
+    indices : np.ndarray, optional
+        Resampled sample indexes with shape (n_resamples, n), e.g. from
+        `bootstrap_indices`.
+
+    Returns
+    -------
+    np.ndarray
+        The confusion matrices, with reference classes in rows and mapped classes in
+        columns, and shape (*n_strata, n_classes, n_classes). If indices are given,
+        there is a leading axis for each resample.
+    """
+    strata = [] if strata is None else [np.asarray(s) for s in strata]
+    shape = [*([] if n_strata is None else n_strata), n_classes, n_classes]
+    classes = [np.asarray(c).astype(np.int64) for c in (reference, mapped)]
+    codes = np.ravel_multi_index([*strata, *classes], shape)
+    size = int(np.prod(shape))
+
+    if indices is None:
+        return np.bincount(codes, minlength=size).reshape(shape)
+
+    # Offset the codes of each resample so every resample is counted in one bincount
+    resampled = codes[indices] + np.arange(len(indices))[:, None] * size
+    counts = np.bincount(resampled.reshape(-1), minlength=len(indices) * size)
+    return counts.reshape(len(indices), *shape)
+
+
+def compute_accuracy_metrics(
+    matrices: np.ndarray, *, positive: int = 1
+) -> dict[str, np.ndarray]:
+    """Calculate the precision and recall of a class, and the overall accuracy, from
+    confusion matrices with shape (..., n_classes, n_classes).
+
+    Metrics with no samples in their denominator are NaN.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    true_positives = matrices[..., positive, positive]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "precision": true_positives / matrices[..., :, positive].sum(axis=-1),
+            "recall": true_positives / matrices[..., positive, :].sum(axis=-1),
+            "overall_accuracy": (
+                np.trace(matrices, axis1=-2, axis2=-1) / matrices.sum(axis=(-2, -1))
+            ),
+        }
+
+
+def compute_adjusted_areas(
+    matrices: np.ndarray, mapped_areas: np.ndarray
+) -> np.ndarray:
+    """Estimate the area of each reference class from the mapped area of each class and
+    an error matrix of samples stratified by mapped class (Olofsson et al., 2014).
+
+    Parameters
+    ----------
+    matrices : np.ndarray
+        Confusion matrices with shape (..., n_classes, n_classes), with reference
+        classes in rows and mapped classes in columns.
+    mapped_areas : np.ndarray
+        The mapped area of each class, with shape (..., n_classes), e.g. from
+        `utils.compute_stratified_areas`.
+
+    Returns
+    -------
+    np.ndarray
+        The estimated area of each reference class, with shape (..., n_classes).
+        Estimates are NaN if a mapped class with area has no samples.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    mapped_areas = np.asarray(mapped_areas, dtype=np.float64)[..., None, :]
+
+    # The proportion of samples of each mapped class in each reference class
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proportions = matrices / matrices.sum(axis=-2, keepdims=True)
+
+    # Mapped classes without area contribute nothing, even without samples
+    areas = np.where(mapped_areas > 0, proportions * mapped_areas, 0)
+    return areas.sum(axis=-1)
+
+
+def bootstrap_interval(
+    samples: np.ndarray, confidence: float = 0.95
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get the percentile confidence interval of bootstrap samples along the first axis,
+    ignoring NaN samples. Intervals are NaN if every sample is NaN.
+    """
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        lower, upper = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    return lower, upper
+
+
+def _drop_missing(plots: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """Drop plots with a missing value in any of the columns, e.g. plots sampled
+    outside of a map, warning with the number of plots dropped.
+    """
+    missing = plots[columns].isna().any(axis=1)
+    if missing.any():
+        warnings.warn(
+            f"Dropped {missing.sum()} of {len(plots)} plots with missing values in "
+            f"{columns}.",
+            stacklevel=3,
+        )
+    return plots[~missing]
+
+
+def _factorize(
+    plots: pd.DataFrame, by: list[str]
+) -> tuple[list[np.ndarray], list[int], pd.Index]:
+    """Get the stratum codes of each plot, the number of classes of each
+    stratification, and an index of every combination of strata.
+    """
+    factorized = [pd.factorize(plots[column], sort=True) for column in by]
+    codes = [c for c, _ in factorized]
+    uniques = [u for _, u in factorized]
+
+    if not by:
+        index = pd.Index(["Overall"])
+    elif len(by) == 1:
+        index = pd.Index(uniques[0], name=by[0])
+    else:
+        index = pd.MultiIndex.from_product(uniques, names=by)
+    return codes, [len(u) for u in uniques], index
+
+
+def bootstrap_accuracy(
+    plots: pd.DataFrame,
+    reference: str,
+    mapped: str,
+    *,
+    by: list[str] | None = None,
+    positive: int = 1,
+    n_classes: int = 2,
+    n_resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Calculate precision, recall, and overall accuracy with bootstrap confidence
+    intervals for every stratum of a set of validation plots.
+
+    All resamples are drawn at once and resampled within each stratum, and the
+    confusion matrices of every resample and stratum are counted in one pass (see
+    `compute_confusion_matrices`).
+
+    Parameters
+    ----------
+    plots : pd.DataFrame
+        The validation plots, e.g. from `sampling.sample_plots`. Plots with a missing
+        class or stratum are dropped with a warning.
+    reference, mapped : str
+        The columns with the reference and mapped class of each plot, between 0 and
+        `n_classes`.
+    by : list[str], optional
+        The columns to stratify by, e.g. severity and owner. If not given, metrics are
+        calculated over all plots.
+    positive : int, optional
+        The class to calculate precision and recall of.
+    n_classes : int, optional
+        The number of reference and mapped classes.
+    n_resamples : int, optional
+        The number of bootstrap resamples.
+    confidence : float, optional
+        The confidence level of the intervals.
+    seed : int, optional
+        The random seed of the resamples.
+
+    Returns
+    -------
+    pd.DataFrame
+        The number of plots `n` and each metric with its `_lower` and `_upper`
+        bounds, indexed by stratum. Strata without plots are dropped.
+    """
+    by = by or []
+    plots = _drop_missing(plots, [reference, mapped, *by])
+    strata, n_strata, index = _factorize(plots, by)
+    groups = (
+        np.ravel_multi_index(strata, n_strata) if strata else np.zeros(len(plots), int)
+    )
+    indices = bootstrap_indices(groups, n_resamples, rng=np.random.default_rng(seed))
+
+    args = plots[reference].to_numpy(), plots[mapped].to_numpy()
+    kwargs = {"strata": strata, "n_strata": n_strata, "n_classes": n_classes}
+    matrices = compute_confusion_matrices(*args, **kwargs)
+    estimates = compute_accuracy_metrics(matrices, positive=positive)
+    samples = compute_accuracy_metrics(
+        compute_confusion_matrices(*args, **kwargs, indices=indices), positive=positive
+    )
+
+    columns = {"n": matrices.sum(axis=(-2, -1)).reshape(-1)}
+    for metric, estimate in estimates.items():
+        lower, upper = bootstrap_interval(samples[metric], confidence)
+        columns[metric] = estimate.reshape(-1)
+        columns[f"{metric}_lower"] = lower.reshape(-1)
+        columns[f"{metric}_upper"] = upper.reshape(-1)
+
+    results = pd.DataFrame(columns, index=index)
+    return results[results["n"] > 0]
+
+
+def bootstrap_adjusted_areas(
+    plots: pd.DataFrame,
+    reference: str,
+    mapped: str,
+    mapped_areas: pd.DataFrame,
+    *,
+    by: list[str] | None = None,
+    n_resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Estimate the area of each reference class in every stratum from validation plots
+    and mapped areas, with bootstrap confidence intervals.
+
+    Plots are resampled within each stratum and mapped class, matching a sample design
+    stratified by mapped class, and the estimates of every resample are calculated in
+    one pass (see `compute_adjusted_areas`).
+
+    Parameters
+    ----------
+    plots : pd.DataFrame
+        The validation plots, e.g. from `sampling.sample_plots`. Plots with a missing
+        class or stratum are dropped with a warning.
+    reference, mapped : str
+        The columns with the reference and mapped class of each plot, between 0 and the
+        number of classes.
+    mapped_areas : pd.DataFrame
+        The mapped area of each class (columns) in each stratum (index), e.g. harvested
+        and unharvested area by severity and owner. The index must contain the values
+        of the `by` columns.
+    by : list[str], optional
+        The columns to stratify by. If not given, `mapped_areas` must have one row.
+    n_resamples : int, optional
+        The number of bootstrap resamples.
+    confidence : float, optional
+        The confidence level of the intervals.
+    seed : int, optional
+        The random seed of the resamples.
+
+    Returns
+    -------
+    pd.DataFrame
+        The estimated area of each reference class with its `_lower` and `_upper`
+        bounds, indexed by stratum. To estimate the total area, call without `by` and
+        with the total mapped area of each class.
+    """
+    by = by or []
+    plots = _drop_missing(plots, [reference, mapped, *by])
+    strata, n_strata, index = _factorize(plots, by)
+    n_classes = mapped_areas.shape[1]
+    if by:
+        mapped_areas = mapped_areas.reindex(index, fill_value=0)
+    areas = mapped_areas.to_numpy().reshape(*n_strata, n_classes)
+
+    mapped_classes = plots[mapped].to_numpy().astype(np.int64)
+    groups = np.ravel_multi_index([*strata, mapped_classes], [*n_strata, n_classes])
+    indices = bootstrap_indices(groups, n_resamples, rng=np.random.default_rng(seed))
+
+    args = plots[reference].to_numpy(), mapped_classes
+    kwargs = {"strata": strata, "n_strata": n_strata, "n_classes": n_classes}
+    estimates = compute_adjusted_areas(
+        compute_confusion_matrices(*args, **kwargs), areas
+    ).reshape(-1, n_classes)
+    samples = compute_adjusted_areas(
+        compute_confusion_matrices(*args, **kwargs, indices=indices), areas
+    ).reshape(n_resamples, -1, n_classes)
+    lower, upper = bootstrap_interval(samples, confidence)
+
+    columns = {}
+    for i, name in enumerate(mapped_areas.columns):
+        columns[name] = estimates[:, i]
+        columns[f"{name}_lower"] = lower[:, i]
+        columns[f"{name}_upper"] = upper[:, i]
+
+    return pd.DataFrame(columns, index=mapped_areas.index if by else index)
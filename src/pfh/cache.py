@@ -0,0 +1,206 @@
+import functools
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import ee
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "pfh"
+
+# Functions that load assets, and the names of their asset ID arguments
+ASSET_LOADERS = {
+    "Image.load": "id",
+    "ImageCollection.load": "id",
+    "Collection.loadTable": "tableId",
+    "FeatureCollection.load": "id",
+}
+
+
+def _find_assets(node: Any) -> set[str]:
+    """Find the IDs of all assets loaded by a serialized expression."""
+    assets = set()
+    if isinstance(node, dict):
+        invocation = node.get("functionInvocationValue", {})
+        argument = ASSET_LOADERS.get(invocation.get("functionName"))
+        if argument is not None:
+            asset_id = invocation["arguments"].get(argument, {}).get("constantValue")
+            if isinstance(asset_id, str):
+                assets.add(asset_id)
+        for value in node.values():
+            assets |= _find_assets(value)
+    elif isinstance(node, list):
+        for value in node:
+            assets |= _find_assets(value)
+    return assets
+
+
+class GetInfoCache:
+    """A persistent, size-limited cache of `getInfo` results.
+
+    Results are stored on disk, keyed by a hash of the serialized computation. Each
+    result records the update time of every asset the computation loads, and is
+    recomputed if any asset has been modified since. Asset update times are only
+    checked once per `asset_ttl`, so hits within that time need no requests to Earth
+    Engine. The least recently used results are evicted once the cache exceeds
+    `max_bytes`.
+
+    Results may be up to `asset_ttl` out of date, so listings that decide which
+    exports to run (e.g. the tiles of an exported collection) should use `getInfo`
+    directly.
+
+    Parameters
+    ----------
+    directory : str | Path, optional
+        The directory to store results in.
+    max_bytes : int, optional
+        The maximum total size of stored results.
+    asset_ttl : float, optional
+        The number of seconds before asset update times are checked again.
+
+    Attributes
+    ----------
+    hits, misses : int
+        The number of results retrieved from the cache and computed, respectively.
+    seconds_saved : float
+        The total time it originally took to compute each retrieved result.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = 2**27,
+        asset_ttl: float = 86_400,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.asset_ttl = asset_ttl
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+        self._entries = self.directory / "entries"
+        self._entries.mkdir(parents=True, exist_ok=True)
+        self._asset_path = self.directory / "assets.json"
+        self._assets = (
+            json.loads(self._asset_path.read_text())
+            if self._asset_path.exists()
+            else {}
+        )
+
+    @staticmethod
+    def _serialize(obj: ee.ComputedObject) -> dict:
+        return ee.serializer.encode(obj, for_cloud_api=True)
+
+    @staticmethod
+    def _get_key(expression: dict) -> str:
+        serialized = json.dumps(expression, sort_keys=True).encode()
+        return hashlib.sha256(serialized).hexdigest()
+
+    def _get_asset_version(self, asset_id: str) -> str | None:
+        """Get the update time of an asset, checking Earth Engine if the last check
+        has expired.
+        """
+        cached = self._assets.get(asset_id)
+        if cached is not None and time.time() - cached["checked"] < self.asset_ttl:
+            return cached["version"]
+
+        try:
+            version = ee.data.getAsset(asset_id).get("updateTime")
+        except ee.EEException:
+            version = None
+
+        self._assets[asset_id] = {"version": version, "checked": time.time()}
+        self._asset_path.write_text(json.dumps(self._assets))
+        return version
+
+    def get_info(self, obj: ee.ComputedObject) -> Any:
+        """Get the value of an Earth Engine object, using the cached result if it is
+        still valid.
+        """
+        expression = self._serialize(obj)
+        path = self._entries / f"{self._get_key(expression)}.json"
+
+        if path.exists():
+            entry = json.loads(path.read_text())
+            if all(
+                self._get_asset_version(asset_id) == version
+                for asset_id, version in entry["assets"].items()
+            ):
+                self._touch(path)
+                self.hits += 1
+                self.seconds_saved += entry["seconds"]
+                return entry["result"]
+
+        start = time.perf_counter()
+        result = obj.getInfo()
+        seconds = time.perf_counter() - start
+        self.misses += 1
+
+        assets = {
+            asset_id: self._get_asset_version(asset_id)
+            for asset_id in sorted(_find_assets(expression))
+        }
+        entry = {"assets": assets, "seconds": seconds, "result": result}
+        path.write_text(json.dumps(entry))
+        self._touch(path)
+        self._evict()
+
+        return result
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Set the modified time of a result to track recent use for eviction."""
+        # Set times explicitly, as file system timestamps may be too coarse to order
+        # results that are used in quick succession
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _evict(self) -> None:
+        """Remove the least recently used results until the cache fits within
+        `max_bytes`."""
+        entries = [(p, p.stat()) for p in self._entries.glob("*.json")]
+        size = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime_ns):
+            if size <= self.max_bytes:
+                break
+            path.unlink()
+            size -= stat.st_size
+
+    def invalidate(self, obj: ee.ComputedObject | None = None) -> None:
+        """Remove the cached result of an object, or all results if none is given."""
+        if obj is None:
+            paths = list(self._entries.glob("*.json"))
+        else:
+            key = self._get_key(self._serialize(obj))
+            paths = [self._entries / f"{key}.json"]
+
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def invalidate_asset(self, asset_id: str) -> None:
+        """Check an asset for updates the next time a result that loads it is used,
+        e.g. after re-exporting it.
+        """
+        if self._assets.pop(asset_id, None) is not None:
+            self._asset_path.write_text(json.dumps(self._assets))
+
+    @property
+    def size(self) -> int:
+        """The total size of stored results, in bytes."""
+        return sum(p.stat().st_size for p in self._entries.glob("*.json"))
+
+
+@functools.cache
+def get_default_cache() -> GetInfoCache:
+    """Get the cache used by `get_info`, stored in `DEFAULT_CACHE_DIR`."""
+    return GetInfoCache()
+
+
+def get_info(obj: ee.ComputedObject) -> Any:
+    """Get the value of an Earth Engine object using the default persistent cache."""
+    return get_default_cache().get_info(obj)
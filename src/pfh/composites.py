@@ -1,6 +1,8 @@
+from collections.abc import Iterable
 from typing import Any
 
 import ee
+import numpy as np
 
 from pfh import containment, landsat, spectral, utils
 
@@ -37,6 +39,59 @@ def max_difference(
     ]).int()
 
 
+def compute_max_difference(
+    pairs: Iterable[tuple[np.ndarray, np.ndarray]],
+    *,
+    timing_band: int = 0,
+    dtype: np.dtype = np.int32,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Calculate the maximum spectral difference between all pairs of local arrays.
+
+    This is the local equivalent of `max_difference`. Pairs are consumed one at a time
+    and running maximums are updated in place, so only one pair is held in memory.
+    Differences are truncated to integers before comparison, and ties are assigned to
+    the earliest pair.
+
+    Parameters
+    ----------
+    pairs : Iterable[tuple[np.ndarray, np.ndarray]]
+        The pre- and post-fire arrays of each pair, with shape (bands, ...). Masked
+        pixels should be NaN.
+    timing_band : int, optional
+        The index of the band used to determine when the largest change occurred.
+    dtype : np.dtype, optional
+        The integer type of the maximum differences, e.g. np.int16 to reduce memory.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The maximum difference of each band, the uint8 index of the pair with the
+        maximum difference in the timing band, and a boolean mask of pixels that were
+        valid in at least one pair.
+    """
+    max_diff = year_of_max = valid = None
+
+    for year, (pre, post) in enumerate(pairs):
+        diff = np.subtract(post, pre, dtype=np.float64)
+        diff_valid = ~np.isnan(diff)
+        np.trunc(diff, out=diff)
+
+        if max_diff is None:
+            max_diff = np.zeros(diff.shape, dtype=dtype)
+            year_of_max = np.zeros(diff.shape[1:], dtype=np.uint8)
+            valid = np.zeros(diff.shape, dtype=bool)
+
+        update = diff_valid & (~valid | (diff > max_diff))
+        np.copyto(max_diff, diff, casting="unsafe", where=update)
+        year_of_max[update[timing_band]] = year
+        valid |= diff_valid
+
+    if max_diff is None:
+        raise ValueError("At least one pair is required.")
+
+    return max_diff, year_of_max, valid
+
+
 def match_pairs(
     pairs: PostfireLandsatPairs,
     *,
@@ -87,13 +142,21 @@ def match_pairs(
     return matched_pairs
 
 
-def get_landsat_composites(
-    fire: ee.Feature, *, years: int = 5, mask_forest: bool = True
-) -> PostfireLandsatPairs:
-    """Build a list of Landsat pairs over n post-fire years for a single MTBS fire."""
+def get_postfire_window(
+    fire: ee.Feature, *, hotspots: ee.Image | None = None
+) -> tuple[ee.Date, ee.Date]:
+    """Get the last burned date and the end date of the immediate post-fire window for
+    a single MTBS fire.
+
+    If the fire has `containment_date` and `end_date` properties (e.g. study fires
+    exported with metadata), those are used directly. Otherwise, the containment date
+    is estimated from hotspots, which is much more expensive. Precomputed annual
+    hotspots can be given to speed up that estimate (see
+    `containment.get_annual_hotspots`).
+    """
     start_date = ee.Date(fire.get("Ig_Date"))
 
-    last_burned = containment.get_containment_date(fire)
+    last_burned = containment.get_containment_date(fire, hotspots=hotspots)
     # Grab up to 2 months after the last burned date
     end_date = utils.earlier_date(
         last_burned.advance(2, "month"),
@@ -106,63 +169,85 @@ def get_landsat_composites(
         last_burned, end_date.advance(-1, "second").advance(-1, "day")
     )
 
+    # Only the selected branch is evaluated, so hotspots are skipped if the dates were
+    # precomputed
+    has_dates = fire.propertyNames().containsAll(["containment_date", "end_date"])
+    return (
+        ee.Date(ee.Algorithms.If(has_dates, fire.get("containment_date"), last_burned)),
+        ee.Date(ee.Algorithms.If(has_dates, fire.get("end_date"), end_date)),
+    )
+
+
+def get_landsat_composites(
+    fire: ee.Feature,
+    *,
+    years: int = 5,
+    mask_forest: bool = True,
+    hotspots: ee.Image | None = None,
+) -> PostfireLandsatPairs:
+    """Build a list of Landsat pairs over n post-fire years for a single MTBS fire.
+
+    Precomputed `containment_date` and `end_date` fire properties are used to define
+    the first post-fire window if available. Otherwise, the containment date is
+    estimated from hotspots, optionally precomputed (see `get_postfire_window`).
+    """
+    start_date = ee.Date(fire.get("Ig_Date"))
+    last_burned, end_date = get_postfire_window(fire, hotspots=hotspots)
+
     forest_mask = utils.generate_forest_mask(fire)
     reburn_mask = utils.generate_reburn_mask(fire, years=years)
     keep_mask = forest_mask.And(reburn_mask.Not()) if mask_forest else reburn_mask.Not()
 
+    # Composite windows start after ignition and end by November 15 of the last
+    # post-fire year, so only load imagery within that range
     imgs = (
-        landsat.load_landsat()
-        .filterBounds(fire.geometry())
+        landsat.load_landsat(
+            bounds=fire.geometry(),
+            start_date=start_date,
+            end_date=ee.Date.fromYMD(start_date.get("year").add(years), 11, 16),
+        )
         .map(landsat.quality_mask)
         .map(lambda x: x.updateMask(keep_mask))
     )
 
-    pairs = []
-    for i in range(years):
-        # First year based on containment date
-        if i == 0:
-            # Advance last burned day by 1 day to avoid grabbing the last saturated
-            # image
-            pre_date_range = ee.DateRange(last_burned.advance(1, "day"), end_date)
-            post_date_range = ee.DateRange(
-                last_burned.advance(1, "day").advance(1, "year"),
-                end_date.advance(1, "year"),
-            )
-        else:
-            year = start_date.get("year").add(i)
-            pre_date_range = ee.DateRange(
-                ee.Date.fromYMD(year, 6, 15), ee.Date.fromYMD(year, 9, 15)
-            )
-            post_date_range = ee.DateRange(
-                ee.Date.fromYMD(year.add(1), 6, 15),
-                ee.Date.fromYMD(year.add(1), 9, 15),
-            )
+    def build_composite(date_range: ee.DateRange) -> ee.Image:
+        """Build a median composite and its metadata over a date range."""
+        window = imgs.filterDate(date_range)
 
-        pre = (
-            imgs.filterDate(pre_date_range)
-            .median()
-            .set(
-                "system:time_start",
-                pre_date_range.start(),
-                "system:time_end",
-                pre_date_range.end(),
-                "num_images",
-                imgs.filterDate(pre_date_range).size(),
-            )
+        return window.median().set(
+            "system:time_start",
+            date_range.start(),
+            "system:time_end",
+            date_range.end(),
+            "num_images",
+            window.size(),
+        )
+
+    # First year based on containment date. Advance last burned day by 1 day to avoid
+    # grabbing the last saturated image.
+    first_pre = build_composite(ee.DateRange(last_burned.advance(1, "day"), end_date))
+    first_post = build_composite(
+        ee.DateRange(
+            last_burned.advance(1, "day").advance(1, "year"),
+            end_date.advance(1, "year"),
         )
-        post = (
-            imgs.filterDate(post_date_range)
-            .median()
-            .set(
-                "system:time_start",
-                post_date_range.start(),
-                "system:time_end",
-                post_date_range.end(),
-                "num_images",
-                imgs.filterDate(post_date_range).size(),
+    )
+
+    # Later years use fixed summer windows, where the post-fire composite of one pair
+    # is the pre-fire composite of the next, so each annual composite is built once
+    # and shared between pairs.
+    annual = []
+    for i in range(1, years + 1) if years > 1 else []:
+        year = start_date.get("year").add(i)
+        annual.append(
+            build_composite(
+                ee.DateRange(ee.Date.fromYMD(year, 6, 15), ee.Date.fromYMD(year, 9, 15))
             )
         )
 
+    pairs = []
+    for i in range(years):
+        pre, post = (first_pre, first_post) if i == 0 else (annual[i - 1], annual[i])
         pair: LandsatPair = dict(
             start=pre, end=post, year=i, event_id=fire.get("Event_ID")
         )
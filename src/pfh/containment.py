@@ -1,7 +1,10 @@
+from collections.abc import Iterable
+
 import ee
+import numpy as np
 
-from pfh.landsat import load_landsat
-from pfh.utils import bit_mask, earlier_date, later_date
+from pfh.landsat import QA_RADSAT_HOTSPOT, QA_RADSAT_HOTSPOT_MASK, load_landsat
+from pfh.utils import earlier_date, later_date
 
 
 def get_modis_hotspots(image: ee.Image) -> ee.Image:
@@ -18,32 +21,36 @@ def get_landsat_hotspots(image: ee.Image) -> ee.Image:
     saturation of the SWIR2 band, excluding pixels with aerosol saturation that
     can occur due to dense cloud cover.
     """
-    qa = image.select("QA_RADSAT")
-    saturated_swir2 = bit_mask(qa, 6)
-    unsaturated_aerosol = bit_mask(qa, 0).eq(0)
-
-    return (
-        saturated_swir2.And(unsaturated_aerosol)
-        .multiply(image.date().millis())
-        .rename("hotspot_date")
-        .long()
+    hotspots = (
+        image.select("QA_RADSAT")
+        .bitwiseAnd(QA_RADSAT_HOTSPOT_MASK)
+        .eq(QA_RADSAT_HOTSPOT)
     )
 
+    return hotspots.multiply(image.date().millis()).rename("hotspot_date").long()
 
-def get_containment_date(fire: ee.Feature) -> ee.Date:
-    """Estimate containment date (more accurately, date of last detected hotspot) for an
-    MTBS fire (USFS/GTAC/MTBS/burned_area_boundaries/v1).
+
+def get_last_hotspots(
+    start_date: ee.Date, end_date: ee.Date, region: ee.Geometry
+) -> ee.Image:
+    """Get the date (in milliseconds) of the last Landsat and MODIS hotspot detected in
+    each pixel between two dates, or 0 if no hotspots were detected.
+
+    Returns
+    -------
+    ee.Image
+        A long image with `landsat` and `modis` bands.
     """
 
-    def get_last_hotspot_date(collection: ee.ImageCollection, fn: callable) -> ee.Date:
-        """Get the date of the last hotspot in a collection."""
+    def get_last_hotspot(
+        collection: ee.ImageCollection, fn: callable, name: str
+    ) -> ee.Image:
+        """Get the date of the last hotspot in each pixel of a collection."""
         hotspot_dates = (
-            collection.filterBounds(fire.geometry())
-            .filterDate(start_date, end_date)
-            .map(fn)
+            collection.filterBounds(region).filterDate(start_date, end_date).map(fn)
         )
 
-        last_hotspot = ee.Image(
+        return ee.Image(
             ee.Algorithms.If(
                 # Unmasking will fail if there are no images
                 hotspot_dates.size().eq(0),
@@ -51,18 +58,56 @@ def get_containment_date(fire: ee.Feature) -> ee.Date:
                 # hotspot_date will be null if there are no valid pixels, so fill with 0
                 hotspot_dates.max().unmask(0),
             )
-        )
+        ).rename(name)
 
-        last_millis = last_hotspot.reduceRegion(
-            reducer=ee.Reducer.max(),
-            geometry=fire.geometry(),
-            scale=30,
-            tileScale=4,
-        ).getNumber("hotspot_date")
+    modis = ee.ImageCollection("MODIS/006/MOD14A1").merge(
+        ee.ImageCollection("MODIS/006/MYD14A1")
+    )
+
+    return ee.Image.cat([
+        get_last_hotspot(
+            load_landsat(bounds=region, start_date=start_date, end_date=end_date),
+            get_landsat_hotspots,
+            "landsat",
+        ),
+        get_last_hotspot(modis, get_modis_hotspots, "modis"),
+    ]).long()
+
+
+def get_annual_hotspots(year: int | ee.Number, region: ee.Geometry) -> ee.Image:
+    """Get the date of the last Landsat and MODIS hotspot detected in each pixel of a
+    region during one fire season (through November 15).
+
+    The result can be exported once per year and passed to `get_containment_date` to
+    avoid scanning hotspot imagery separately for every fire.
+    """
+    start_date = ee.Date.fromYMD(year, 1, 1)
+    end_date = ee.Date.fromYMD(year, 11, 15)
+
+    return get_last_hotspots(start_date, end_date, region).set({
+        "year": year,
+        "system:time_start": start_date.millis(),
+        "system:time_end": end_date.millis(),
+    })
 
-        # If no hotspots are detected, return the end date as a "null" value
-        return ee.Date(ee.Algorithms.If(last_millis.eq(0), end_date, last_millis))
 
+def get_containment_date(fire: ee.Feature, hotspots: ee.Image | None = None) -> ee.Date:
+    """Estimate containment date (more accurately, date of last detected hotspot) for an
+    MTBS fire (USFS/GTAC/MTBS/burned_area_boundaries/v1).
+
+    Parameters
+    ----------
+    fire : ee.Feature
+        The MTBS fire.
+    hotspots : ee.Image, optional
+        Last hotspot dates for the fire year (see `get_annual_hotspots`). If none is
+        given, hotspots are calculated from imagery within the fire.
+
+    Returns
+    -------
+    ee.Date
+        The estimated containment date.
+    """
     start_date = ee.Date(fire.get("Ig_Date"))
     year = start_date.get("year")
     # If the ignition date is after the cutoff, use an empty date range
@@ -70,13 +115,33 @@ def get_containment_date(fire: ee.Feature) -> ee.Date:
         start_date.advance(1, "second"), ee.Date.fromYMD(year, 11, 15)
     )
 
-    landsat = load_landsat()
-    modis = ee.ImageCollection("MODIS/006/MOD14A1").merge(
-        ee.ImageCollection("MODIS/006/MYD14A1")
+    if hotspots is None:
+        hotspots = get_last_hotspots(start_date, end_date, fire.geometry())
+
+    last_millis = (
+        ee.Image(hotspots)
+        .select(["landsat", "modis"])
+        # Pixels outside of a precomputed hotspot region have no hotspots
+        .unmask(0)
+        .reduceRegion(
+            reducer=ee.Reducer.max(),
+            geometry=fire.geometry(),
+            scale=30,
+            tileScale=4,
+        )
     )
 
-    landsat_containment = get_last_hotspot_date(landsat, get_landsat_hotspots)
-    modis_containment = get_last_hotspot_date(modis, get_modis_hotspots)
+    def get_last_hotspot_date(name: str) -> ee.Date:
+        """Get the date of the last hotspot from one source."""
+        millis = last_millis.getNumber(name)
+        # If no hotspots are detected since ignition, return the end date as a "null"
+        # value. Annual hotspots may include earlier fires in the same year.
+        return ee.Date(
+            ee.Algorithms.If(millis.lt(start_date.millis()), end_date, millis)
+        )
+
+    landsat_containment = get_last_hotspot_date("landsat")
+    modis_containment = get_last_hotspot_date("modis")
 
     # Take the earliest containment date from MODIS and Landsat if available, otherwise
     # use Landsat. Using the earliest date reduces false positives from both sources.
@@ -98,3 +163,39 @@ def get_containment_date(fire: ee.Feature) -> ee.Date:
             containment,
         )
     )
+
+
+def compute_last_hotspots(
+    hotspots: Iterable[np.ndarray], dates: Iterable[int]
+) -> np.ndarray:
+    """Calculate the date of the last hotspot in each pixel from a stack of hotspot
+    masks, e.g. from `landsat.decode_qa`.
+
+    This is the local equivalent of a single band of `get_last_hotspots`. Masks are
+    consumed one at a time, so memory-mapped stacks or generators can be processed
+    without loading every scene.
+
+    Parameters
+    ----------
+    hotspots : Iterable[np.ndarray]
+        Boolean hotspot masks for each scene, with identical shapes.
+    dates : Iterable[int]
+        The acquisition date of each scene, in milliseconds.
+
+    Returns
+    -------
+    np.ndarray
+        An int64 array of the last hotspot date in each pixel, or 0 if no hotspots
+        were detected.
+    """
+    last_hotspots = None
+
+    for mask, date in zip(hotspots, dates, strict=True):
+        if last_hotspots is None:
+            last_hotspots = np.zeros(mask.shape, dtype=np.int64)
+        np.maximum(last_hotspots, date, out=last_hotspots, where=mask)
+
+    if last_hotspots is None:
+        raise ValueError("At least one hotspot mask is required.")
+
+    return last_hotspots
@@ -0,0 +1,391 @@
+import mmap
+import struct
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+# TIFF field types and their struct formats
+FIELD_TYPES = {
+    1: "B",
+    2: "s",
+    3: "H",
+    4: "I",
+    5: "II",
+    6: "b",
+    7: "B",
+    8: "h",
+    9: "i",
+    10: "ii",
+    11: "f",
+    12: "d",
+    16: "Q",
+    17: "q",
+}
+
+# Sample formats (unsigned, signed, float) and bits per sample to NumPy types
+SAMPLE_TYPES = {
+    (1, 8): np.uint8,
+    (1, 16): np.uint16,
+    (1, 32): np.uint32,
+    (2, 8): np.int8,
+    (2, 16): np.int16,
+    (2, 32): np.int32,
+    (3, 32): np.float32,
+    (3, 64): np.float64,
+}
+
+COMPRESSION_NONE = 1
+COMPRESSION_LZW = 5
+COMPRESSION_DEFLATE = (8, 32946)
+SUPPORTED_COMPRESSION = (COMPRESSION_NONE, COMPRESSION_LZW, *COMPRESSION_DEFLATE)
+PROJECTED_CRS_KEY = 3072
+
+
+def _decode_lzw(data: bytes) -> bytes:
+    """Decode TIFF LZW compressed data (MSB-first codes with early change)."""
+    clear_code, eoi_code = 256, 257
+    table = [bytes([i]) for i in range(256)] + [b"", b""]
+    out = bytearray()
+    code_len = 9
+    prev = None
+    bit_pos = 0
+    n_bits = len(data) * 8
+
+    while bit_pos + code_len <= n_bits:
+        # Any code of up to 12 bits fits in the 3 bytes starting at its first bit
+        byte = bit_pos >> 3
+        chunk = int.from_bytes(data[byte : byte + 3].ljust(3, b"\0"), "big")
+        code = (chunk >> (24 - (bit_pos & 7) - code_len)) & ((1 << code_len) - 1)
+        bit_pos += code_len
+
+        if code == eoi_code:
+            break
+        if code == clear_code:
+            del table[258:]
+            code_len = 9
+            prev = None
+            continue
+
+        if prev is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else prev + prev[:1]
+            table.append(prev + entry[:1])
+            if len(table) in (511, 1023, 2047):
+                code_len += 1
+
+        out += entry
+        prev = entry
+
+    return bytes(out)
+
+
+class GeoTIFF:
+    """A windowed reader for single-band, north-up GeoTIFFs (e.g. data/ownership.tif).
+
+    The file is memory-mapped, and only the tiles or strips that intersect a requested
+    window are decoded. Decoded blocks are kept in an LRU cache so that repeated
+    lookups (e.g. windows around neighboring fires) avoid decoding again. Windows are
+    zero-copy views of the file wherever blocks are uncompressed and contiguous.
+
+    Parameters
+    ----------
+    path : str | Path
+        The path to the GeoTIFF.
+    cache_size : int, optional
+        The maximum number of decoded blocks to cache.
+    """
+
+    def __init__(self, path: str | Path, *, cache_size: int = 256):
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        tags = self._read_tags()
+        self.width = tags[256][0]
+        self.height = tags[257][0]
+        self.compression = tags.get(259, [COMPRESSION_NONE])[0]
+        self.predictor = tags.get(317, [1])[0]
+        if tags.get(277, [1])[0] != 1:
+            raise ValueError("Only single-band GeoTIFFs are supported.")
+        if self.compression not in SUPPORTED_COMPRESSION:
+            raise ValueError(f"Unsupported compression `{self.compression}`.")
+        if self.predictor not in (1, 2):
+            raise ValueError(f"Unsupported predictor `{self.predictor}`.")
+
+        sample_type = (tags.get(339, [1])[0], tags[258][0])
+        self.dtype = np.dtype(SAMPLE_TYPES[sample_type]).newbyteorder(self._byteorder)
+
+        if 322 in tags:
+            self.block_width, self.block_height = tags[322][0], tags[323][0]
+            self._offsets, self._byte_counts = tags[324], tags[325]
+        else:
+            self.block_width = self.width
+            self.block_height = tags.get(278, [self.height])[0]
+            self._offsets, self._byte_counts = tags[273], tags[279]
+        self.blocks_across = -(-self.width // self.block_width)
+
+        # Pixel size and upper-left corner from the model tiepoint and pixel scale
+        scale_x, scale_y, _ = tags[33550]
+        i, j, _, x, y, _ = tags[33922]
+        self.transform = (scale_x, x - i * scale_x, scale_y, y + j * scale_y)
+        self.epsg = self._read_epsg(tags.get(34735))
+
+        nodata = tags.get(42113)
+        self.nodata = float(nodata.rstrip(b"\0")) if nodata else None
+        self._image = self._contiguous_image()
+
+    def _unpack(self, fmt: str, offset: int) -> tuple:
+        return struct.unpack_from(self._byteorder + fmt, self._mmap, offset)
+
+    def _read_tags(self) -> dict[int, list]:
+        """Read the tags of the first image file directory."""
+        self._byteorder = {b"II": "<", b"MM": ">"}[self._mmap[:2]]
+        bigtiff = self._unpack("H", 2)[0] == 43
+        # BigTIFF uses 64-bit counts and offsets, and larger directory entries
+        count_fmt, offset_fmt = ("Q", "Q") if bigtiff else ("H", "I")
+        value_size = 8 if bigtiff else 4
+        entry_size = 4 + 2 * value_size
+
+        ifd = self._unpack(offset_fmt, 8 if bigtiff else 4)[0]
+        n_entries = self._unpack(count_fmt, ifd)[0]
+        entries_start = ifd + struct.calcsize(count_fmt)
+
+        tags = {}
+        for n in range(n_entries):
+            entry = entries_start + n * entry_size
+            tag, field_type, count = self._unpack(f"HH{offset_fmt}", entry)
+            fmt = FIELD_TYPES[field_type]
+            size = struct.calcsize(fmt) * count
+            value_offset = entry + 4 + value_size
+            if size > value_size:
+                value_offset = self._unpack(offset_fmt, value_offset)[0]
+
+            if fmt == "s":
+                tags[tag] = bytes(self._mmap[value_offset : value_offset + count])
+            else:
+                tags[tag] = list(self._unpack(fmt * count, value_offset))
+
+        return tags
+
+    @staticmethod
+    def _read_epsg(geokeys: list[int] | None) -> int | None:
+        """Read the projected CRS EPSG code from a GeoKey directory."""
+        if geokeys is None:
+            return None
+        n_keys = geokeys[3]
+        for key in range(n_keys):
+            key_id, location, _, value = geokeys[4 + key * 4 : 8 + key * 4]
+            if key_id == PROJECTED_CRS_KEY and location == 0:
+                return value
+        return None
+
+    def _raw_block(self, index: int) -> memoryview:
+        offset, size = self._offsets[index], self._byte_counts[index]
+        return memoryview(self._mmap)[offset : offset + size]
+
+    def _read_block(self, index: int) -> np.ndarray:
+        """Read a single tile or strip, using cached blocks where possible."""
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+
+        raw = self._raw_block(index)
+        if self.compression == COMPRESSION_LZW:
+            raw = _decode_lzw(raw.tobytes())
+        elif self.compression in COMPRESSION_DEFLATE:
+            raw = zlib.decompress(raw)
+
+        block = np.frombuffer(raw, dtype=self.dtype)
+        # Strips at the bottom of the image may be shorter than the block height
+        block = block.reshape(-1, self.block_width)
+        if self.predictor == 2:
+            block = np.cumsum(block, axis=1, dtype=self.dtype)
+        block.flags.writeable = False
+
+        if self.compression != COMPRESSION_NONE or self.predictor == 2:
+            self._cache[index] = block
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return block
+
+    def _contiguous_image(self) -> np.ndarray | None:
+        """Return a zero-copy view of the full image if it is stored as uncompressed,
+        contiguous strips, or None otherwise.
+        """
+        if self.compression != COMPRESSION_NONE or self.predictor == 2:
+            return None
+        if self.block_width != self.width:
+            return None
+
+        start = self._offsets[0]
+        expected = np.cumsum([start, *self._byte_counts[:-1]])
+        if not np.array_equal(expected, self._offsets):
+            return None
+
+        n = self.width * self.height
+        image = np.frombuffer(self._mmap, dtype=self.dtype, count=n, offset=start)
+        return image.reshape(self.height, self.width)
+
+    def read_window(
+        self, row: int, col: int, height: int, width: int, *, fill: float | None = None
+    ) -> np.ndarray:
+        """Read a window of pixels.
+
+        Parameters
+        ----------
+        row, col : int
+            The pixel offset of the upper-left corner of the window. Windows may extend
+            beyond the image.
+        height, width : int
+            The size of the window, in pixels.
+        fill : float, optional
+            The value of pixels outside of the image. Defaults to the nodata value, or
+            0 if there is none.
+
+        Returns
+        -------
+        np.ndarray
+            The window, which is a read-only view of the file where possible.
+        """
+        fill = (self.nodata or 0) if fill is None else fill
+        row1, col1 = row + height, col + width
+        inside = row >= 0 and col >= 0 and row1 <= self.height and col1 <= self.width
+
+        # Return zero-copy views where possible
+        if inside and self._image is not None:
+            return self._image[row:row1, col:col1]
+
+        block_row0, block_col0 = row // self.block_height, col // self.block_width
+        block_row1, block_col1 = (
+            (row1 - 1) // self.block_height,
+            (col1 - 1) // self.block_width,
+        )
+        if inside and (block_row0, block_col0) == (block_row1, block_col1):
+            block = self._read_block(block_row0 * self.blocks_across + block_col0)
+            r = row - block_row0 * self.block_height
+            c = col - block_col0 * self.block_width
+            return block[r : r + height, c : c + width]
+
+        window = np.full((height, width), fill, dtype=self.dtype)
+        for block_row in range(
+            max(row, 0) // self.block_height,
+            -(-min(row1, self.height) // self.block_height),
+        ):
+            for block_col in range(
+                max(col, 0) // self.block_width,
+                -(-min(col1, self.width) // self.block_width),
+            ):
+                block = self._read_block(block_row * self.blocks_across + block_col)
+                top, left = block_row * self.block_height, block_col * self.block_width
+                r0, r1 = max(row, top), min(row1, top + block.shape[0], self.height)
+                c0, c1 = max(col, left), min(col1, left + block.shape[1], self.width)
+                window[r0 - row : r1 - row, c0 - col : c1 - col] = block[
+                    r0 - top : r1 - top, c0 - left : c1 - left
+                ]
+
+        return window
+
+    def read_bounds(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        *,
+        fill: float | None = None,
+    ) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+        """Read all pixels intersecting a bounding box in the raster CRS (e.g.
+        EPSG:5070 for data/ownership.tif).
+
+        Returns
+        -------
+        tuple[np.ndarray, tuple[float, float, float, float]]
+            The window, and its transform as (pixel width, left x, pixel height, top
+            y).
+        """
+        scale_x, x0, scale_y, y0 = self.transform
+        col = int(np.floor((xmin - x0) / scale_x))
+        row = int(np.floor((y0 - ymax) / scale_y))
+        col1 = int(np.ceil((xmax - x0) / scale_x))
+        row1 = int(np.ceil((y0 - ymin) / scale_y))
+
+        window = self.read_window(row, col, row1 - row, col1 - col, fill=fill)
+        transform = (scale_x, x0 + col * scale_x, scale_y, y0 - row * scale_y)
+        return window, transform
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """The (xmin, ymin, xmax, ymax) bounds of the image in the raster CRS."""
+        scale_x, x0, scale_y, y0 = self.transform
+        return x0, y0 - self.height * scale_y, x0 + self.width * scale_x, y0
+
+    def sample(
+        self, x: np.ndarray, y: np.ndarray, *, fill: float | None = None
+    ) -> np.ndarray:
+        """Read the pixels containing many points in the raster CRS at once.
+
+        Points are grouped by the tile or strip they fall in, so each block is read at
+        most once and all of its points are gathered with a single fancy index.
+
+        Parameters
+        ----------
+        x, y : np.ndarray
+            The point coordinates in the raster CRS.
+        fill : float, optional
+            The value of points outside of the image. Defaults to the nodata value, or
+            0 if there is none.
+
+        Returns
+        -------
+        np.ndarray
+            The pixel value at each point.
+        """
+        fill = (self.nodata or 0) if fill is None else fill
+        scale_x, x0, scale_y, y0 = self.transform
+        cols = np.floor((np.asarray(x, dtype=np.float64) - x0) / scale_x)
+        rows = np.floor((y0 - np.asarray(y, dtype=np.float64)) / scale_y)
+        # NaN coordinates fail every comparison, so they are also outside
+        inside = (rows >= 0) & (rows < self.height) & (cols >= 0) & (cols < self.width)
+        rows, cols = rows[inside].astype(int), cols[inside].astype(int)
+
+        values = np.full(inside.shape, fill, dtype=self.dtype)
+        if self._image is not None:
+            values[inside] = self._image[rows, cols]
+            return values
+
+        blocks = (rows // self.block_height) * self.blocks_across
+        blocks += cols // self.block_width
+        order = np.argsort(blocks, kind="stable")
+        block_ids, starts, counts = np.unique(
+            blocks[order], return_index=True, return_counts=True
+        )
+
+        sampled = np.empty(len(rows), dtype=self.dtype)
+        for block_id, start, count in zip(block_ids, starts, counts, strict=True):
+            points = order[start : start + count]
+            block = self._read_block(block_id)
+            sampled[points] = block[
+                rows[points] % self.block_height, cols[points] % self.block_width
+            ]
+
+        values[inside] = sampled
+        return values
+
+    def close(self) -> None:
+        """Close the file. Zero-copy windows must be released first."""
+        self._cache.clear()
+        self._image = None
+        self._mmap.close()
+
+    def __enter__(self) -> "GeoTIFF":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,6 +1,18 @@
+from collections.abc import Callable
+
 import ee
+import numpy as np
+
+DateLike = ee.Date | str | int
 
-from pfh import utils
+# Cirrus (bit 2), cloud shadow (bit 4), snow (bit 5), and clear (bit 6) QA_PIXEL flags,
+# and the flag values of a clear, unobstructed pixel
+QA_PIXEL_MASK = 0b1110100
+QA_PIXEL_CLEAR = 0b1000000
+# Band 1 (bit 0) and SWIR2 (bit 6) QA_RADSAT flags, and the flag values of a hotspot
+# with saturated SWIR2 and unsaturated Band 1
+QA_RADSAT_HOTSPOT_MASK = 0b1000001
+QA_RADSAT_HOTSPOT = 0b1000000
 
 
 def prep_OLI(image: ee.Image) -> ee.Image:
@@ -59,27 +71,151 @@ def prep_ETM(image: ee.Image) -> ee.Image:
     ).uint16()
 
 
-def load_landsat() -> ee.ImageCollection:
-    oliL9 = ee.ImageCollection("LANDSAT/LC09/C02/T1_L2").map(prep_OLI)
-    oliL8 = ee.ImageCollection("LANDSAT/LC08/C02/T1_L2").map(prep_OLI)
-    etm = ee.ImageCollection("LANDSAT/LE07/C02/T1_L2").map(prep_ETM)
-    tm = ee.ImageCollection("LANDSAT/LT05/C02/T1_L2").map(prep_ETM)
+def load_landsat(
+    *,
+    bounds: ee.Geometry | None = None,
+    start_date: DateLike | None = None,
+    end_date: DateLike | None = None,
+    season: tuple[int, int] | None = None,
+) -> ee.ImageCollection:
+    """Load merged Landsat 5, 7, 8, and 9 Collection 2 imagery with common band names.
+
+    Filters are applied to each sensor collection before bands are renamed, so only
+    scenes that are used are prepared. This is the only gain over filtering a loaded
+    collection: each set of filters builds its own merge, so per-fire filters make the
+    graph larger than filtering one shared collection. Identical loads are encoded
+    once by the Earth Engine serializer, so they are not memoized.
+
+    Parameters
+    ----------
+    bounds : ee.Geometry, optional
+        Only load scenes that intersect this geometry.
+    start_date, end_date : ee.Date | str | int, optional
+        Only load scenes within this date range. The end date is exclusive.
+    season : tuple[int, int], optional
+        Only load scenes between these days of the year, inclusive.
+
+    Returns
+    -------
+    ee.ImageCollection
+        The Landsat imagery, sorted by acquisition time.
+    """
+    filters = []
+    if bounds is not None:
+        filters.append(ee.Filter.bounds(bounds))
+    if start_date is not None:
+        filters.append(ee.Filter.gte("system:time_start", ee.Date(start_date).millis()))
+    if end_date is not None:
+        filters.append(ee.Filter.lt("system:time_start", ee.Date(end_date).millis()))
+    if season is not None:
+        filters.append(ee.Filter.calendarRange(*season, "day_of_year"))
+
+    def load(collection_id: str, prep: Callable[[ee.Image], ee.Image]):
+        collection = ee.ImageCollection(collection_id)
+        # Filter before renaming bands so that only selected scenes are prepared
+        if filters:
+            collection = collection.filter(ee.Filter.And(*filters))
+        return collection.map(prep)
+
+    oliL9 = load("LANDSAT/LC09/C02/T1_L2", prep_OLI)
+    oliL8 = load("LANDSAT/LC08/C02/T1_L2", prep_OLI)
+    etm = load("LANDSAT/LE07/C02/T1_L2", prep_ETM)
+    tm = load("LANDSAT/LT05/C02/T1_L2", prep_ETM)
 
     return tm.merge(etm).merge(oliL8).merge(oliL9).sort("system:time_start")
 
 
 def quality_mask(image: ee.Image) -> ee.Image:
     """Apply quality masking to a Landsat Collection 2 Image."""
-    qa = image.select("QA_PIXEL")
-    cirrus = utils.bit_mask(qa, 2)
-    cloud_shadow = utils.bit_mask(qa, 4)
-    snow = utils.bit_mask(qa, 5)
-    clear = utils.bit_mask(qa, 6)
+    clear = image.select("QA_PIXEL").bitwiseAnd(QA_PIXEL_MASK).eq(QA_PIXEL_CLEAR)
     saturated = image.select("QA_RADSAT").gt(0)
 
-    return image.updateMask(
-        clear.And(snow.eq(0))
-        .And(cirrus.eq(0))
-        .And(cloud_shadow.eq(0))
-        .And(saturated.eq(0))
-    )
+    return image.updateMask(clear.And(saturated.eq(0)))
+
+
+def build_qa_lut(mask: int, value: int) -> np.ndarray:
+    """Build a boolean lookup table that is True for every uint16 QA value where the
+    masked bits equal the given value.
+    """
+    return (np.arange(2**16, dtype=np.uint16) & mask) == value
+
+
+QA_PIXEL_CLEAR_LUT = build_qa_lut(QA_PIXEL_MASK, QA_PIXEL_CLEAR)
+QA_RADSAT_HOTSPOT_LUT = build_qa_lut(QA_RADSAT_HOTSPOT_MASK, QA_RADSAT_HOTSPOT)
+
+
+def decode_qa(
+    qa_pixel: np.ndarray,
+    qa_radsat: np.ndarray,
+    *,
+    chunk_size: int = 2**22,
+    clear: np.ndarray | None = None,
+    hotspot: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Decode local Landsat Collection 2 QA arrays into clear and hotspot masks.
+
+    This is the local equivalent of `quality_mask` and
+    `containment.get_landsat_hotspots`. QA values are decoded through precomputed
+    lookup tables, one chunk at a time, so that memory-mapped scene stacks can be
+    processed in bounded memory.
+
+    Parameters
+    ----------
+    qa_pixel : np.ndarray
+        A uint16 array of QA_PIXEL values, e.g. a memory-mapped stack of scenes.
+    qa_radsat : np.ndarray
+        A uint16 array of QA_RADSAT values with the same shape as `qa_pixel`.
+    chunk_size : int, optional
+        The maximum number of pixels to decode at once.
+    clear : np.ndarray, optional
+        A C-contiguous boolean array with the shape of the QA arrays to write the clear
+        mask into, e.g. a memory-mapped file. If none is given, a new array is
+        allocated.
+    hotspot : np.ndarray, optional
+        A C-contiguous boolean array with the shape of the QA arrays to write the
+        hotspot mask into. If none is given, a new array is allocated.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The clear mask, where pixels are valid for compositing, and the hotspot mask,
+        where SWIR2 is saturated without Band 1 saturation.
+    """
+    if qa_pixel.dtype != np.uint16 or qa_radsat.dtype != np.uint16:
+        raise TypeError("QA_PIXEL and QA_RADSAT arrays must be uint16.")
+    if qa_pixel.shape != qa_radsat.shape:
+        raise ValueError(
+            f"QA_PIXEL shape {qa_pixel.shape} does not match QA_RADSAT shape"
+            f" {qa_radsat.shape}."
+        )
+
+    clear = np.empty(qa_pixel.shape, dtype=bool) if clear is None else clear
+    hotspot = np.empty(qa_pixel.shape, dtype=bool) if hotspot is None else hotspot
+    # Outputs are written through flattened views, but flattening copies arrays that
+    # aren't contiguous, e.g. slices, which would leave the outputs unwritten
+    for name, out in [("clear", clear), ("hotspot", hotspot)]:
+        if (
+            out.shape != qa_pixel.shape
+            or out.dtype != bool
+            or not out.flags.c_contiguous
+        ):
+            raise ValueError(
+                f"`{name}` must be a C-contiguous boolean array with shape"
+                f" {qa_pixel.shape}."
+            )
+
+    # Flattening is a view for contiguous (e.g. memory-mapped) arrays
+    pixel_flat = qa_pixel.reshape(-1)
+    radsat_flat = qa_radsat.reshape(-1)
+    clear_flat = clear.reshape(-1)
+    hotspot_flat = hotspot.reshape(-1)
+
+    for start in range(0, pixel_flat.size, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        radsat = radsat_flat[chunk]
+
+        np.take(QA_PIXEL_CLEAR_LUT, pixel_flat[chunk], out=clear_flat[chunk])
+        np.logical_and(clear_flat[chunk], radsat == 0, out=clear_flat[chunk])
+        np.take(QA_RADSAT_HOTSPOT_LUT, radsat, out=hotspot_flat[chunk])
+
+    return clear, hotspot
@@ -0,0 +1,98 @@
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import ee
+
+# Graph metrics, where larger values are more likely to exceed Earth Engine limits
+METRICS = ("nodes", "tree_nodes", "depth", "shared", "bytes")
+
+
+def profile_graph(obj: Any) -> dict[str, int]:
+    """Measure the size and complexity of the serialized computation graph of an
+    Earth Engine object. This runs offline, as serialization is client-side.
+
+    Parameters
+    ----------
+    obj : Any
+        An Earth Engine object, or a list or dict of objects.
+
+    Returns
+    -------
+    dict[str, int]
+        The graph metrics:
+            - nodes: The number of function calls in the serialized graph.
+            - tree_nodes: The number of function calls if shared sub-expressions were
+              repeated rather than referenced.
+            - depth: The longest chain of nested function calls.
+            - shared: The number of sub-expressions referenced more than once.
+            - bytes: The size of the serialized graph.
+    """
+    graph = ee.serializer.encode(obj, for_cloud_api=True)
+    serialized = json.dumps(graph, separators=(",", ":"))
+    values = graph["values"]
+    references = Counter()
+    measured = {}
+
+    def measure(node: Any) -> tuple[int, int]:
+        """Return the number of expanded function calls and depth of a value."""
+        if isinstance(node, list):
+            children = [measure(child) for child in node]
+        elif isinstance(node, dict):
+            if "valueReference" in node:
+                name = node["valueReference"]
+                references[name] += 1
+                if name not in measured:
+                    measured[name] = measure(values[name])
+                return measured[name]
+            children = [measure(child) for child in node.values()]
+        else:
+            return 0, 0
+
+        calls = sum(c for c, _ in children)
+        depth = max((d for _, d in children), default=0)
+        if isinstance(node, dict) and "functionInvocationValue" in node:
+            calls, depth = calls + 1, depth + 1
+        return calls, depth
+
+    tree_nodes, depth = measure(values[graph["result"]])
+
+    return {
+        "nodes": serialized.count('"functionInvocationValue"'),
+        "tree_nodes": tree_nodes,
+        "depth": depth,
+        "shared": sum(count > 1 for count in references.values()),
+        "bytes": len(serialized),
+    }
+
+
+def check_baseline(
+    profiles: dict[str, dict[str, int]],
+    baseline: dict[str, dict[str, int]],
+    *,
+    tolerance: float = 0.05,
+) -> list[str]:
+    """Compare graph profiles to a baseline, returning a description of each metric
+    that grew by more than the relative tolerance. Profiles without a baseline are
+    ignored.
+    """
+    regressions = []
+    for name, profile in profiles.items():
+        for metric, value in profile.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected is not None and value > expected * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {expected} -> {value}")
+
+    return regressions
+
+
+def load_baseline(path: str | Path) -> dict[str, dict[str, int]]:
+    """Load graph profiles saved with `save_baseline`, if the file exists."""
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baseline(profiles: dict[str, dict[str, int]], path: str | Path) -> None:
+    """Save graph profiles to compare future changes against."""
+    Path(path).write_text(json.dumps(profiles, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,153 @@
+import ee
+import numpy as np
+
+EXPORT_CRS = "EPSG:5070"
+
+
+def _area(boxes: np.ndarray) -> np.ndarray:
+    """Get the area of (..., xmin, ymin, xmax, ymax) boxes."""
+    return (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
+
+
+def _union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Get the bounding boxes of pairs of broadcast boxes."""
+    return np.concatenate(
+        [np.minimum(a[..., :2], b[..., :2]), np.maximum(a[..., 2:], b[..., 2:])],
+        axis=-1,
+    )
+
+
+def plan_export_regions(
+    boxes: np.ndarray, *, max_regions: int = 8, scale: float = 30
+) -> tuple[np.ndarray, np.ndarray, dict[str, int]]:
+    """Group fire bounding boxes into a small set of compact export regions.
+
+    Boxes are merged agglomeratively, always merging the pair of regions that adds the
+    least empty area to the export. Merging continues while there are more than
+    `max_regions` regions, or while a merge adds no area (e.g. overlapping fires).
+
+    Parameters
+    ----------
+    boxes : np.ndarray
+        Fire bounding boxes with shape (n, 4), as (xmin, ymin, xmax, ymax) in a
+        projected CRS with units of meters (e.g. EPSG:5070).
+    max_regions : int, optional
+        The maximum number of regions to create.
+    scale : float, optional
+        The export pixel size, in meters, used to report pixel counts.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, dict[str, int]]
+        The region boxes with shape (k, 4), the region index of each fire, and a
+        report with the number of pixels in the bounding box of all fires
+        (`bbox_pixels`), the total number of pixels in all regions
+        (`region_pixels`), and the difference (`pixels_saved`).
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    regions = boxes.copy()
+    labels = np.arange(len(boxes))
+
+    while len(regions) > 1:
+        # The empty area added by merging each pair of regions
+        added = (
+            _area(_union(regions[:, None], regions[None]))
+            - _area(regions)[:, None]
+            - _area(regions)[None]
+        )
+        np.fill_diagonal(added, np.inf)
+        i, j = np.unravel_index(np.argmin(added), added.shape)
+        if added[i, j] > 0 and len(regions) <= max_regions:
+            break
+
+        i, j = min(i, j), max(i, j)
+        regions[i] = _union(regions[i], regions[j])
+        regions = np.delete(regions, j, axis=0)
+        labels[labels == j] = i
+        labels[labels > j] -= 1
+
+    pixel_area = scale**2
+    bbox = _union(boxes.min(axis=0), boxes.max(axis=0)) if len(boxes) else boxes
+    bbox_pixels = int(_area(bbox).sum() // pixel_area)
+    region_pixels = int(_area(regions).sum() // pixel_area)
+    report = {
+        "bbox_pixels": bbox_pixels,
+        "region_pixels": region_pixels,
+        "pixels_saved": bbox_pixels - region_pixels,
+    }
+
+    return regions, labels, report
+
+
+def get_export_regions(
+    fires: ee.FeatureCollection, *, max_regions: int = 8, scale: float = 30
+) -> list[tuple[ee.Geometry, list[str]]]:
+    """Plan compact export regions covering a collection of fires, e.g. all fires in a
+    year, rather than exporting the bounding box of every fire (see
+    `plan_export_regions`).
+
+    Fire bounds are not cached, so that regions always cover every fire that is
+    currently in the collection.
+
+    Returns
+    -------
+    list[tuple[ee.Geometry, list[str]]]
+        The geometry of each region, and the `Event_ID` of each fire assigned to it.
+        Every fire is assigned to exactly one region that covers it, so fires near the
+        edge of other regions are only exported once.
+    """
+    fire_bounds = fires.map(
+        lambda fire: ee.Feature(
+            None,
+            {
+                "Event_ID": fire.get("Event_ID"),
+                "bounds": fire.geometry().bounds(1, EXPORT_CRS).coordinates().get(0),
+            },
+        )
+    )
+    info = ee.Dictionary({
+        "event_ids": fire_bounds.aggregate_array("Event_ID"),
+        "bounds": fire_bounds.aggregate_array("bounds"),
+    }).getInfo()
+
+    boxes = np.array([
+        [*np.min(ring, axis=0), *np.max(ring, axis=0)] for ring in info["bounds"]
+    ]).reshape(-1, 4)
+    regions, labels, report = plan_export_regions(
+        boxes, max_regions=max_regions, scale=scale
+    )
+
+    print(
+        f"Planned {len(regions)} export regions with {report['region_pixels']:,} "
+        f"pixels, saving {report['pixels_saved']:,} pixels."
+    )
+    event_ids = np.array(info["event_ids"], dtype=object)
+    return [
+        (
+            ee.Geometry.Rectangle(region.tolist(), proj=EXPORT_CRS, geodesic=False),
+            event_ids[labels == i].tolist(),
+        )
+        for i, region in enumerate(regions)
+    ]
+
+
+def get_annual_mosaics(collection: ee.ImageCollection) -> ee.ImageCollection:
+    """Mosaic a collection of images exported over multiple regions per year into one
+    image per year, based on the `year` property of each image.
+    """
+
+    def mosaic_year(year: ee.Number) -> ee.Image:
+        tiles = collection.filter(ee.Filter.eq("year", year))
+        first = ee.Image(tiles.first())
+        return (
+            tiles.mosaic()
+            .setDefaultProjection(first.projection())
+            .set({
+                "year": year,
+                "system:time_start": first.get("system:time_start"),
+                "system:time_end": first.get("system:time_end"),
+            })
+        )
+
+    years = collection.aggregate_array("year").distinct().sort()
+    return ee.ImageCollection(years.map(mosaic_year))
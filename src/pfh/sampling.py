@@ -0,0 +1,109 @@
+import json
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyproj
+
+from pfh.geotiff import GeoTIFF
+from pfh.regions import EXPORT_CRS
+
+# One or more non-overlapping tiles of a single map
+Raster = GeoTIFF | Sequence[GeoTIFF]
+
+_TO_EXPORT_CRS = pyproj.Transformer.from_crs("EPSG:4326", EXPORT_CRS, always_xy=True)
+
+
+def to_export_crs(lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Project WGS84 longitudes and latitudes to the export CRS (EPSG:5070), the CRS
+    of all exported maps.
+    """
+    return _TO_EXPORT_CRS.transform(
+        np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+    )
+
+
+def read_plots(path: str | Path) -> pd.DataFrame:
+    """Read point plots (e.g. data/validation.geojson) into a table of their properties
+    and their `x` and `y` coordinates in the export CRS.
+    """
+    features = json.loads(Path(path).read_text())["features"]
+    lon, lat = (
+        np.array([f["geometry"]["coordinates"][:2] for f in features], dtype=np.float64)
+        .reshape(-1, 2)
+        .T
+    )
+
+    plots = pd.DataFrame([f["properties"] for f in features], index=range(len(lon)))
+    plots["x"], plots["y"] = to_export_crs(lon, lat)
+    return plots
+
+
+def sample_mosaic(tiles: Raster, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Sample a map stored as one or more tiles at many points in the export CRS.
+
+    Returns
+    -------
+    np.ndarray
+        The value at each point, or NaN for points outside of every tile or on nodata
+        pixels.
+    """
+    tiles = [tiles] if isinstance(tiles, GeoTIFF) else tiles
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    values = np.full(x.shape, np.nan)
+    remaining = np.ones(x.shape, dtype=bool)
+
+    for tile in tiles:
+        xmin, ymin, xmax, ymax = tile.bounds
+        points = remaining & (x >= xmin) & (x < xmax) & (y > ymin) & (y <= ymax)
+        sampled = tile.sample(x[points], y[points]).astype(np.float64)
+        if tile.nodata is not None:
+            sampled[sampled == tile.nodata] = np.nan
+        values[points] = sampled
+        remaining &= ~points
+
+    return values
+
+
+def sample_plots(
+    plots: pd.DataFrame,
+    rasters: Mapping[str, Raster | Mapping[int, Raster]],
+    *,
+    year_column: str = "fire_year",
+) -> pd.DataFrame:
+    """Sample local rasters at every plot, without any Earth Engine requests.
+
+    Parameters
+    ----------
+    plots : pd.DataFrame
+        Plots with `x` and `y` coordinates in the export CRS, e.g. from `read_plots`.
+    rasters : Mapping[str, Raster | Mapping[int, Raster]]
+        The rasters to sample, by output column. Each is either a single map (e.g.
+        data/ownership.tif), or a map per year (e.g. harvest or severity maps), where
+        each plot is sampled from the map of its year.
+    year_column : str, optional
+        The plot column that selects the map of annual rasters.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of the plots with a column of sampled values for each raster. Values
+        outside of a map, on nodata pixels, or in a year without a map are NaN.
+    """
+    plots = plots.copy()
+    x, y = plots["x"].to_numpy(), plots["y"].to_numpy()
+
+    for column, raster in rasters.items():
+        if not isinstance(raster, Mapping):
+            plots[column] = sample_mosaic(raster, x, y)
+            continue
+
+        values = np.full(len(plots), np.nan)
+        years = plots[year_column].to_numpy()
+        for year, tiles in raster.items():
+            in_year = years == year
+            values[in_year] = sample_mosaic(tiles, x[in_year], y[in_year])
+        plots[column] = values
+
+    return plots
@@ -1,8 +1,16 @@
 import ee
 
+from pfh.containment import get_annual_hotspots
+from pfh.regions import EXPORT_CRS
+from pfh.scripts._01_study_fires import get_unmanaged_lands
 from pfh.scripts.config import (
+    FIRST_YEAR,
     HARVEST_COLLECTION,
+    HOTSPOT_COLLECTION,
+    LAST_YEAR,
     MAXDIFF_COLLECTION,
+    STUDY_AREA_COLLECTION,
+    UNMANAGED_LANDS,
 )
 
 
@@ -19,9 +27,57 @@ def create_imagecollection(collection_path) -> None:
         ) from None
 
 
+def export_annual_hotspots() -> None:
+    """Export the date of the last Landsat and MODIS hotspot in each pixel of the study
+    area for every candidate fire year. These are used to estimate containment dates
+    without scanning hotspot imagery separately for every fire.
+    """
+    region = ee.FeatureCollection(STUDY_AREA_COLLECTION).geometry().bounds()
+
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        asset_id = f"{HOTSPOT_COLLECTION}/{year}"
+        print(f"Exporting {asset_id}...")
+
+        task = ee.batch.Export.image.toAsset(
+            image=get_annual_hotspots(year, region),
+            description=f"hotspots_{year}",
+            assetId=asset_id,
+            region=region,
+            scale=30,
+            crs=EXPORT_CRS,
+            maxPixels=1e13,
+            pyramidingPolicy={".default": "max"},
+        )
+
+        task.start()
+
+
+def export_unmanaged_lands() -> None:
+    """Export unmanaged ownerships in the study area, dissolved into simplified parts,
+    which are removed from candidate fires.
+    """
+    region = ee.FeatureCollection(STUDY_AREA_COLLECTION).geometry().bounds()
+    print(f"Exporting {UNMANAGED_LANDS}...")
+
+    ee.batch.Export.table.toAsset(
+        collection=get_unmanaged_lands(region),
+        description="unmanaged_lands",
+        assetId=UNMANAGED_LANDS,
+    ).start()
+
+
 if __name__ == "__main__":
     ee.Initialize()
 
     create_imagecollection(MAXDIFF_COLLECTION)
     create_imagecollection(HARVEST_COLLECTION)
+    create_imagecollection(HOTSPOT_COLLECTION)
     # create_imagecollection(SEVERITY_COLLECTION)
+
+    print("Exporting annual hotspots...")
+    export_annual_hotspots()
+    export_unmanaged_lands()
+    print(
+        "Exports started. Check the Tasks tab in the Code Editor to monitor progress."
+        " https://code.earthengine.google.com/tasks"
+    )
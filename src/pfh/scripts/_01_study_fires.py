@@ -1,12 +1,143 @@
 import ee
+import numpy as np
+import pandas as pd
+import shapely
 
+from pfh import cache
 from pfh.composites import get_landsat_composites
+from pfh.regions import EXPORT_CRS
 from pfh.scripts.config import (
     CANDIDATE_FIRE_COLLECTION,
+    FIRST_YEAR,
+    HOTSPOT_COLLECTION,
+    LAST_YEAR,
+    REBURN_YEARS,
     STUDY_AREA_COLLECTION,
     STUDY_FIRE_COLLECTION,
+    UNMANAGED_LANDS,
 )
-from pfh.utils import calculate_percent_forest
+from pfh.spatial import difference_all, get_centroids, get_polygons
+from pfh.utils import calculate_zonal_means, get_forest_cover, get_reburn_index
+
+
+def get_candidate_fires() -> ee.FeatureCollection:
+    """Get MTBS wildfires within the study area and period, before unmanaged lands are
+    removed.
+    """
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    return mtbs.filter(
+        ee.Filter.And(
+            ee.Filter.eq("Incid_Type", "Wildfire"),
+            ee.Filter.gt("Ig_Date", ee.Date.fromYMD(FIRST_YEAR, 1, 1).millis()),
+            ee.Filter.lt("Ig_Date", ee.Date.fromYMD(LAST_YEAR + 1, 1, 1).millis()),
+            ee.Filter.bounds(ee.FeatureCollection(STUDY_AREA_COLLECTION)),
+        )
+    )
+
+
+def get_unmanaged_ownerships() -> dict[str, ee.FeatureCollection]:
+    """Get the wilderness and NPS ownerships that are excluded from study fires."""
+    wdpa = ee.FeatureCollection("WCMC/WDPA/current/polygons")
+    fee = ee.FeatureCollection("USGS/GAP/PAD-US/v20/fee")
+    return {
+        "wilderness": wdpa.filter(ee.Filter.eq("DESIG", "Wilderness")),
+        "nps": fee.filter(ee.Filter.eq("Mang_Name", "NPS")),
+    }
+
+
+def get_unmanaged_lands(
+    region: ee.Geometry, *, cell_size: float = 50_000, max_error: float = 10
+) -> ee.FeatureCollection:
+    """Dissolve all unmanaged ownerships within a region into one simplified part per
+    grid cell. This is exported once (see `UNMANAGED_LANDS`), so each fire only needs
+    one difference with the few parts it overlaps (see `remove_unmanaged_lands`).
+
+    Parameters
+    ----------
+    region : ee.Geometry
+        The region to cover, e.g. the study area.
+    cell_size : float, optional
+        The size of each grid cell in the export CRS, in meters.
+    max_error : float, optional
+        The maximum error when dissolving and simplifying ownerships, in meters.
+    """
+    ownerships = get_unmanaged_ownerships()
+    unmanaged = ownerships["wilderness"].merge(ownerships["nps"])
+    cells = region.coveringGrid(ee.Projection(EXPORT_CRS).atScale(cell_size))
+
+    def dissolve_cell(cell: ee.Feature) -> ee.Feature:
+        part = (
+            unmanaged.filterBounds(cell.geometry())
+            .geometry(max_error)
+            .dissolve(max_error)
+            .intersection(cell.geometry(), max_error)
+            .simplify(max_error)
+        )
+        return ee.Feature(part, {"area": part.area(max_error)})
+
+    return cells.map(dissolve_cell).filter(ee.Filter.gt("area", 0))
+
+
+def remove_unmanaged_lands(
+    fire: ee.Feature, unmanaged_lands: ee.FeatureCollection
+) -> ee.Feature:
+    """Remove dissolved unmanaged lands (see `get_unmanaged_lands`) from a fire
+    geometry.
+
+    Candidate fires are used by later Earth Engine steps and exported with their
+    managed extents, so they are differenced on the server. Managed extents from
+    `get_managed_extents` would need to be uploaded again, and the geometries of every
+    candidate fire exceed the size limit of an Earth Engine request.
+    """
+    parts = unmanaged_lands.filterBounds(fire.geometry())
+    return fire.difference(ee.Feature(parts.geometry()))
+
+
+def get_managed_extents(
+    fires: ee.FeatureCollection,
+    unmanaged_lands: ee.FeatureCollection,
+    *,
+    max_error: float = 10,
+    max_workers: int | None = None,
+) -> np.ndarray:
+    """Remove dissolved unmanaged lands (see `get_unmanaged_lands`) from fire polygons
+    locally. This is the local equivalent of `remove_unmanaged_lands`, where each fire
+    is differenced with the STR-indexed parts it overlaps in a process pool (see
+    `spatial.difference_all`).
+
+    Returns
+    -------
+    np.ndarray
+        The managed extent of each fire as a shapely geometry in the export CRS.
+    """
+    fire_polygons = get_polygons(fires, max_error=max_error)
+    parts = get_polygons(unmanaged_lands.filterBounds(fires), max_error=max_error)
+    return difference_all(fire_polygons, parts, max_workers=max_workers)
+
+
+def remove_unmanaged_ownerships(fire: ee.Feature) -> ee.Feature:
+    """Remove wilderness and NPS ownerships from a fire geometry, dissolving the
+    ownerships for each fire. This is much slower than `remove_unmanaged_lands`, and is
+    used as a reference to check the dissolved unmanaged lands.
+    """
+    managed_fire_extent = fire
+    for ownerships in get_unmanaged_ownerships().values():
+        fire_ownerships = ownerships.filterBounds(fire.geometry()).union().first()
+        managed_fire_extent = managed_fire_extent.difference(fire_ownerships)
+
+    return managed_fire_extent
+
+
+def drop_small_fires(
+    fires: ee.FeatureCollection, min_area: float = 900
+) -> ee.FeatureCollection:
+    """Drop fires smaller than a minimum area in square meters, e.g. fires that contain
+    less than one 30m pixel after removing unmanaged lands.
+    """
+    return fires.map(
+        lambda fire: ee.Algorithms.If(fire.area().gt(min_area), fire, None),
+        dropNulls=True,
+    )
 
 
 def get_study_fires(
@@ -41,39 +172,65 @@ def get_study_fires(
     )
 
 
-def get_nearest_ecoregion(fire: ee.Feature) -> ee.String:
-    """Identify the nearest ecoregion to each fire centroid.
+def get_nearest_regions(fires: ee.FeatureCollection) -> pd.DataFrame:
+    """Identify the nearest ecoregion and state to each fire centroid.
 
-    This is necessary to account for the fact that some centroids can fall outside of
-    an ecoregion.
+    Nearest regions are used to account for the fact that some centroids can fall
+    outside of an ecoregion or state. Region polygons and fire centroids are downloaded
+    once and matched locally with an STR-tree, rather than measuring the distance to
+    every region for every fire in Earth Engine.
+
+    Returns
+    -------
+    pd.DataFrame
+        The `ecoregion` and `state` of each fire, indexed by `Event_ID`.
     """
     study_regions = ee.FeatureCollection(STUDY_AREA_COLLECTION)
+    states = ee.FeatureCollection("TIGER/2018/States")
+    orcawa = states.filter(ee.Filter.inList("STUSPS", ["OR", "CA", "WA"]))
 
-    centroid = fire.geometry().centroid()
-    ecoregion_dists = study_regions.map(
-        lambda r: r.set("distance", r.distance(centroid))
-    )
-    return ecoregion_dists.sort("distance").first().getString("NA_L3NAME")
+    # Fires are listed without the cache, as their properties are exported, but the
+    # fixed region assets are cached
+    centroids = get_centroids(fires)
+    event_ids = fires.aggregate_array("Event_ID").getInfo()
+    regions = pd.DataFrame(index=pd.Index(event_ids, name="Event_ID"))
 
+    for column, collection, name in [
+        ("ecoregion", study_regions, "NA_L3NAME"),
+        ("state", orcawa, "STUSPS"),
+    ]:
+        tree = shapely.STRtree(get_polygons(collection))
+        _, nearest = tree.query_nearest(centroids, all_matches=False)
+        names = np.array(cache.get_info(collection.aggregate_array(name)))
+        regions[column] = names[nearest]
 
-def get_nearest_state(fire: ee.Feature) -> ee.String:
-    """Identify the nearest state to each fire centroid.
+    return regions
 
-    This is necessary to account for the fact that some centroids can fall outside of
-    an state.
-    """
-    states = ee.FeatureCollection("TIGER/2018/States")
-    orcawa = states.filter(ee.Filter.inList("STUSPS", ["OR", "CA", "WA"]))
 
-    centroid = fire.geometry().centroid()
-    state_dists = orcawa.map(lambda r: r.set("distance", r.distance(centroid)))
-    return state_dists.sort("distance").first().getString("STUSPS")
+def set_fire_properties(
+    fires: ee.FeatureCollection, properties: pd.DataFrame
+) -> ee.FeatureCollection:
+    """Join a table of properties indexed by `Event_ID` to each fire, e.g. nearest
+    regions from `get_nearest_regions`. Fires missing from the table are unchanged.
+    """
+    lookup = ee.Dictionary(properties.to_dict("index"))
+    return fires.map(
+        lambda fire: fire.set(lookup.get(fire.get("Event_ID"), ee.Dictionary()))
+    )
 
 
 def get_fire_metadata(fire: ee.Feature) -> ee.Feature:
-    """Generate metadata for a single MTBS fire to use for study fire filtering."""
-    percent_forest = calculate_percent_forest(fire)
-    image_pairs = get_landsat_composites(fire, years=5, mask_forest=False)[0]
+    """Generate metadata for a single MTBS fire to use for study fire filtering.
+    Percent forest is calculated for all fires at once (see `calculate_zonal_means`).
+    """
+    hotspots = (
+        ee.ImageCollection(HOTSPOT_COLLECTION)
+        .filter(ee.Filter.eq("year", ee.Date(fire.get("Ig_Date")).get("year")))
+        .first()
+    )
+    image_pairs = get_landsat_composites(
+        fire, years=5, mask_forest=False, hotspots=hotspots
+    )[0]
 
     return fire.set({
         "ignition_date": ee.Date(fire.get("Ig_Date")).millis(),
@@ -85,46 +242,40 @@ def get_fire_metadata(fire: ee.Feature) -> ee.Feature:
             .millis()
         ),
         "end_date": ee.Date(image_pairs["start"].get("system:time_end")).millis(),
-        "percent_forest": percent_forest,
-        "ecoregion": get_nearest_ecoregion(fire),
-        "state": get_nearest_state(fire),
     })
 
 
 if __name__ == "__main__":
     ee.Initialize()
     mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
-    wdpa = ee.FeatureCollection("WCMC/WDPA/current/polygons")
-    fee = ee.FeatureCollection("USGS/GAP/PAD-US/v20/fee")
-    wilderness = wdpa.filter(ee.Filter.eq("DESIG", "Wilderness"))
-    nps = fee.filter(ee.Filter.eq("Mang_Name", "NPS"))
+    unmanaged_lands = ee.FeatureCollection(UNMANAGED_LANDS)
 
-    candidate_fires = mtbs.filter(
-        ee.Filter.And(
-            ee.Filter.eq("Incid_Type", "Wildfire"),
-            ee.Filter.gt("Ig_Date", ee.Date("1986-01-01").millis()),
-            ee.Filter.lt("Ig_Date", ee.Date("2018-01-01").millis()),
-            ee.Filter.bounds(ee.FeatureCollection(STUDY_AREA_COLLECTION)),
-        )
+    # Exclude any unmanaged areas
+    candidate_fires = drop_small_fires(
+        get_candidate_fires().map(lambda f: remove_unmanaged_lands(f, unmanaged_lands))
     )
 
-    def remove_unmanaged_ownerships(fire: ee.Feature) -> ee.Feature:
-        """Remove wilderness and NPS ownerships from a fire geometry."""
-        fire_wilderness = wilderness.filterBounds(fire.geometry()).union().first()
-        fire_nps = nps.filterBounds(fire.geometry()).union().first()
-
-        managed_fire_extent = fire.difference(fire_wilderness).difference(fire_nps)
-
-        # If the resulting fire contains less than one 30m pixel, drop it
-        return ee.Feature(
-            ee.Algorithms.If(
-                managed_fire_extent.area().gt(900), managed_fire_extent, None
+    # Index reburns by any later MTBS fire, including those after the study period, so
+    # that composites only check those fires when masking reburns
+    reburns = get_reburn_index(
+        mtbs.filter(
+            ee.Filter.And(
+                ee.Filter.gte("Ig_Date", ee.Date.fromYMD(FIRST_YEAR, 1, 1).millis()),
+                ee.Filter.lt(
+                    "Ig_Date",
+                    ee.Date.fromYMD(LAST_YEAR + REBURN_YEARS + 1, 1, 1).millis(),
+                ),
+                ee.Filter.bounds(ee.FeatureCollection(STUDY_AREA_COLLECTION)),
             )
-        )
+        ),
+        years=REBURN_YEARS,
+    )
+    fire_properties = get_nearest_regions(candidate_fires).join(reburns)
+    fire_properties["reburns"] = fire_properties["reburns"].fillna("")
 
-    # Exclude any unmanaged areas
-    candidate_fires = candidate_fires.map(remove_unmanaged_ownerships, dropNulls=True)
-    fires_with_metadata = candidate_fires.map(get_fire_metadata)
+    fires_with_metadata = calculate_zonal_means(
+        set_fire_properties(candidate_fires, fire_properties), get_forest_cover
+    ).map(get_fire_metadata)
 
     # Only exclude late-season fires
     study_fires = get_study_fires(
@@ -1,15 +1,44 @@
+from functools import partial
+from typing import Any
+
 import ee
 
-from pfh import composites, spectral
+from pfh import composites, regions, spectral, utils
 from pfh.scripts.config import (
+    EXPORT_STATE,
     MAXDIFF_COLLECTION,
     STUDY_FIRE_COLLECTION,
 )
+from pfh.tasks import ExportJob, run_exports
+
+
+def build_fire_maxdiff(fire: ee.Feature) -> dict[str, Any]:
+    """Build each step of the maximum spectral difference composite for a single fire,
+    keyed by the name of the function that builds it.
+    """
+    pairs = composites.get_landsat_composites(fire, mask_forest=True)
+    matched = composites.match_pairs(
+        pairs=pairs,
+        method="sed",
+        percentile=80,
+        bands=["SWIR2", "Green", "Red"],
+        geometry=fire.geometry(),
+    )
+    maxdiff = composites.max_difference(matched, timing_band="SWIR2")
+    clustered = spectral.snic_cluster(maxdiff, cluster_bands=ee.List(["SWIR2", "Red"]))
+
+    return {
+        "get_landsat_composites": pairs,
+        "match_pairs": matched,
+        "max_difference": maxdiff,
+        "snic_cluster": clustered,
+    }
 
 
 def generate_fire_maxdiff(fire: ee.Feature) -> ee.Image:
     """Generate a maximum spectral difference and timing composite for a single fire."""
-    pairs = composites.get_landsat_composites(fire, mask_forest=True)
+    steps = build_fire_maxdiff(fire)
+    pairs = steps["get_landsat_composites"]
 
     # Check if any start or end composites was created without valid input images
     pair_imgs = ee.ImageCollection([
@@ -17,76 +46,86 @@ def generate_fire_maxdiff(fire: ee.Feature) -> ee.Image:
     ])
     missing_img = ee.Number(pair_imgs.aggregate_min("num_images")).eq(0)
 
-    pairs = composites.match_pairs(
-        pairs=pairs,
-        method="sed",
-        percentile=80,
-        bands=["SWIR2", "Green", "Red"],
-        geometry=fire.geometry(),
-    )
-    maxdiff = composites.max_difference(pairs, timing_band="SWIR2")
-    clustered = spectral.snic_cluster(maxdiff, cluster_bands=ee.List(["SWIR2", "Red"]))
+    return ee.Algorithms.If(missing_img, None, steps["snic_cluster"])
 
-    return ee.Algorithms.If(missing_img, None, clustered)
 
+def get_maxdiff_years(fires: ee.FeatureCollection) -> list[int]:
+    """Get the sorted, distinct ignition years of a collection of MTBS fires.
 
-def generate_maxdiffs(fires: ee.FeatureCollection) -> None:
-    """Generate maximum spectral difference and timing composites from a collection of
-    MTBS study fires. One composite will be exported per year.
+    Years decide which composites are exported, so they are always listed from the
+    current fires rather than the cache.
     """
-    fire_years = (
+    return (
         fires.aggregate_array("Ig_Date")
         .map(lambda dt: ee.Date(dt).get("year"))
         .distinct()
         .sort()
         .getInfo()
     )
-    for year in fire_years:
-        start_date = ee.Date.fromYMD(year, 1, 1)
-        end_date = start_date.advance(1, "year")
-
-        year_fires = fires.filter(
-            ee.Filter.And(
-                ee.Filter.gte("Ig_Date", start_date.millis()),
-                ee.Filter.lt("Ig_Date", end_date.millis()),
-            )
-        )
-        year_maxdiffs = ee.ImageCollection(
-            year_fires.map(generate_fire_maxdiff, dropNulls=True)
-        )
-
-        metadata = {
-            "year": year,
-            "system:time_start": start_date.millis(),
-            "system:time_end": end_date.millis(),
-        }
-        maxdiff = year_maxdiffs.mosaic().set(metadata)
-
-        # Export to asset
-        asset_id = f"{MAXDIFF_COLLECTION}/{year}"
-        print(f"Exporting {asset_id}...")
-
-        task = ee.batch.Export.image.toAsset(
-            image=maxdiff,
-            description=f"maxdiff_{year}",
-            assetId=asset_id,
-            region=year_fires.geometry().bounds(),
-            scale=30,
-            crs="EPSG:5070",
-            maxPixels=1e13,
-        )
-
-        task.start()
 
 
-if __name__ == "__main__":
-    ee.Initialize()
-    # Calculate maxdiff for all candidate fires with valid pixels
-    fires = ee.FeatureCollection(STUDY_FIRE_COLLECTION).filter(
-        ee.Filter.gt("percent_forest", 0)
+def export_maxdiff_tile(
+    fires: ee.FeatureCollection,
+    year: int,
+    region: ee.Geometry,
+    event_ids: list[str],
+    tile: str,
+) -> ee.batch.Task:
+    """Build an unstarted export of the maxdiff composite for the fires assigned to
+    one export region of a year (see `regions.get_export_regions`).
+    """
+    start_date = ee.Date.fromYMD(year, 1, 1)
+    end_date = start_date.advance(1, "year")
+
+    # Select fires by assignment rather than by bounds, so that fires that cross into
+    # neighboring regions are only exported with their own region
+    region_fires = fires.filter(ee.Filter.inList("Event_ID", event_ids))
+    region_maxdiffs = ee.ImageCollection(
+        region_fires.map(generate_fire_maxdiff, dropNulls=True)
     )
-    generate_maxdiffs(fires)
-    print(
-        "Exports started. Check the Tasks tab in the Code Editor to monitor progress."
-        " https://code.earthengine.google.com/tasks"
+
+    metadata = {
+        "year": year,
+        "system:time_start": start_date.millis(),
+        "system:time_end": end_date.millis(),
+    }
+    maxdiff = region_maxdiffs.mosaic().set(metadata)
+
+    return ee.batch.Export.image.toAsset(
+        image=maxdiff,
+        description=f"maxdiff_{tile}",
+        assetId=f"{MAXDIFF_COLLECTION}/{tile}",
+        region=region,
+        scale=30,
+        crs=regions.EXPORT_CRS,
+        maxPixels=1e13,
     )
+
+
+def get_maxdiff_jobs(fires: ee.FeatureCollection, years: list[int]) -> list[ExportJob]:
+    """Get jobs to export maximum spectral difference and timing composites from a
+    collection of MTBS study fires. Each year's fires are grouped into compact export
+    regions, and one composite tile named `{year}_{region}` is exported per region.
+    """
+    jobs = []
+    for year in years:
+        year_regions = regions.get_export_regions(utils.filter_fire_year(fires, year))
+        for i, (region, event_ids) in enumerate(year_regions):
+            tile = f"{year}_{i}"
+            build = partial(export_maxdiff_tile, fires, year, region, event_ids, tile)
+            jobs.append(ExportJob(f"maxdiff_{tile}", build))
+    return jobs
+
+
+def get_maxdiff_fires() -> ee.FeatureCollection:
+    """Get all candidate fires with valid pixels."""
+    return ee.FeatureCollection(STUDY_FIRE_COLLECTION).filter(
+        ee.Filter.gt("percent_forest", 0)
+    )
+
+
+if __name__ == "__main__":
+    ee.Initialize()
+    fires = get_maxdiff_fires()
+    jobs = get_maxdiff_jobs(fires, get_maxdiff_years(fires))
+    run_exports(jobs, state_path=EXPORT_STATE)
@@ -1,16 +1,20 @@
+from functools import partial
+
 import ee
 
+from pfh.regions import EXPORT_CRS
 from pfh.scripts.config import (
+    EXPORT_STATE,
     HARVEST_COLLECTION,
     MAXDIFF_COLLECTION,
     OTSU_THRESHOLDS,
-    STUDY_FIRE_COLLECTION,
 )
 from pfh.spectral import classify_harvests
+from pfh.tasks import ExportJob, run_exports
 
-if __name__ == "__main__":
-    ee.Initialize()
 
+def export_harvest_tile(tile: str) -> ee.batch.Task:
+    """Build an unstarted export of the harvest map over a single maxdiff tile."""
     thresholds = ee.FeatureCollection(OTSU_THRESHOLDS)
     swir2_threshold = (
         thresholds.filter(ee.Filter.eq("band", "SWIR2")).first().getNumber("threshold")
@@ -18,45 +22,37 @@ if __name__ == "__main__":
     red_threshold = (
         thresholds.filter(ee.Filter.eq("band", "Red")).first().getNumber("threshold")
     )
-
-    study_fires = ee.FeatureCollection(STUDY_FIRE_COLLECTION)
-    maxdiffs = ee.ImageCollection(MAXDIFF_COLLECTION)
     thresholds = ee.Image.constant([swir2_threshold, red_threshold])
 
-    harvests = maxdiffs.map(
-        lambda x: classify_harvests(x, bands=["SWIR2", "Red"], thresholds=thresholds)
+    maxdiff = ee.Image(f"{MAXDIFF_COLLECTION}/{tile}")
+    harvest = classify_harvests(
+        maxdiff, bands=["SWIR2", "Red"], thresholds=thresholds
+    ).byte()
+
+    return ee.batch.Export.image.toAsset(
+        image=harvest,
+        description=f"harvest_{tile}",
+        assetId=f"{HARVEST_COLLECTION}/{tile}",
+        region=maxdiff.geometry(),
+        scale=30,
+        crs=EXPORT_CRS,
+        maxPixels=1e13,
     )
-    years = harvests.aggregate_array("year").getInfo()
-
-    for year in years:
-        asset_id = f"{HARVEST_COLLECTION}/{year}"
-        harvest_year = harvests.filter(ee.Filter.eq("year", year)).first().byte()
-
-        region = (
-            study_fires.filter(
-                ee.Filter.And(
-                    ee.Filter.gte("Ig_Date", ee.Date.fromYMD(year, 1, 1)),
-                    ee.Filter.lt("Ig_Date", ee.Date.fromYMD(year + 1, 1, 1)),
-                )
-            )
-            .geometry()
-            .bounds()
-        )
-        print(f"Exporting {asset_id}...")
-
-        task = ee.batch.Export.image.toAsset(
-            image=harvest_year,
-            description=f"harvest_{year}",
-            assetId=asset_id,
-            region=region,
-            scale=30,
-            crs="EPSG:5070",
-            maxPixels=1e13,
-        )
-
-        task.start()
-
-    print(
-        "Exports started. Check the Tasks tab in the Code Editor to monitor progress."
-        " https://code.earthengine.google.com/tasks"
+
+
+def get_harvest_jobs(tiles: list[str]) -> list[ExportJob]:
+    """Get jobs to export one harvest map per maxdiff tile."""
+    return [
+        ExportJob(f"harvest_{tile}", partial(export_harvest_tile, tile))
+        for tile in tiles
+    ]
+
+
+if __name__ == "__main__":
+    ee.Initialize()
+    # List tiles without the cache, so that tiles exported since the last check
+    # aren't skipped
+    tiles = (
+        ee.ImageCollection(MAXDIFF_COLLECTION).aggregate_array("system:index").getInfo()
     )
+    run_exports(get_harvest_jobs(tiles), state_path=EXPORT_STATE)
@@ -1,7 +1,10 @@
+from functools import partial
+
 import ee
 
-from pfh import composites, landsat
+from pfh import composites, landsat, regions, utils
 from pfh.scripts.config import (
+    EXPORT_STATE,
     MAXDIFF_COLLECTION,
     OWNER_CLASSES,
     OWNERSHIP_MAP,
@@ -10,10 +13,11 @@ from pfh.scripts.config import (
     STUDY_FIRE_COLLECTION,
     VALIDATION_PLOTS,
 )
+from pfh.tasks import ExportJob, run_exports
 
 
-def export_ownership_map() -> None:
-    """Export a classified ownership raster based on GAP data."""
+def export_ownership_map() -> ee.batch.Task:
+    """Build an unstarted export of a classified ownership raster based on GAP data."""
     gap = ee.FeatureCollection("USGS/GAP/PAD-US/v20/fee")
     wdpa = ee.FeatureCollection("WCMC/WDPA/current/polygons")
     # https://catalog.data.gov/dataset/tiger-line-shapefile-2019-nation-u-s-current-tribal-census-tract-national
@@ -44,22 +48,25 @@ def export_ownership_map() -> None:
 
     study_region = ee.FeatureCollection(STUDY_AREA_COLLECTION)
 
-    task = ee.batch.Export.image.toAsset(
+    return ee.batch.Export.image.toAsset(
         # Avoid clipping to the study region to prevent cutting off portions of fires
         image=owner_mask,
         description="ownership_map",
         assetId=OWNERSHIP_MAP,
         region=study_region.geometry().bounds(),
         scale=30,
-        crs="EPSG:5070",
+        crs=regions.EXPORT_CRS,
         maxPixels=1e13,
         pyramidingPolicy={"owner": "mode"},
     )
-    task.start()
 
 
-def export_severity_maps() -> None:
-    """Export annual NBR maps for all study years (imm. and ext. assessments)."""
+def export_severity_tile(
+    year: int, region: ee.Geometry, event_ids: list[str], tile: str
+) -> ee.batch.Task:
+    """Build an unstarted export of the burn severity map for the fires assigned to one
+    export region of a year (see `regions.get_export_regions`).
+    """
 
     def apply_scale_and_offset(img: ee.Image) -> ee.Image:
         """Apply scale and offset to Landsat imagery."""
@@ -74,15 +81,13 @@ def export_severity_maps() -> None:
         end = ee.Date.fromYMD(year, 9, 20)
         fire_mask = ee.Image(1).clip(fire.geometry())
 
-        imgs = landsat.load_landsat()
-        postfire = pairs[0]["start"]
-        prefire = (
-            imgs.filterBounds(fire.geometry())
-            .filterDate(start.advance(-1, "year"), end.advance(-1, "year"))
-            .map(landsat.quality_mask)
-            .median()
-            .updateMask(fire_mask)
+        imgs = landsat.load_landsat(
+            bounds=fire.geometry(),
+            start_date=start.advance(-1, "year"),
+            end_date=end.advance(-1, "year"),
         )
+        postfire = pairs[0]["start"]
+        prefire = imgs.map(landsat.quality_mask).median().updateMask(fire_mask)
 
         prefire = apply_scale_and_offset(prefire)
         postfire = apply_scale_and_offset(postfire)
@@ -94,49 +99,68 @@ def export_severity_maps() -> None:
         return rdnbr.gt([166.5, 235.5, 649]).reduce(ee.Reducer.sum()).rename("severity")
 
     study_fires = ee.FeatureCollection(STUDY_FIRE_COLLECTION)
-    years = (
-        study_fires.aggregate_array("Ig_Date")
+    start_date = ee.Date.fromYMD(year, 1, 1)
+    end_date = start_date.advance(1, "year")
+    region_fires = study_fires.filter(ee.Filter.inList("Event_ID", event_ids))
+
+    severity = (
+        ee.ImageCollection(region_fires.map(get_severity))
+        .mosaic()
+        .set({
+            "year": year,
+            "system:time_start": start_date.millis(),
+            "system:time_end": end_date.millis(),
+        })
+    )
+
+    return ee.batch.Export.image.toAsset(
+        image=severity.uint8(),
+        description=f"severity_{tile}",
+        assetId=f"{SEVERITY_COLLECTION}/{tile}",
+        region=region,
+        scale=30,
+        crs=regions.EXPORT_CRS,
+        maxPixels=1e13,
+    )
+
+
+def get_study_years() -> list[int]:
+    """Get the sorted, distinct ignition years of all study fires, uncached so that
+    years added by re-running step 1 are exported.
+    """
+    return (
+        ee.FeatureCollection(STUDY_FIRE_COLLECTION)
+        .aggregate_array("Ig_Date")
         .map(lambda d: ee.Date(d).get("year"))
         .distinct()
         .sort()
         .getInfo()
     )
 
-    for year in years:
-        print(f"Exporting severity map for {year}")
-        start_date = ee.Date.fromYMD(year, 1, 1)
-        end_date = start_date.advance(1, "year")
-
-        year_fires = study_fires.filter(
-            ee.Filter.And(
-                ee.Filter.gte("Ig_Date", start_date.millis()),
-                ee.Filter.lt("Ig_Date", end_date.millis()),
-            )
-        )
 
-        severity = (
-            ee.ImageCollection(year_fires.map(get_severity))
-            .mosaic()
-            .set({
-                "system:time_start": start_date.millis(),
-                "system:time_end": end_date.millis(),
-            })
-        )
+def get_ancillary_jobs(years: list[int]) -> list[ExportJob]:
+    """Get jobs to export validation plots, the ownership map, and severity maps for
+    all study years (imm. and ext. assessments). Each year's fires are grouped into
+    compact export regions, and one severity tile is exported per region.
+    """
+    jobs = [
+        ExportJob("validation_plots", export_validation_plots),
+        ExportJob("ownership_map", export_ownership_map),
+    ]
 
-        task = ee.batch.Export.image.toAsset(
-            image=severity.uint8(),
-            description=f"severity_{year}",
-            assetId=f"{SEVERITY_COLLECTION}/{year}",
-            region=year_fires.geometry().bounds(),
-            scale=30,
-            crs="EPSG:5070",
-            maxPixels=1e13,
-        )
-        task.start()
+    study_fires = ee.FeatureCollection(STUDY_FIRE_COLLECTION)
+    for year in years:
+        year_fires = utils.filter_fire_year(study_fires, year)
+        for i, (region, event_ids) in enumerate(regions.get_export_regions(year_fires)):
+            tile = f"{year}_{i}"
+            build = partial(export_severity_tile, year, region, event_ids, tile)
+            jobs.append(ExportJob(f"severity_{tile}", build))
 
+    return jobs
 
-def export_validation_plots() -> None:
-    """Generate and export validation plots, stratified by spectral change.
+
+def export_validation_plots() -> ee.batch.Task:
+    """Build an unstarted export of validation plots, stratified by spectral change.
 
     Note: Study fires were adjusted slightly after validation plots were generated and
     interpreted (5 fires were excluded as out-of-bounds), so this will NOT generate the
@@ -186,27 +210,13 @@ def export_validation_plots() -> None:
         )
     )
 
-    task = ee.batch.Export.table.toAsset(
+    return ee.batch.Export.table.toAsset(
         collection=samples,
         description="validation_plots",
         assetId=VALIDATION_PLOTS + "_v2",
     )
-    task.start()
 
 
 if __name__ == "__main__":
     ee.Initialize()
-
-    print("Exporting validation plots...")
-    export_validation_plots()
-
-    print("Exporting ownership map...")
-    export_ownership_map()
-
-    print("Exporting severity maps...")
-    export_severity_maps()
-
-    print(
-        "Exports started. Check the Tasks tab in the Code Editor to monitor progress."
-        " https://code.earthengine.google.com/tasks"
-    )
+    run_exports(get_ancillary_jobs(get_study_years()), state_path=EXPORT_STATE)
@@ -1,5 +1,6 @@
 import ee
 
+from pfh.regions import get_annual_mosaics
 from pfh.scripts.config import (
     HARVEST_COLLECTION,
     MAXDIFF_COLLECTION,
@@ -9,18 +10,19 @@ from pfh.scripts.config import (
     STUDY_AREA_COLLECTION,
     STUDY_FIRE_COLLECTION,
 )
-from pfh.utils import calculate_patch_areas, get_fire_year, get_pixel_area
+from pfh.utils import calculate_patch_areas, get_fire_year, get_grouped_pixel_area
 
 ee.Initialize()
 
 
-SEVERITY_CLASSES = ee.Dictionary({"Very low": 0, "Low": 1, "Moderate": 2, "High": 3})
+SEVERITY_CLASSES = {"Very low": 0, "Low": 1, "Moderate": 2, "High": 3}
 
 
 # Pixel values corresponding to each harvest year in the harvest maps
-TIMINGS = ee.List([1, 2, 3, 4, 5])
-HARVEST = ee.ImageCollection(HARVEST_COLLECTION)
-SEVERITY = ee.ImageCollection(SEVERITY_COLLECTION)
+TIMINGS = [1, 2, 3, 4, 5]
+# Harvest and severity maps are exported in tiles, so mosaic them by year
+HARVEST = get_annual_mosaics(ee.ImageCollection(HARVEST_COLLECTION))
+SEVERITY = get_annual_mosaics(ee.ImageCollection(SEVERITY_COLLECTION))
 STUDY_FIRES = ee.FeatureCollection(STUDY_FIRE_COLLECTION)
 STUDY_AREA = ee.FeatureCollection(STUDY_AREA_COLLECTION)
 OWNERSHIP = ee.Image(OWNERSHIP_MAP)
@@ -36,111 +38,99 @@ ANALYSIS_OWNERS = {
     k: v for k, v in OWNER_CLASSES.items() if k not in ["wilderness", "nps"]
 }
 
-OWNERS = ee.ImageCollection([
-    OWNERSHIP.eq(val).set("owner", name) for name, val in ANALYSIS_OWNERS.items()
-])
+
+def get_stratum_code(owner: int, severity: int, harvest: int) -> int:
+    """Encode an owner class, severity class, and harvest value (0 for unharvested or
+    the timing year) into a single stratum code.
+    """
+    return owner * 100 + severity * 10 + harvest
 
 
 def calculate_stratified_area(
-    harvest_mask: ee.Image,
-    fire: ee.Feature,
-    owner_mask: ee.Image,
-    timing: ee.Number,
-    severity: ee.String,
-) -> ee.Feature:
-    """Given a single annual image of harvest timing, a fire feature, an ownership mask,
-    a timing year, and a severity class name, calculate the total area and harvested
-    area in the region for that strata.
+    harvest_mask: ee.Image, fire: ee.Feature
+) -> ee.FeatureCollection:
+    """Given a single annual image of harvest timing and a fire feature, calculate the
+    total area and harvested area in the fire for every combination of ownership,
+    timing year, and severity class.
+
+    Areas for all strata are calculated in a single grouped reduction, by encoding
+    the ownership, severity, and harvest value of each pixel into one stratum code.
     """
-    ecoregion = fire.get("ecoregion")
-    state = fire.get("state")
-    event_id = fire.get("Event_ID")
     year = fire.get("year")
-    owner_name = owner_mask.get("owner")
+    metadata = {
+        "event_id": fire.get("Event_ID"),
+        "year": year,
+        "ecoregion": fire.get("ecoregion"),
+        "state": fire.get("state"),
+    }
 
     year_severity = SEVERITY.filterDate(
         ee.Date.fromYMD(year, 1, 1), ee.Date.fromYMD(year, 12, 31)
     ).first()
-
-    # Build strata masks
-    timing_mask = harvest_mask.eq(ee.Image.constant(timing))
-    severity_mask = year_severity.eq(SEVERITY_CLASSES.getNumber(severity))
-
-    analysis_mask = (
-        harvest_mask.mask()
+    # Mask owners that are excluded from analysis
+    owner_classes = list(ANALYSIS_OWNERS.values())
+    owner = OWNERSHIP.remap(owner_classes, owner_classes).int()
+
+    strata = (
+        owner.multiply(get_stratum_code(1, 0, 0))
+        .add(year_severity.multiply(get_stratum_code(0, 1, 0)))
+        .add(harvest_mask)
         .clip(fire.geometry())
-        .updateMask(owner_mask)
-        .updateMask(severity_mask)
     )
-    harvest_mask = analysis_mask.updateMask(timing_mask)
-
-    # Area for all analysis pixels in the region (i.e. burned forest pixels)
-    analysis_area = get_pixel_area(analysis_mask, fire, unit="ha")
-    # Area for all harvested pixels in the region
-    harvest_area = get_pixel_area(harvest_mask, fire, unit="ha")
-
-    metadata = ee.Dictionary({
-        "event_id": event_id,
-        "year": year,
-        "ecoregion": ecoregion,
-        "state": state,
-        "owner": owner_name,
-        "timing": timing,
-        "severity": severity,
-        "analysis_area": analysis_area,
-        "harvest_area": harvest_area,
-    })
-
-    return ee.Feature(None, metadata)
+    areas = get_grouped_pixel_area(strata, fire, unit="ha")
+
+    def get_area(owner_class: int, severity_class: int, harvest: int) -> ee.Number:
+        """Get the area of one stratum, which is 0 if it contains no pixels."""
+        code = get_stratum_code(owner_class, severity_class, harvest)
+        return ee.Number(areas.get(str(code), 0))
+
+    features = []
+    for owner_name, owner_class in ANALYSIS_OWNERS.items():
+        # Area for all analysis pixels in each severity class (i.e. burned forest
+        # pixels), regardless of harvest timing
+        analysis_areas = {}
+        for severity_class in SEVERITY_CLASSES.values():
+            analysis_area = ee.Number(0)
+            for harvest in [0, *TIMINGS]:
+                analysis_area = analysis_area.add(
+                    get_area(owner_class, severity_class, harvest)
+                )
+            analysis_areas[severity_class] = analysis_area
+
+        for timing in TIMINGS:
+            for severity, severity_class in SEVERITY_CLASSES.items():
+                features.append(
+                    ee.Feature(
+                        None,
+                        {
+                            **metadata,
+                            "owner": owner_name,
+                            "timing": timing,
+                            "severity": severity,
+                            "analysis_area": analysis_areas[severity_class],
+                            # Area for all harvested pixels in the strata
+                            "harvest_area": get_area(
+                                owner_class, severity_class, timing
+                            ),
+                        },
+                    )
+                )
+
+    return ee.FeatureCollection(features)
 
 
 def area_by_fire(harvest_mask: ee.Image):
-    """Calculate harvested and total area for a given annual image by ecoregion."""
+    """Calculate harvested and total area for a given annual image by fire."""
     year = harvest_mask.get("year")
     year_fires = STUDY_FIRES.filter(ee.Filter.eq("year", year))
 
     return ee.FeatureCollection(
-        year_fires.map(lambda fire: area_by_ownership(harvest_mask, fire))
-    ).flatten()
-
-
-def area_by_ownership(harvest_mask: ee.Image, fire: ee.Feature):
-    """Calculate harvested and total area for a given image by ownership in a given
-    fire.
-    """
-    return ee.FeatureCollection(
-        OWNERS.map(lambda owner: area_by_timing(harvest_mask, fire, owner))
-    ).flatten()
-
-
-def area_by_timing(harvest_mask: ee.Image, fire: ee.Feature, owner_mask: ee.Image):
-    """Calculate harvested and total area for a given image by timing year in a given
-    fire and ownership.
-    """
-    return ee.FeatureCollection(
-        TIMINGS.map(
-            lambda timing: area_by_severity(harvest_mask, fire, owner_mask, timing)
-        )
+        year_fires.map(lambda fire: calculate_stratified_area(harvest_mask, fire))
     ).flatten()
 
 
-def area_by_severity(
-    harvest_mask: ee.Image, fire: ee.Feature, owner_mask: ee.Image, timing: ee.Number
-):
-    """Calculate harvested and total area for a given image by severity class in a given
-    fire, ownership, and timing.
-    """
-    return ee.FeatureCollection(
-        SEVERITY_CLASSES.keys().map(
-            lambda severity: calculate_stratified_area(
-                harvest_mask, fire, owner_mask, timing, severity
-            )
-        )
-    )
-
-
 def export_stratified_results():
-    """Iterate over every combination of:
+    """Calculate analysis area and harvested area for every combination of:
 
         1. Year
         2. Fire
@@ -148,7 +138,8 @@ def export_stratified_results():
         4. Timing year
         5. Severity class
 
-    Calculate analysis area and harvested area in each strata.
+    Each fire is reduced once, with all ownership, timing, and severity strata
+    calculated together.
     """
     results = ee.FeatureCollection(HARVEST.map(area_by_fire)).flatten()
 
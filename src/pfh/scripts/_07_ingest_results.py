@@ -0,0 +1,41 @@
+"""Ingest CSV results exported to Google Drive by `_06_process_results` into a
+columnar store that the analysis notebooks can load quickly with
+`pfh.store.read_table`, partitioned by fire year.
+
+Download the exported CSVs into the results directory before running.
+"""
+
+import argparse
+from pathlib import Path
+
+from pfh.scripts.config import OWNER_CLASSES
+from pfh.store import ingest_csv, read_table
+
+RESULTS_DIR = Path("data") / "results"
+RESULT_TABLES = ["stratified_results", "patch_metrics"]
+
+# Ordered categories of dictionary-encoded columns
+CATEGORIES = {
+    "owner": list(OWNER_CLASSES),
+    "severity": ["Very low", "Low", "Moderate", "High"],
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--store-dir", type=Path, default=RESULTS_DIR / "store")
+    args = parser.parse_args()
+
+    for table in RESULT_TABLES:
+        csv = args.results_dir / f"{table}.csv"
+        if not csv.exists():
+            print(f"Skipping {table}, {csv} does not exist.")
+            continue
+
+        ingest_csv(csv, args.store_dir / table, categories=CATEGORIES)
+        df = read_table(args.store_dir / table)
+        print(
+            f"Ingested {len(df):,} rows of {table} "
+            f"({df.memory_usage(deep=True).sum() / 2**20:.1f} MiB in memory)."
+        )
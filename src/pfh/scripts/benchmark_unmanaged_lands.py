@@ -0,0 +1,146 @@
+"""Compare removing dissolved unmanaged lands from candidate fires, on the server or
+locally in a process pool, to dissolving unmanaged ownerships separately for each fire.
+
+For each year of candidate fires, this reports the time to calculate the managed area
+of every fire with each method, and checks that the symmetric difference between each
+method's managed extents and the per-fire reference is within a tolerance of each
+fire's area.
+"""
+
+import argparse
+import sys
+import time
+
+import ee
+import numpy as np
+import pandas as pd
+import shapely
+
+from pfh import cache
+from pfh.scripts._01_study_fires import (
+    get_candidate_fires,
+    get_managed_extents,
+    remove_unmanaged_lands,
+    remove_unmanaged_ownerships,
+)
+from pfh.scripts.config import FIRST_YEAR, LAST_YEAR, UNMANAGED_LANDS
+from pfh.spatial import get_polygons
+from pfh.utils import filter_fire_year
+
+
+def time_managed_areas(managed_fires: ee.FeatureCollection) -> float:
+    """Time calculating the managed area of every fire, in seconds."""
+    start = time.perf_counter()
+    managed_fires.map(lambda fire: fire.set("area", fire.area(1))).aggregate_array(
+        "area"
+    ).getInfo()
+    return time.perf_counter() - start
+
+
+def compare_managed_extents(
+    fires: ee.FeatureCollection, unmanaged_lands: ee.FeatureCollection
+) -> pd.DataFrame:
+    """Calculate the symmetric difference between managed extents from each method as
+    a proportion of each fire's area.
+    """
+
+    def compare(fire: ee.Feature) -> ee.Feature:
+        reference = remove_unmanaged_ownerships(fire).geometry()
+        dissolved = remove_unmanaged_lands(fire, unmanaged_lands).geometry()
+        difference = reference.symmetricDifference(dissolved, 1).area(1)
+        return ee.Feature(
+            None,
+            {
+                "Event_ID": fire.get("Event_ID"),
+                "difference": difference.divide(fire.area(1)),
+            },
+        )
+
+    comparison = fires.map(compare)
+    return pd.DataFrame({
+        column: comparison.aggregate_array(column).getInfo()
+        for column in ["Event_ID", "difference"]
+    })
+
+
+def compare_local_extents(
+    fires: ee.FeatureCollection,
+    unmanaged_lands: ee.FeatureCollection,
+    *,
+    max_error: float = 1,
+) -> tuple[pd.DataFrame, float]:
+    """Calculate the symmetric difference between managed extents from
+    `get_managed_extents` and the per-fire reference, as a proportion of each fire's
+    area, and time the local extents in seconds, including getting their polygons
+    (which may be cached by a previous run).
+    """
+    start = time.perf_counter()
+    local = get_managed_extents(fires, unmanaged_lands, max_error=max_error)
+    seconds = time.perf_counter() - start
+
+    fire_polygons = get_polygons(fires, max_error=max_error)
+    reference = get_polygons(
+        fires.map(remove_unmanaged_ownerships), max_error=max_error
+    )
+
+    difference = shapely.area(shapely.symmetric_difference(local, reference))
+    comparison = pd.DataFrame({
+        "Event_ID": cache.get_info(fires.aggregate_array("Event_ID")),
+        "difference": difference / np.maximum(shapely.area(fire_polygons), 1),
+    })
+    return comparison, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "years", nargs="*", type=int, default=range(FIRST_YEAR, LAST_YEAR + 1)
+    )
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    ee.Initialize()
+    unmanaged_lands = ee.FeatureCollection(UNMANAGED_LANDS)
+
+    results, mismatches = [], []
+    for year in args.years:
+        fires = filter_fire_year(get_candidate_fires(), year)
+        comparison = compare_managed_extents(fires, unmanaged_lands)
+        local_comparison, local_seconds = compare_local_extents(fires, unmanaged_lands)
+        for method, compared in [("server", comparison), ("local", local_comparison)]:
+            mismatch = compared[compared.difference > args.tolerance]
+            mismatches.append(mismatch.assign(method=method))
+        results.append({
+            "year": year,
+            "fires": len(comparison),
+            "per_fire_seconds": time_managed_areas(
+                fires.map(remove_unmanaged_ownerships)
+            ),
+            "dissolved_seconds": time_managed_areas(
+                fires.map(lambda f: remove_unmanaged_lands(f, unmanaged_lands))
+            ),
+            "local_seconds": local_seconds,
+            "max_difference": comparison.difference.max(),
+            "max_local_difference": local_comparison.difference.max(),
+        })
+        print(f"Compared {len(comparison)} fires from {year}.")
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    total = results[
+        ["fires", "per_fire_seconds", "dissolved_seconds", "local_seconds"]
+    ].sum()
+    print(
+        f"\n{total.fires:,} fires: {total.per_fire_seconds:.1f}s per fire, "
+        f"{total.dissolved_seconds:.1f}s dissolved "
+        f"({total.per_fire_seconds / total.dissolved_seconds:.1f}x faster), "
+        f"{total.local_seconds:.1f}s locally "
+        f"({total.per_fire_seconds / total.local_seconds:.1f}x faster)"
+    )
+
+    mismatches = pd.concat(mismatches)
+    if len(mismatches):
+        print(f"Managed extents differ by more than {args.tolerance:.1%}:")
+        print(mismatches.to_string(index=False))
+        sys.exit(1)
+    print(f"All managed extents match within {args.tolerance:.1%}.")
@@ -15,6 +15,18 @@ VALIDATION_PLOTS = f"{ASSET_DIRECTORY}/validation"
 INTERPRETATIONS = f"{ASSET_DIRECTORY}/interpretations"
 OWNERSHIP_MAP = f"{ASSET_DIRECTORY}/ownership"
 OTSU_THRESHOLDS = f"{ASSET_DIRECTORY}/otsu_thresholds"
+HOTSPOT_COLLECTION = f"{ASSET_DIRECTORY}/hotspots"
+UNMANAGED_LANDS = f"{ASSET_DIRECTORY}/unmanaged_lands"
+
+# Local file used to track and resume export tasks
+EXPORT_STATE = "export_state.json"
+
+# Years of candidate fires
+FIRST_YEAR = 1986
+LAST_YEAR = 2017
+
+# Post-fire years indexed for reburns, which must cover the years of composites
+REBURN_YEARS = 5
 
 SEVERITY_CLASSES = {
     0: "Very low / unburned",
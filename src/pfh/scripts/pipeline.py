@@ -0,0 +1,55 @@
+"""Run steps 2 through 5 as a single dependency graph of export tasks.
+
+Tasks start as soon as their inputs are exported rather than waiting for each step to
+finish. Severity maps, the ownership map, and maxdiffs run together; thresholds wait for
+all maxdiffs; each harvest tile waits for the thresholds and its maxdiff tile. If the
+run is interrupted, running it again resumes from the saved task state.
+"""
+
+import ee
+
+from pfh.scripts._02_build_composites import (
+    get_maxdiff_fires,
+    get_maxdiff_jobs,
+    get_maxdiff_years,
+)
+from pfh.scripts._03_otsu_thresholds import get_threshold_job
+from pfh.scripts._04_harvest_maps import get_harvest_jobs
+from pfh.scripts._05_ancillary_data import get_ancillary_jobs, get_study_years
+from pfh.scripts.config import EXPORT_STATE
+from pfh.tasks import COMPLETED, ExportJob, run_exports
+
+
+def get_pipeline_jobs(
+    maxdiff_years: list[int], study_years: list[int]
+) -> list[ExportJob]:
+    """Get all export jobs for steps 2 through 5 with their dependencies."""
+    maxdiff_jobs = get_maxdiff_jobs(get_maxdiff_fires(), maxdiff_years)
+    maxdiff_names = [job.name for job in maxdiff_jobs]
+
+    threshold_job = get_threshold_job()
+    threshold_job.depends_on = maxdiff_names
+
+    tiles = [name.removeprefix("maxdiff_") for name in maxdiff_names]
+    harvest_jobs = get_harvest_jobs(tiles)
+    for tile, job in zip(tiles, harvest_jobs, strict=True):
+        job.depends_on = [f"maxdiff_{tile}", threshold_job.name]
+
+    ancillary_jobs = get_ancillary_jobs(study_years)
+    for job in ancillary_jobs:
+        # Validation plots are sampled from the maxdiffs
+        if job.name == "validation_plots":
+            job.depends_on = maxdiff_names
+
+    return [*maxdiff_jobs, threshold_job, *harvest_jobs, *ancillary_jobs]
+
+
+if __name__ == "__main__":
+    ee.Initialize()
+    jobs = get_pipeline_jobs(get_maxdiff_years(get_maxdiff_fires()), get_study_years())
+    states = run_exports(jobs, state_path=EXPORT_STATE)
+
+    failed = {name: state for name, state in states.items() if state != COMPLETED}
+    if failed:
+        raise RuntimeError(f"Some exports did not complete: {failed}")
+    print("All exports completed.")
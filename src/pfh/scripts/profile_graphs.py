@@ -0,0 +1,69 @@
+"""Profile the computation graphs built for sample fires and check for regressions.
+
+Graphs that are too large or deep cause "computation too complex" and memory limit
+errors, so this reports the size of the graph built by each step for each fire and
+compares it to a stored baseline. Run with `--update` to accept the current sizes as
+the new baseline.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import ee
+import pandas as pd
+
+from pfh.profiling import check_baseline, load_baseline, profile_graph, save_baseline
+from pfh.scripts._02_build_composites import build_fire_maxdiff, generate_fire_maxdiff
+from pfh.scripts._06_process_results import HARVEST, calculate_stratified_area
+from pfh.scripts.config import STUDY_FIRE_COLLECTION
+
+BASELINE = Path(__file__).with_name("graph_baseline.json")
+DEFAULT_FIRES = ["OR4236212395219870830"]
+
+
+def profile_fire(fire: ee.Feature) -> dict[str, dict[str, int]]:
+    """Profile the graph built by each step of mapping a single fire."""
+    profiles = {
+        name: profile_graph(obj) for name, obj in build_fire_maxdiff(fire).items()
+    }
+    profiles["generate_fire_maxdiff"] = profile_graph(generate_fire_maxdiff(fire))
+
+    harvest_mask = HARVEST.filter(ee.Filter.eq("year", fire.get("year"))).first()
+    profiles["calculate_stratified_area"] = profile_graph(
+        calculate_stratified_area(ee.Image(harvest_mask), fire)
+    )
+
+    return profiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("event_ids", nargs="*", default=DEFAULT_FIRES)
+    parser.add_argument("--update", action="store_true", help="Save a new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    ee.Initialize()
+    study_fires = ee.FeatureCollection(STUDY_FIRE_COLLECTION)
+
+    profiles = {}
+    for event_id in args.event_ids:
+        fire = study_fires.filter(ee.Filter.eq("Event_ID", event_id)).first()
+        for name, profile in profile_fire(ee.Feature(fire)).items():
+            profiles[f"{event_id}/{name}"] = profile
+
+    print(pd.DataFrame(profiles).T.to_string())
+
+    if args.update:
+        save_baseline(profiles, BASELINE)
+        print(f"Saved baseline to {BASELINE}")
+        sys.exit()
+
+    regressions = check_baseline(
+        profiles, load_baseline(BASELINE), tolerance=args.tolerance
+    )
+    if regressions:
+        print("Graph size regressions:", *regressions, sep="\n  ")
+        sys.exit(1)
+    print("No graph size regressions.")
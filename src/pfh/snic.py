@@ -0,0 +1,299 @@
+import heapq
+from collections.abc import Iterator
+
+import numpy as np
+
+NEIGHBORS = {
+    4: ((-1, 0), (0, -1), (0, 1), (1, 0)),
+    8: ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)),
+}
+
+# Row and column slices of a 2D array
+Slices = tuple[slice, slice]
+
+
+def _segment(
+    image: np.ndarray,
+    *,
+    size: int,
+    compactness: float,
+    connectivity: int,
+    origin: tuple[int, int] = (0, 0),
+    grid_cols: int | None = None,
+) -> np.ndarray:
+    """Run SNIC over a window of a larger image, labeling clusters by the index of
+    their seed in the global seed grid so that overlapping windows share labels.
+    """
+    n_bands, rows, cols = image.shape
+    grid_cols = -(-cols // size) if grid_cols is None else grid_cols
+    row0, col0 = origin
+    offset = size // 2
+
+    # Python lists are much faster than NumPy arrays for per-pixel access
+    values = image.transpose(1, 2, 0).tolist()
+    valid = (~np.isnan(image).any(axis=0)).tolist()
+    labels = [[-1] * cols for _ in range(rows)]
+    neighbors = NEIGHBORS[connectivity]
+    spatial_weight = compactness / size**2
+
+    seed_ids = []
+    heap = []
+    for r in range((offset - row0) % size, rows, size):
+        for c in range((offset - col0) % size, cols, size):
+            if not valid[r][c]:
+                continue
+            seed_id = ((r + row0) // size) * grid_cols + (c + col0) // size
+            heap.append((0.0, r, c, len(seed_ids)))
+            seed_ids.append(seed_id)
+    heapq.heapify(heap)
+
+    # Running sums of each cluster's pixel count, position, and values
+    counts = [0] * len(seed_ids)
+    row_sums = [0.0] * len(seed_ids)
+    col_sums = [0.0] * len(seed_ids)
+    value_sums = [[0.0] * n_bands for _ in seed_ids]
+
+    while heap:
+        _, r, c, k = heapq.heappop(heap)
+        if labels[r][c] != -1:
+            continue
+        labels[r][c] = k
+
+        counts[k] += 1
+        row_sums[k] += r
+        col_sums[k] += c
+        sums = value_sums[k]
+        for b, v in enumerate(values[r][c]):
+            sums[b] += v
+
+        n = counts[k]
+        center_row = row_sums[k] / n
+        center_col = col_sums[k] / n
+        center = [s / n for s in sums]
+
+        for dr, dc in neighbors:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            if labels[nr][nc] != -1 or not valid[nr][nc]:
+                continue
+            dist = spatial_weight * ((nr - center_row) ** 2 + (nc - center_col) ** 2)
+            for v, m in zip(values[nr][nc], center, strict=True):
+                dist += (v - m) ** 2
+            heapq.heappush(heap, (dist, nr, nc, k))
+
+    lookup = np.array([*seed_ids, -1], dtype=np.int64)
+    return lookup[np.array(labels, dtype=np.int64)]
+
+
+def _tile_windows(
+    rows: int, cols: int, *, tile_size: int, halo: int
+) -> Iterator[tuple[Slices, tuple[int, int], Slices, Slices]]:
+    """Yield the slices of each tile, the origin and slices of its window expanded by
+    a halo, and the slices of the tile within its window.
+    """
+    for row0 in range(0, rows, tile_size):
+        for col0 in range(0, cols, tile_size):
+            row1 = min(row0 + tile_size, rows)
+            col1 = min(col0 + tile_size, cols)
+            win_row0, win_col0 = max(row0 - halo, 0), max(col0 - halo, 0)
+            win_row1, win_col1 = min(row1 + halo, rows), min(col1 + halo, cols)
+            yield (
+                (slice(row0, row1), slice(col0, col1)),
+                (win_row0, win_col0),
+                (slice(win_row0, win_row1), slice(win_col0, win_col1)),
+                (
+                    slice(row0 - win_row0, row1 - win_row0),
+                    slice(col0 - win_col0, col1 - win_col0),
+                ),
+            )
+
+
+def compute_snic(
+    image: np.ndarray,
+    *,
+    size: int = 5,
+    compactness: float = 1,
+    connectivity: int = 8,
+    neighborhoodSize: int | None = None,
+    tile_size: int | None = None,
+) -> np.ndarray:
+    """Segment a local image into superpixels using Simple Non-Iterative Clustering.
+
+    This is a local approximation of `ee.Algorithms.Image.Segmentation.SNIC`, using the
+    same keyword arguments so that results can be compared. Seeds are placed on a
+    square grid, and clusters grow from the seeds in order of their combined spectral
+    and spatial distance.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        The image to segment, with shape (bands, rows, cols). Masked pixels should be
+        NaN.
+    size : int, optional
+        The spacing of the seed grid, in pixels.
+    compactness : float, optional
+        The weight of spatial distance. Larger values create more compact clusters, and
+        0 disables spatial weighting.
+    connectivity : int, optional
+        The pixel connectivity, either 4 or 8.
+    neighborhoodSize : int, optional
+        The number of pixels of overlap between tiles, used to avoid tiling artifacts.
+        Tiled labels match untiled labels when every cluster near a tile edge fits
+        within the overlap. Defaults to twice the seed spacing.
+    tile_size : int, optional
+        The width and height of each tile, in pixels. If none is given, the image is
+        segmented in a single tile.
+
+    Returns
+    -------
+    np.ndarray
+        An int64 array of cluster labels with shape (rows, cols), or -1 where pixels
+        are masked.
+    """
+    return _tiled_snic(
+        np.asarray(image, dtype=np.float64),
+        size=size,
+        compactness=compactness,
+        connectivity=connectivity,
+        neighborhood_size=neighborhoodSize,
+        tile_size=tile_size,
+    )[0]
+
+
+def compute_cluster_medians(image: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Replace every pixel in a local image with the median of its cluster.
+
+    This is the local equivalent of `ee.Image.reduceConnectedComponents` with a median
+    reducer. Medians are found by sorting all pixels by cluster and value once per
+    band, rather than reducing each cluster separately.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        The image to smooth, with shape (bands, rows, cols). Masked pixels should be
+        NaN.
+    labels : np.ndarray
+        Cluster labels with shape (rows, cols), or -1 for unlabeled pixels.
+
+    Returns
+    -------
+    np.ndarray
+        The smoothed image, which is NaN where pixels are unlabeled.
+    """
+    image = np.asarray(image, dtype=np.float64)
+    labeled = labels >= 0
+    _, inverse = np.unique(labels[labeled], return_inverse=True)
+    n_clusters = inverse.max() + 1 if inverse.size else 0
+
+    smoothed = np.full(image.shape, np.nan)
+    for band, smoothed_band in zip(image, smoothed, strict=True):
+        values = band[labeled]
+        finite = ~np.isnan(values)
+        clusters = inverse[finite]
+        values = values[finite]
+
+        sorted_values = values[np.lexsort((values, clusters))]
+        counts = np.bincount(clusters, minlength=n_clusters)
+        starts = np.cumsum(counts) - counts
+        has_values = counts > 0
+
+        # Average the middle two values of clusters with an even number of pixels
+        lower = (starts + (counts - 1) // 2)[has_values]
+        upper = (starts + counts // 2)[has_values]
+        medians = np.full(n_clusters, np.nan)
+        medians[has_values] = (sorted_values[lower] + sorted_values[upper]) / 2
+
+        smoothed_band[labeled] = medians[inverse]
+
+    return smoothed
+
+
+def _tiled_snic(
+    image: np.ndarray,
+    cluster_bands: list[int] | None = None,
+    *,
+    size: int,
+    compactness: float,
+    connectivity: int,
+    neighborhood_size: int | None,
+    tile_size: int | None,
+    smooth: bool = False,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Segment an image in overlapping tiles, returning the labels and, optionally,
+    the image smoothed by cluster medians within each tile's window.
+    """
+    if connectivity not in NEIGHBORS:
+        raise ValueError(f"Connectivity must be 4 or 8, not {connectivity}.")
+
+    _, rows, cols = image.shape
+    tile_size = max(rows, cols) if tile_size is None else tile_size
+    halo = 2 * size if neighborhood_size is None else neighborhood_size
+    grid_cols = -(-cols // size)
+
+    labels = np.empty((rows, cols), dtype=np.int64)
+    smoothed = np.empty(image.shape, dtype=np.float64) if smooth else None
+    for tile, origin, window, core in _tile_windows(
+        rows, cols, tile_size=tile_size, halo=halo
+    ):
+        # Each tile is expanded by a halo so that clusters crossing tile edges are
+        # segmented and smoothed consistently in neighboring tiles
+        window_image = np.asarray(image[:, window[0], window[1]], dtype=np.float64)
+        window_labels = _segment(
+            window_image if cluster_bands is None else window_image[cluster_bands],
+            size=size,
+            compactness=compactness,
+            connectivity=connectivity,
+            origin=origin,
+            grid_cols=grid_cols,
+        )
+        labels[tile] = window_labels[core]
+        if smoothed is not None:
+            smoothed_window = compute_cluster_medians(window_image, window_labels)
+            smoothed[:, tile[0], tile[1]] = smoothed_window[:, core[0], core[1]]
+
+    return labels, smoothed
+
+
+def compute_snic_cluster(
+    image: np.ndarray,
+    cluster_bands: list[int],
+    *,
+    size: int = 5,
+    compactness: float = 1,
+    connectivity: int = 8,
+    neighborhoodSize: int | None = None,
+    tile_size: int | None = None,
+) -> np.ndarray:
+    """Apply SNIC clustering to a local image. Clusters are based on the given bands,
+    but applied to all bands.
+
+    This is the local equivalent of `spectral.snic_cluster`, and accepts the same SNIC
+    keyword arguments, so the same arguments can be passed to both. Large images can
+    be processed in tiles with bounded memory.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        The image to cluster, with shape (bands, rows, cols). Masked pixels should be
+        NaN.
+    cluster_bands : list[int]
+        The indices of the bands used to build clusters.
+    size, compactness, connectivity, neighborhoodSize, tile_size : optional
+        SNIC and tiling parameters (see `compute_snic`).
+
+    Returns
+    -------
+    np.ndarray
+        The image with each pixel replaced by the median of its cluster.
+    """
+    return _tiled_snic(
+        image,
+        cluster_bands,
+        size=size,
+        compactness=compactness,
+        connectivity=connectivity,
+        neighborhood_size=neighborhoodSize,
+        tile_size=tile_size,
+        smooth=True,
+    )[1]
@@ -0,0 +1,170 @@
+import concurrent.futures
+import json
+
+import ee
+import numpy as np
+import shapely
+
+from pfh import cache
+from pfh.regions import EXPORT_CRS
+
+
+def rasterize_polygons(
+    polygons: np.ndarray,
+    shape: tuple[int, int],
+    transform: tuple[float, float, float, float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the pixels of a north-up grid whose centers fall inside each polygon.
+
+    Only the pixel centers within the bounds of each polygon are tested, so the cost
+    scales with the area of the polygons rather than the size of the grid.
+
+    Parameters
+    ----------
+    polygons : np.ndarray
+        An array of shapely polygons or multipolygons in the grid CRS, e.g. from
+        `get_polygons`.
+    shape : tuple[int, int]
+        The (height, width) of the grid.
+    transform : tuple[float, float, float, float]
+        The grid transform as (pixel width, left x, pixel height, top y), e.g. from
+        `GeoTIFF.read_bounds`.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The flat index of each pixel inside a polygon and the index of that polygon.
+        Pixels inside overlapping polygons are returned once for each polygon.
+    """
+    height, width = shape
+    scale_x, left, scale_y, top = transform
+
+    # The range of pixel center rows and columns within each polygon's bounds
+    xmin, ymin, xmax, ymax = shapely.bounds(polygons).reshape(-1, 4).T
+    col0 = np.clip(np.ceil((xmin - left) / scale_x - 0.5), 0, width)
+    col1 = np.clip(np.floor((xmax - left) / scale_x - 0.5) + 1, 0, width)
+    row0 = np.clip(np.ceil((top - ymax) / scale_y - 0.5), 0, height)
+    row1 = np.clip(np.floor((top - ymin) / scale_y - 0.5) + 1, 0, height)
+
+    pixels, zones = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    # Empty polygons have NaN bounds, which fail every comparison
+    for zone in np.flatnonzero((col1 > col0) & (row1 > row0)):
+        r0, r1, c0, c1 = (int(bound[zone]) for bound in (row0, row1, col0, col1))
+        rows, cols = np.mgrid[r0:r1, c0:c1]
+        x = left + (cols + 0.5) * scale_x
+        y = top - (rows + 0.5) * scale_y
+        inside = shapely.contains_xy(polygons[zone], x, y)
+        pixels.append(rows[inside] * width + cols[inside])
+        zones.append(np.full(inside.sum(), zone, dtype=np.int64))
+
+    return np.concatenate(pixels), np.concatenate(zones)
+
+
+def get_polygons(
+    collection: ee.FeatureCollection, *, max_error: float = 30
+) -> np.ndarray:
+    """Get each polygon in a collection as a shapely geometry, simplified and projected
+    to the export CRS so that distances are in meters.
+    """
+    geometries = cache.get_info(
+        collection.toList(collection.size()).map(
+            lambda f: ee.Feature(f)
+            .geometry()
+            .simplify(max_error)
+            .transform(EXPORT_CRS, max_error)
+        )
+    )
+    return shapely.from_geojson([json.dumps(geometry) for geometry in geometries])
+
+
+def get_centroids(
+    collection: ee.FeatureCollection, *, max_error: float = 1
+) -> np.ndarray:
+    """Get the centroid of each feature in a collection as a shapely point in the
+    export CRS.
+
+    Centroids are requested with `getInfo` rather than the cache, as they are matched
+    to features that are exported (e.g. candidate fires), which may change before a
+    cached result expires.
+    """
+    coordinates = (
+        collection.map(
+            lambda f: ee.Feature(
+                None,
+                {
+                    "centroid": f.geometry()
+                    .centroid(max_error)
+                    .transform(EXPORT_CRS, max_error)
+                    .coordinates()
+                },
+            )
+        )
+        .aggregate_array("centroid")
+        .getInfo()
+    )
+    return shapely.points(np.array(coordinates, dtype=np.float64).reshape(-1, 2))
+
+
+# Geometries to remove and their STR-tree, set in each `difference_all` worker
+_others: np.ndarray | None = None
+_others_tree: shapely.STRtree | None = None
+
+
+def _init_difference(others: np.ndarray) -> None:
+    """Index the geometries to remove once per worker process."""
+    global _others, _others_tree
+    _others = others
+    _others_tree = shapely.STRtree(others)
+
+
+def _difference_chunk(geometries: np.ndarray) -> np.ndarray:
+    """Remove every intersecting indexed geometry from each geometry in a chunk."""
+    index, other = _others_tree.query(geometries, predicate="intersects")
+    result = geometries.copy()
+    for i in np.unique(index):
+        removed = shapely.union_all(_others[other[index == i]])
+        result[i] = shapely.difference(geometries[i], removed)
+    return result
+
+
+def difference_all(
+    geometries: np.ndarray,
+    others: np.ndarray,
+    *,
+    max_workers: int | None = None,
+    chunk_size: int = 64,
+) -> np.ndarray:
+    """Remove every intersecting geometry in `others` from each geometry, e.g. to
+    remove dissolved unmanaged lands from fires.
+
+    The geometries to remove are indexed in an STR-tree once per worker, and chunks of
+    geometries are differenced in parallel in a pool of processes.
+
+    Parameters
+    ----------
+    geometries : np.ndarray
+        An array of shapely geometries.
+    others : np.ndarray
+        An array of shapely geometries to remove, in the same CRS.
+    max_workers : int, optional
+        The number of processes. Defaults to the number of CPUs.
+    chunk_size : int, optional
+        The number of geometries sent to a process at once.
+
+    Returns
+    -------
+    np.ndarray
+        The difference of each geometry, in the same order.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    chunks = [
+        geometries[i : i + chunk_size] for i in range(0, len(geometries), chunk_size)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers,
+        initializer=_init_difference,
+        initargs=(np.asarray(others, dtype=object),),
+    ) as executor:
+        results = list(executor.map(_difference_chunk, chunks))
+
+    return np.concatenate([np.empty(0, dtype=object), *results])
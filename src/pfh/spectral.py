@@ -1,4 +1,5 @@
 import ee
+import numpy as np
 
 
 def pif_match(
@@ -98,6 +99,106 @@ def pif_match(
     return ee.Image(matched)
 
 
+def compute_pif_match(
+    source: np.ndarray,
+    target: np.ndarray,
+    *,
+    mask: np.ndarray | None = None,
+    percentile: int = 10,
+    method: str = "sed",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Apply pseudo-invariant feature matching to match a local source array to a
+    target.
+
+    This is the local equivalent of `pif_match`. The distance percentile is found by
+    partial sorting, and the regressions for every band are solved together from
+    sufficient statistics, rather than reducing each band separately.
+
+    Parameters
+    ----------
+    source : np.ndarray
+        The source array to match, with shape (bands, ...).
+    target : np.ndarray
+        The target array to match to, with the same shape as `source`.
+    mask : np.ndarray, optional
+        A boolean array with shape (...) of valid pixels, e.g. within a fire. Pixels
+        that are NaN in either array are always excluded.
+    percentile : int, optional
+        The percentile (0-100) of spectral distance to use as a threshold for change
+        detection.
+    method : str, optional
+        The method to use for spectral distance, either "sed" (Euclidean) or "sam"
+        (spectral angle).
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The matched array and the boolean mask of pseudo-invariant features.
+    """
+    source = np.asarray(source, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    if source.shape != target.shape:
+        raise ValueError(
+            f"Source shape {source.shape} does not match target shape {target.shape}."
+        )
+
+    n_bands = source.shape[0]
+    x = source.reshape(n_bands, -1)
+    y = target.reshape(n_bands, -1)
+
+    valid = np.isfinite(x).all(axis=0) & np.isfinite(y).all(axis=0)
+    if mask is not None:
+        valid &= np.asarray(mask, dtype=bool).reshape(-1)
+
+    if method == "sed":
+        dist = np.sqrt(((x - y) ** 2).sum(axis=0))
+    elif method == "sam":
+        norms = np.linalg.norm(x, axis=0) * np.linalg.norm(y, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dist = np.arccos(np.clip((x * y).sum(axis=0) / norms, -1, 1))
+    else:
+        raise ValueError(f"Unsupported spectral distance method `{method}`.")
+
+    # If no valid pixels are sampled, use a threshold of 0
+    valid_dist = dist[valid]
+    threshold = 0
+    if valid_dist.size:
+        k = round(percentile / 100 * (valid_dist.size - 1))
+        threshold = np.partition(valid_dist, k)[k]
+
+    pif_mask = valid & (dist < threshold)
+
+    # Fit target = scale * source + offset for every band at once
+    xp = x[:, pif_mask]
+    yp = y[:, pif_mask]
+    n = xp.shape[1]
+    sum_x = xp.sum(axis=1)
+    sum_y = yp.sum(axis=1)
+    sum_xy = np.einsum("ij,ij->i", xp, yp)
+    sum_xx = np.einsum("ij,ij->i", xp, xp)
+
+    denominator = n * sum_xx - sum_x**2
+    scale = np.divide(
+        n * sum_xy - sum_x * sum_y,
+        denominator,
+        out=np.zeros(n_bands),
+        where=denominator != 0,
+    )
+    offset = (sum_y - scale * sum_x) / n if n else np.zeros(n_bands)
+
+    # If no valid fit is found, use a scale of 1 and an offset of 0. Like `pif_match`,
+    # a scale of 0 is treated as missing, and each default is applied independently,
+    # so a band with a missing scale keeps its fitted offset.
+    scale[scale == 0] = 1
+    offset[~np.isfinite(offset)] = 0
+
+    # Broadcast per-band coefficients over the remaining dimensions
+    bands = (slice(None),) + (np.newaxis,) * (source.ndim - 1)
+    matched = source * scale[bands] + offset[bands]
+
+    return matched, pif_mask.reshape(source.shape[1:])
+
+
 def get_otsu_threshold(
     image: ee.Image, *, band: str | None = None, region: ee.Geometry | None = None
 ) -> ee.Number:
@@ -124,28 +225,72 @@ def get_otsu_threshold(
     mean_sum = means.multiply(counts).reduce(ee.Reducer.sum(), [0]).get([0])
     mean = mean_sum.divide(total)
 
-    indices = ee.List.sequence(1, size)
-
-    def get_bss(i):
-        a_counts = counts.slice(0, 0, i)
-        a_count = a_counts.reduce(ee.Reducer.sum(), [0]).get([0])
-        a_means = means.slice(0, 0, i)
-        a_mean = (
-            a_means.multiply(a_counts)
-            .reduce(ee.Reducer.sum(), [0])
-            .get([0])
-            .divide(a_count)
-        )
-        b_count = total.subtract(a_count)
-        b_mean = mean_sum.subtract(a_count.multiply(a_mean)).divide(b_count)
-        return a_count.multiply(a_mean.subtract(mean).pow(2)).add(
-            b_count.multiply(b_mean.subtract(mean).pow(2))
-        )
+    def repeat(x: ee.Number) -> ee.Array:
+        """Broadcast a scalar to an array matching the histogram length."""
+        return ee.Array(ee.List.repeat(x, size))
+
+    # Score every split point in one pass using cumulative sums, where split i assigns
+    # the first i + 1 buckets to class A and the rest to class B. Division by zero
+    # returns 0 in Earth Engine, matching empty classes at either end.
+    a_count = counts.accum(0)
+    a_mean = means.multiply(counts).accum(0).divide(a_count)
+    b_count = repeat(total).subtract(a_count)
+    b_mean = repeat(mean_sum).subtract(a_count.multiply(a_mean)).divide(b_count)
+    bss = a_count.multiply(a_mean.subtract(repeat(mean)).pow(2)).add(
+        b_count.multiply(b_mean.subtract(repeat(mean)).pow(2))
+    )
 
-    bss = indices.map(get_bss)
     return means.sort(bss).get([-1])
 
 
+def compute_otsu_thresholds(counts: np.ndarray, means: np.ndarray) -> np.ndarray:
+    """Calculate Otsu thresholds for a batch of histograms in one vectorized call.
+
+    This is the local equivalent of `get_otsu_threshold`, for histograms that were
+    already reduced in Earth Engine (e.g. one histogram per band, ecoregion, and year).
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Bucket counts with shape (..., n), where n is the number of buckets.
+    means : np.ndarray
+        Bucket means with the same shape as `counts`.
+
+    Returns
+    -------
+    np.ndarray
+        The threshold for each histogram, with shape (...).
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    means = np.asarray(means, dtype=np.float64)
+    if counts.shape != means.shape:
+        raise ValueError(
+            f"Counts shape {counts.shape} does not match means shape {means.shape}."
+        )
+
+    a_count = np.cumsum(counts, axis=-1)
+    a_sum = np.cumsum(means * counts, axis=-1)
+    total = a_count[..., -1:]
+    mean_sum = a_sum[..., -1:]
+
+    def divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Divide arrays, returning 0 for division by 0 to match Earth Engine."""
+        a, b = np.broadcast_arrays(a, b)
+        return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+    mean = divide(mean_sum, total)
+    a_mean = divide(a_sum, a_count)
+    b_count = total - a_count
+    b_mean = divide(mean_sum - a_sum, b_count)
+
+    bss = a_count * (a_mean - mean) ** 2 + b_count * (b_mean - mean) ** 2
+
+    # Select the last of any tied maxima, matching `ee.Array.sort(...).get([-1])`
+    n = bss.shape[-1]
+    idx = n - 1 - np.argmax(bss[..., ::-1], axis=-1)
+    return np.take_along_axis(means, idx[..., np.newaxis], axis=-1)[..., 0]
+
+
 def snic_cluster(image: ee.Image, cluster_bands: list[str], **snic_kwargs) -> ee.Image:
     """Apply SNIC clustering to an image. Clusters are based on the given bands, but
     applied to all bands.
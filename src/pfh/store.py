@@ -0,0 +1,169 @@
+import json
+import shutil
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = "schema.json"
+# Earth Engine table export columns that carry no data
+EXPORT_COLUMNS = ["system:index", ".geo"]
+
+
+def _encode(values: pd.Series, categories: Sequence | None) -> tuple[np.ndarray, dict]:
+    """Encode a column as a typed NumPy array and its schema entry. Non-numeric
+    columns are dictionary-encoded as integer codes, with -1 for missing values.
+    """
+    if categories is not None or not pd.api.types.is_numeric_dtype(values):
+        ordered = categories is not None
+        if ordered and not values.dropna().isin(categories).all():
+            raise ValueError(f"Column `{values.name}` has values not in categories.")
+        categorical = pd.Categorical(values, categories=categories, ordered=ordered)
+        # The smallest signed type that holds every code and -1
+        dtype = np.min_scalar_type(-max(len(categorical.categories), 1))
+        schema = {
+            "dtype": dtype.name,
+            "categories": categorical.categories.tolist(),
+            "ordered": ordered,
+        }
+        return categorical.codes.astype(dtype), schema
+
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+        encoded = pd.to_numeric(values, downcast="integer").to_numpy()
+    else:
+        encoded = values.to_numpy(dtype=np.float64)
+    return encoded, {"dtype": encoded.dtype.name}
+
+
+def write_table(
+    df: pd.DataFrame,
+    path: str | Path,
+    *,
+    partition_by: str = "year",
+    categories: Mapping[str, Sequence] | None = None,
+) -> None:
+    """Write a table to a columnar store, with one directory per partition (e.g. year)
+    and one NumPy file per column. Any existing table at the path is replaced.
+
+    Numeric columns are stored with the smallest integer type that holds them, or as
+    floats. Other columns (e.g. owner, severity, and ecoregion) are dictionary-encoded
+    as integer codes, so repeated strings are stored once in the schema.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The table to write.
+    path : str | Path
+        The table directory.
+    partition_by : str, optional
+        The integer column to partition rows by.
+    categories : Mapping[str, Sequence], optional
+        Ordered categories of columns to dictionary-encode, e.g. severity classes from
+        lowest to highest. Categories of other non-numeric columns are sorted.
+    """
+    path = Path(path)
+    categories = categories or {}
+    df = df.drop(columns=[c for c in EXPORT_COLUMNS if c in df.columns])
+    encoded, columns = {}, {}
+    for name in df.columns.drop(partition_by):
+        encoded[name], columns[name] = _encode(df[name], categories.get(name))
+
+    partition_values = df[partition_by].to_numpy()
+    partitions = np.unique(partition_values)
+    schema = {
+        "partition_by": partition_by,
+        "partition_dtype": pd.to_numeric(partitions, downcast="integer").dtype.name,
+        "partitions": {},
+        "columns": columns,
+    }
+
+    if path.exists():
+        shutil.rmtree(path)
+    for partition in partitions:
+        rows = np.flatnonzero(partition_values == partition)
+        directory = path / f"{partition_by}={partition}"
+        directory.mkdir(parents=True)
+        for name, values in encoded.items():
+            np.save(directory / f"{name}.npy", values[rows])
+        schema["partitions"][str(partition)] = len(rows)
+
+    path.mkdir(parents=True, exist_ok=True)
+    (path / SCHEMA_FILE).write_text(json.dumps(schema, indent=2))
+
+
+def ingest_csv(
+    csv: str | Path,
+    path: str | Path,
+    *,
+    partition_by: str = "year",
+    categories: Mapping[str, Sequence] | None = None,
+) -> None:
+    """Ingest a CSV table exported from Earth Engine (e.g. stratified_results.csv) into
+    a columnar store, dropping the `system:index` and `.geo` export columns. See
+    `write_table`.
+    """
+    write_table(
+        pd.read_csv(csv), path, partition_by=partition_by, categories=categories
+    )
+
+
+def read_table(
+    path: str | Path,
+    *,
+    columns: Sequence[str] | None = None,
+    partitions: Sequence[int] | None = None,
+) -> pd.DataFrame:
+    """Read a table from a columnar store, loading only the requested columns and
+    partitions. Dictionary-encoded columns are returned as categoricals.
+
+    Parameters
+    ----------
+    path : str | Path
+        The table directory.
+    columns : Sequence[str], optional
+        The columns to read. The partition column can be included. Defaults to all
+        columns.
+    partitions : Sequence[int], optional
+        The partitions to read, e.g. a list of years. Defaults to all partitions.
+
+    Returns
+    -------
+    pd.DataFrame
+        The table, with rows ordered by partition.
+    """
+    path = Path(path)
+    schema = json.loads((path / SCHEMA_FILE).read_text())
+    partition_by = schema["partition_by"]
+    available = {int(p): n for p, n in schema["partitions"].items()}
+    names = [partition_by, *schema["columns"]] if columns is None else list(columns)
+    unknown = set(names) - {partition_by, *schema["columns"]}
+    if unknown:
+        raise KeyError(f"Unknown columns {sorted(unknown)}.")
+
+    selected = sorted(available if partitions is None else set(partitions))
+    missing = set(selected) - set(available)
+    if missing:
+        raise KeyError(f"Unknown partitions {sorted(missing)}.")
+
+    data = {}
+    for name in names:
+        if name == partition_by:
+            data[name] = np.repeat(
+                np.array(selected, dtype=schema["partition_dtype"]),
+                [available[p] for p in selected],
+            )
+            continue
+
+        column = schema["columns"][name]
+        parts = [
+            np.load(path / f"{partition_by}={p}" / f"{name}.npy") for p in selected
+        ]
+        values = np.concatenate(parts) if parts else np.empty(0, column["dtype"])
+        if "categories" in column:
+            values = pd.Categorical.from_codes(
+                values, categories=column["categories"], ordered=column["ordered"]
+            )
+        data[name] = values
+
+    return pd.DataFrame(data, columns=names)
@@ -0,0 +1,447 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import http.client
+import json
+import random
+import re
+import socket
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+import ee
+import httplib2
+
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+SKIPPED = "SKIPPED"
+# The state of task IDs that Earth Engine doesn't recognize, e.g. old resumed tasks
+UNKNOWN = "UNKNOWN"
+TERMINAL_STATES = {COMPLETED, FAILED, CANCELLED, SKIPPED, UNKNOWN}
+
+# Messages of Earth Engine errors that may succeed on retry, used when the HTTP status
+# of an error is unknown
+TRANSIENT_MESSAGES = re.compile(
+    r"\b(429|5\d\d)\b|too many|rate limit|deadline|unavailable|internal error",
+    re.IGNORECASE,
+)
+
+# Network errors that may succeed on retry, e.g. dropped connections and DNS failures.
+# Other OS errors, e.g. missing local files, are raised.
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.gaierror,
+    http.client.HTTPException,
+    httplib2.ServerNotFoundError,
+)
+
+
+def is_transient(error: Exception) -> bool:
+    """Check whether an error may succeed on retry, e.g. a rate limit (429), a server
+    error (5xx), an exceeded deadline, or a dropped connection.
+    """
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    if not isinstance(error, ee.EEException):
+        return False
+
+    # Earth Engine raises HTTP errors as exceptions with only a message, but the
+    # original error and its status are kept as the context
+    http_error = error.__cause__ or error.__context__
+    status = getattr(http_error, "status_code", None)
+    if status is not None:
+        return int(status) == 429 or int(status) >= 500
+    return TRANSIENT_MESSAGES.search(str(error)) is not None
+
+
+@dataclass
+class ExportJob:
+    """An export task that can start once all of its dependencies have completed.
+
+    Parameters
+    ----------
+    name : str
+        A unique name for the job, e.g. `maxdiff_2012`.
+    build : Callable[[], ee.batch.Task]
+        A function that builds the unstarted export task. This is only called once
+        dependencies have completed, so it may reference their output assets.
+    depends_on : list[str], optional
+        The names of jobs that must complete before this job starts.
+    """
+
+    name: str
+    build: Callable[[], ee.batch.Task]
+    depends_on: list[str] = field(default_factory=list)
+
+
+class TaskService(Protocol):
+    """An interface for submitting export tasks and checking their states."""
+
+    def submit(self, job: ExportJob) -> str:
+        """Build and start a job's task, returning its task ID."""
+        ...
+
+    def get_states(self, task_ids: list[str]) -> dict[str, str]:
+        """Get the current state (e.g. RUNNING or COMPLETED) of each task ID."""
+        ...
+
+
+class EarthEngineTaskService:
+    """Submit and monitor tasks with the Earth Engine batch API."""
+
+    def submit(self, job: ExportJob) -> str:
+        task = job.build()
+        task.start()
+        return task.id
+
+    def get_states(self, task_ids: list[str]) -> dict[str, str]:
+        statuses = ee.data.getTaskStatus(task_ids)
+        # The Cloud API reports SUCCEEDED rather than COMPLETED
+        return {
+            s["id"]: COMPLETED if s["state"] == "SUCCEEDED" else s["state"]
+            for s in statuses
+        }
+
+
+async def submit_jobs(
+    jobs: Iterable[ExportJob],
+    *,
+    service: TaskService | None = None,
+    max_concurrent: int = 8,
+    rate_limit: float = 5,
+    retries: int = 3,
+    retry_delay: float = 1,
+    on_submit: Callable[[str, str | None], None] | None = None,
+) -> dict[str, str | None]:
+    """Build and submit export jobs concurrently, ignoring dependencies.
+
+    Building an export and starting it each require requests to Earth Engine, so
+    jobs are submitted from a pool of threads. Submissions are rate limited, and jobs
+    that raise transient errors (see `is_transient`) are retried with jittered
+    exponential backoff. Other errors are raised once submissions in progress
+    finish, and no more jobs are started.
+
+    Parameters
+    ----------
+    jobs : Iterable[ExportJob]
+        The jobs to submit.
+    service : TaskService, optional
+        The service used to submit tasks. Defaults to Earth Engine.
+    max_concurrent : int, optional
+        The maximum number of jobs to submit at once.
+    rate_limit : float, optional
+        The maximum number of submissions to start per second.
+    retries : int, optional
+        The number of times to retry a job after a transient error.
+    retry_delay : float, optional
+        The approximate number of seconds before the first retry. The delay doubles
+        after each retry.
+    on_submit : Callable[[str, str | None], None], optional
+        A function called with each job's name and task ID (or None if the job could
+        not be submitted) as soon as its submission finishes, e.g. to record started
+        tasks before an error is raised.
+
+    Returns
+    -------
+    dict[str, str | None]
+        The task ID of each job, or None if the job could not be submitted.
+    """
+    service = EarthEngineTaskService() if service is None else service
+    semaphore = asyncio.Semaphore(max_concurrent)
+    lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+    next_start = loop.time()
+    errors = []
+
+    async def wait_for_turn() -> None:
+        nonlocal next_start
+        async with lock:
+            now = loop.time()
+            delay = next_start - now
+            next_start = max(now, next_start) + 1 / rate_limit
+        await asyncio.sleep(max(delay, 0))
+
+    async def try_submit(job: ExportJob) -> str | None:
+        for attempt in range(retries + 1):
+            await wait_for_turn()
+            # Don't start more jobs once a job has raised an error
+            if errors:
+                raise errors[0]
+            try:
+                return await asyncio.to_thread(service.submit, job)
+            except Exception as e:
+                if not is_transient(e):
+                    errors.append(e)
+                    raise
+                if attempt == retries:
+                    print(f"Failed to start {job.name}: {e}")
+                    return None
+                # Jitter retries so that rate-limited jobs don't retry in lockstep
+                delay = retry_delay * 2**attempt * random.uniform(0.5, 1.5)
+                print(f"Retrying {job.name} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+        return None
+
+    async def submit(job: ExportJob) -> str | None:
+        async with semaphore:
+            task_id = await try_submit(job)
+        if on_submit is not None:
+            on_submit(job.name, task_id)
+        return task_id
+
+    jobs = list(jobs)
+    # Wait for every submission in progress so that no started task is lost
+    task_ids = await asyncio.gather(
+        *[submit(job) for job in jobs], return_exceptions=True
+    )
+    if errors:
+        raise errors[0]
+    return {job.name: task_id for job, task_id in zip(jobs, task_ids, strict=True)}
+
+
+async def watch_tasks(
+    task_ids: Iterable[str],
+    *,
+    service: TaskService | None = None,
+    poll_interval: float = 10,
+    max_poll_interval: float = 300,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> AsyncGenerator[tuple[str, str], Iterable[str] | None]:
+    """Yield (task ID, state) pairs whenever a task's state changes, until all tasks
+    finish. States are polled with exponential backoff while nothing changes.
+
+    Task IDs sent to the generator are watched along with the others, e.g. tasks that
+    were started after another task completed.
+    """
+    service = EarthEngineTaskService() if service is None else service
+    states = dict.fromkeys(task_ids)
+    interval = poll_interval
+
+    while True:
+        running = [i for i, state in states.items() if state not in TERMINAL_STATES]
+        current = await asyncio.to_thread(service.get_states, running)
+
+        changed = False
+        for task_id in running:
+            state = current.get(task_id, states[task_id])
+            if state != states[task_id]:
+                states[task_id] = state
+                changed = True
+                started = yield task_id, state
+                for new_id in started or ():
+                    states.setdefault(new_id, None)
+
+        if all(state in TERMINAL_STATES for state in states.values()):
+            return
+        backoff = min(interval * 2, max_poll_interval)
+        interval = poll_interval if changed else backoff
+        await sleep(interval)
+
+
+def _check_dependencies(jobs: dict[str, ExportJob]) -> None:
+    """Raise an error if any job has an unknown dependency or dependencies form a
+    cycle.
+    """
+    for job in jobs.values():
+        missing = set(job.depends_on) - set(jobs)
+        if missing:
+            raise ValueError(f"Job `{job.name}` depends on unknown jobs {missing}.")
+
+    visited, visiting = set(), set()
+
+    def visit(name: str) -> None:
+        if name in visiting:
+            raise ValueError(f"Job `{name}` has a circular dependency.")
+        if name in visited:
+            return
+        visiting.add(name)
+        for dependency in jobs[name].depends_on:
+            visit(dependency)
+        visiting.remove(name)
+        visited.add(name)
+
+    for name in jobs:
+        visit(name)
+
+
+def _load_state(state_path: Path | None) -> dict[str, dict[str, str]]:
+    """Load submitted tasks from a previous run, excluding tasks that should be
+    retried.
+    """
+    if state_path is None or not state_path.exists():
+        return {}
+
+    state = json.loads(state_path.read_text())
+    return {
+        name: task
+        for name, task in state.items()
+        if task["state"] not in {FAILED, CANCELLED, SKIPPED}
+    }
+
+
+async def run_exports_async(
+    jobs: Iterable[ExportJob],
+    *,
+    service: TaskService | None = None,
+    state_path: str | Path | None = None,
+    max_concurrent: int = 10,
+    poll_interval: float = 10,
+    max_poll_interval: float = 300,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    **kwargs,
+) -> dict[str, str]:
+    """Run export jobs in dependency order, waiting for all jobs to finish.
+
+    Jobs are submitted concurrently (see `submit_jobs`) as soon as their dependencies
+    complete, with at most `max_concurrent` tasks running at once. Jobs that depend on
+    a failed job are skipped, as are dependents of tasks that Earth Engine doesn't
+    recognize, which are failed. Task states are polled with exponential backoff while
+    nothing changes (see `watch_tasks`).
+
+    Parameters
+    ----------
+    jobs : Iterable[ExportJob]
+        The jobs to run.
+    service : TaskService, optional
+        The service used to submit and monitor tasks. Defaults to Earth Engine.
+    state_path : str | Path, optional
+        A JSON file used to record submitted tasks. If the file exists, tasks from a
+        previous run are resumed rather than resubmitted, except for failed tasks.
+        Tasks of other jobs in the file are kept, so runs of different jobs may share
+        a file.
+    max_concurrent : int, optional
+        The maximum number of tasks to run at once.
+    poll_interval : float, optional
+        The initial number of seconds between status checks.
+    max_poll_interval : float, optional
+        The maximum number of seconds between status checks.
+    sleep : Callable[[float], Awaitable[None]], optional
+        The coroutine function used to wait between status checks.
+    **kwargs
+        Additional arguments passed to `submit_jobs`, e.g. `rate_limit`.
+
+    Returns
+    -------
+    dict[str, str]
+        The final state of each job.
+    """
+    jobs = {job.name: job for job in jobs}
+    _check_dependencies(jobs)
+    service = EarthEngineTaskService() if service is None else service
+    state_path = None if state_path is None else Path(state_path)
+
+    tasks = {
+        name: task for name, task in _load_state(state_path).items() if name in jobs
+    }
+    names = {task["id"]: name for name, task in tasks.items()}
+
+    def save_state() -> None:
+        """Update this run's tasks in the state file, keeping tasks of other jobs,
+        e.g. from other scripts that share the file.
+        """
+        if state_path is None:
+            return
+        saved = json.loads(state_path.read_text()) if state_path.exists() else {}
+        state_path.write_text(json.dumps({**saved, **tasks}, indent=2))
+
+    async def start_ready_jobs() -> list[str]:
+        """Skip jobs that can never run and submit jobs that are ready, returning the
+        IDs of the submitted tasks.
+        """
+        task_ids = []
+
+        def record(name: str, task_id: str | None) -> None:
+            if task_id is None:
+                tasks[name] = {"id": None, "state": FAILED}
+            else:
+                tasks[name] = {"id": task_id, "state": "READY"}
+                names[task_id] = name
+                task_ids.append(task_id)
+
+        changed = True
+        try:
+            while changed:
+                changed = False
+                running = sum(t["state"] not in TERMINAL_STATES for t in tasks.values())
+                ready = []
+                for name, job in jobs.items():
+                    if name in tasks:
+                        continue
+                    states = [tasks.get(d, {}).get("state") for d in job.depends_on]
+                    if any(s in TERMINAL_STATES - {COMPLETED} for s in states):
+                        print(f"Skipping {name}: a dependency did not complete.")
+                        tasks[name] = {"id": None, "state": SKIPPED}
+                        changed = True
+                    elif running + len(ready) < max_concurrent and all(
+                        s == COMPLETED for s in states
+                    ):
+                        print(f"Starting {name}...")
+                        ready.append(job)
+
+                if ready:
+                    submitted = await submit_jobs(
+                        ready, service=service, on_submit=record, **kwargs
+                    )
+                    # Check again to skip dependents of jobs that failed to submit
+                    changed = changed or None in submitted.values()
+        finally:
+            # Save tasks started before an error so that they aren't resubmitted
+            save_state()
+        return task_ids
+
+    running = [t["id"] for t in tasks.values() if t["state"] not in TERMINAL_STATES]
+    running += await start_ready_jobs()
+
+    async with contextlib.aclosing(
+        watch_tasks(
+            running,
+            service=service,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            sleep=sleep,
+        )
+    ) as watcher:
+        started = None
+        while True:
+            try:
+                task_id, state = await watcher.asend(started)
+            except StopAsyncIteration:
+                break
+
+            name = names[task_id]
+            print(f"{name}: {state}")
+            if state == UNKNOWN:
+                # The task can't be watched, so fail it to resubmit it on the next run
+                state = FAILED
+            tasks[name]["state"] = state
+            # Start jobs as soon as a slot opens or their dependencies complete
+            started = await start_ready_jobs() if state in TERMINAL_STATES else None
+            save_state()
+
+    # Jobs can only be left waiting on a dependency that is not running if the
+    # scheduler has a bug, so fail loudly rather than return early
+    if len(tasks) < len(jobs):
+        raise RuntimeError("No jobs are running, but some have not started.")
+    return {name: task["state"] for name, task in tasks.items()}
+
+
+def run_exports(jobs: Iterable[ExportJob], **kwargs) -> dict[str, str]:
+    """Run export jobs in dependency order, waiting for all jobs to finish.
+
+    This runs `run_exports_async` in a single event loop, and accepts the same
+    arguments. If an event loop is already running, e.g. in Jupyter, the scheduler
+    runs in a separate thread with its own loop. `run_exports_async` can also be
+    awaited directly.
+    """
+    scheduler = run_exports_async(jobs, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scheduler)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, scheduler).result()
@@ -1,9 +1,16 @@
+from collections.abc import Callable
 from typing import Literal
 
 import ee
+import numpy as np
+import pandas as pd
+import shapely
+
+from pfh import cache, spatial
 
 AreaUnit = Literal["ha", "m2", "km2"]
 AREA_SCALERS = {"m2": 1, "ha": 1 / 10_000, "km2": 1 / 1_000_000}
+SEVERITY_METRIC_BINS = 1401
 
 
 def bit_mask(image: ee.Image, bit: ee.Number) -> ee.Image:
@@ -24,22 +31,136 @@ def later_date(date1: ee.Date, date2: ee.Date) -> ee.Date:
 
 
 def generate_reburn_mask(fire: ee.Feature, *, years: int = 5) -> ee.Image:
-    """Build a reburn mask (0=no, 1=reburn) within n years of fire."""
+    """Build a reburn mask (0=no, 1=reburn) within n years of fire.
+
+    If the fire has a `reburns` property listing the Event_IDs of later fires that
+    overlap it within at least n years (see `get_reburn_index`), only those fires are
+    checked. Otherwise, the MTBS collection is searched for intersecting fires, which
+    is much more expensive.
+    """
     date = ee.Date(fire.get("Ig_Date"))
     year = ee.Date.fromYMD(date.get("year"), 1, 1)
     mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
-
-    reburns = mtbs.filter(
+    later_fires = mtbs.filter(
         ee.Filter.And(
             ee.Filter.gt("Ig_Date", date.millis()),
             ee.Filter.lt("Ig_Date", year.advance(years + 1, "year").millis()),
-            ee.Filter.intersects(leftValue=fire.geometry(), rightField=".geo"),
+        )
+    )
+
+    # Only the selected branch is evaluated, so the spatial search is skipped if
+    # reburns were precomputed
+    has_index = fire.propertyNames().contains("reburns")
+    reburns = ee.FeatureCollection(
+        ee.Algorithms.If(
+            has_index,
+            later_fires.filter(
+                ee.Filter.inList("Event_ID", ee.String(fire.get("reburns")).split(","))
+            ),
+            later_fires.filter(
+                ee.Filter.intersects(leftValue=fire.geometry(), rightField=".geo")
+            ),
         )
     )
 
     return ee.Image(1).clip(reburns).unmask(0).clip(fire.geometry()).rename("reburn")
 
 
+def compute_reburn_index(
+    ignition_dates: np.ndarray,
+    polygons: np.ndarray,
+    *,
+    years: int = 5,
+    tolerance: float = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find every pair of fires where the second fire reburned the first within n
+    years, i.e. it ignited after the first fire but before the end of the nth year
+    after the first fire, and the fire polygons intersect.
+
+    Candidate pairs are found by querying an STR-tree of fire bounding boxes and
+    filtering by ignition date before the exact polygons are checked.
+
+    Parameters
+    ----------
+    ignition_dates : np.ndarray
+        The ignition date of each fire, in milliseconds since the epoch.
+    polygons : np.ndarray
+        An array of shapely fire polygons in a projected CRS (see
+        `spatial.get_polygons`).
+    years : int, optional
+        The number of years after each fire to search for reburns.
+    tolerance : float, optional
+        The distance within which fire polygons are considered to intersect, e.g. to
+        account for simplified polygons.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The indexes of each reburned fire and the fire that reburned it.
+    """
+    dates = np.asarray(ignition_dates).astype("datetime64[ms]")
+    end_dates = (dates.astype("datetime64[Y]") + years + 1).astype("datetime64[ms]")
+
+    polygons = np.asarray(polygons, dtype=object)
+    boxes = shapely.bounds(polygons) + np.array([-1, -1, 1, 1]) * tolerance
+    fire, reburn = shapely.STRtree(polygons).query(shapely.box(*boxes.T))
+
+    in_window = (dates[reburn] > dates[fire]) & (dates[reburn] < end_dates[fire])
+    fire, reburn = fire[in_window], reburn[in_window]
+
+    overlaps = shapely.dwithin(polygons[fire], polygons[reburn], tolerance)
+    return fire[overlaps], reburn[overlaps]
+
+
+def get_reburn_index(
+    fires: ee.FeatureCollection, *, years: int = 5, max_error: float = 100
+) -> pd.Series:
+    """Find the fires in a collection that reburned each fire within n years, for
+    `generate_reburn_mask`.
+
+    Fire dates and simplified polygons are downloaded once, one year at a time, and
+    joined locally (see `compute_reburn_index`). Polygons within twice the
+    simplification error are considered to intersect, as any extra fires are removed
+    when the reburn mask is clipped to the fire.
+
+    Returns
+    -------
+    pd.Series
+        The comma-separated Event_IDs of fires that reburned each fire, indexed by
+        `Event_ID`.
+    """
+    dates = pd.to_datetime(cache.get_info(fires.aggregate_array("Ig_Date")), unit="ms")
+    fire_years = sorted(set(dates.year))
+
+    event_ids, ignition_dates, polygons = [], [], []
+    for year in fire_years:
+        year_fires = filter_fire_year(fires, year)
+        metadata = cache.get_info(
+            ee.Dictionary({
+                "Event_ID": year_fires.aggregate_array("Event_ID"),
+                "Ig_Date": year_fires.aggregate_array("Ig_Date"),
+            })
+        )
+        event_ids += metadata["Event_ID"]
+        ignition_dates += metadata["Ig_Date"]
+        polygons += spatial.get_polygons(year_fires, max_error=max_error)
+
+    fire, reburn = compute_reburn_index(
+        np.array(ignition_dates), polygons, years=years, tolerance=2 * max_error
+    )
+    event_ids = np.array(event_ids)
+    order = np.lexsort((reburn, fire))
+    reburns = pd.Series(event_ids[reburn[order]], index=event_ids[fire[order]])
+
+    return (
+        reburns.groupby(level=0)
+        .agg(",".join)
+        .reindex(event_ids, fill_value="")
+        .rename_axis("Event_ID")
+        .rename("reburns")
+    )
+
+
 def generate_forest_mask(fire: ee.Feature) -> ee.Image:
     """Build a forest mask (0=nonforest, 1=forest) for an MTBS fire feature. Non-forest
     pixels are masked.
@@ -64,9 +185,12 @@ def generate_forest_mask(fire: ee.Feature) -> ee.Image:
 
 
 def calculate_percent_forest(fire: ee.Feature) -> ee.Number:
-    forest_mask = generate_forest_mask(fire).clip(fire)
+    """Calculate the percent forest cover of a single fire. To calculate percent forest
+    for many fires, use `calculate_zonal_means` with `get_forest_cover` instead.
+    """
     return (
-        forest_mask.reduceRegion(
+        generate_forest_mask(fire)
+        .reduceRegion(
             reducer=ee.Reducer.mean(),
             geometry=fire.geometry(),
         )
@@ -76,56 +200,164 @@ def calculate_percent_forest(fire: ee.Feature) -> ee.Number:
     )
 
 
+def get_forest_cover(year: ee.Number) -> ee.Image:
+    """Build a percent forest cover image (0=nonforest, 100=forest) for fires ignited in
+    a given year, from LCMS land cover in the prior year. The mean of the image over a
+    fire is its percent forest, matching `calculate_percent_forest`.
+    """
+    lcms = ee.ImageCollection("USFS/GTAC/LCMS/v2021-7").filterDate(
+        ee.Date.fromYMD(ee.Number(year).subtract(1), 1, 1),
+        ee.Date.fromYMD(year, 1, 1),
+    )
+
+    return (
+        lcms.select("Land_Cover")
+        .mosaic()
+        .setDefaultProjection(lcms.first().projection())
+        .eq(1)
+        .multiply(100)
+        .rename("percent_forest")
+    )
+
+
+def calculate_zonal_means(
+    fires: ee.FeatureCollection,
+    get_image: Callable[[ee.Number], ee.Image],
+    *,
+    scale: float = 30,
+) -> ee.FeatureCollection:
+    """Calculate the mean of each band of an annual image over every fire in a
+    collection, setting each band name as a property of each fire.
+
+    Fires are reduced with a single `reduceRegions` per fire year rather than a
+    `reduceRegion` per fire, so the cost scales with the number of pixels rather than
+    the number of fires. Fires with no pixels get null means.
+
+    Parameters
+    ----------
+    fires : ee.FeatureCollection
+        The MTBS fires to reduce.
+    get_image : Callable[[ee.Number], ee.Image]
+        A function that builds the image to reduce for a fire year, e.g.
+        `get_forest_cover`.
+    scale : float, optional
+        The scale to reduce at, in meters.
+    """
+    years = fires.aggregate_array("Ig_Date").map(lambda date: ee.Date(date).get("year"))
+
+    def reduce_year(year: ee.Number) -> ee.FeatureCollection:
+        image = get_image(ee.Number(year))
+        return image.reduceRegions(
+            collection=filter_fire_year(fires, year),
+            reducer=ee.Reducer.mean().forEach(image.bandNames()),
+            scale=scale,
+        )
+
+    return ee.FeatureCollection(years.distinct().map(reduce_year)).flatten()
+
+
+def compute_zonal_means(
+    values: np.ndarray, pixels: np.ndarray, zones: np.ndarray, n_zones: int
+) -> np.ndarray:
+    """Calculate the mean of each band of an image over many zones in one pass. This is
+    the local equivalent of `calculate_zonal_means`.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The image with shape (height, width) or (bands, height, width). NaN values are
+        excluded.
+    pixels, zones : np.ndarray
+        The flat pixel index and zone of each pixel in a zone, e.g. from
+        `spatial.rasterize_polygons`. Pixels can belong to multiple zones.
+    n_zones : int
+        The number of zones.
+
+    Returns
+    -------
+    np.ndarray
+        The mean of each band in each zone, with shape (n_zones,) or (bands, n_zones).
+        Zones with no valid pixels are NaN.
+    """
+    values = np.asarray(values)
+    bands = values.reshape(-1, values.shape[-2] * values.shape[-1])
+
+    # Sum one band at a time to limit memory use with many pixels
+    sums, counts = np.zeros((2, len(bands), n_zones))
+    for i, band in enumerate(bands):
+        samples = band[pixels]
+        valid = ~np.isnan(samples)
+        sums[i] = np.bincount(zones[valid], samples[valid], minlength=n_zones)
+        counts[i] = np.bincount(zones[valid], minlength=n_zones)
+    means = np.divide(sums, counts, where=counts > 0, out=np.full(sums.shape, np.nan))
+
+    return means.reshape(*values.shape[:-2], n_zones)
+
+
 def calculate_severity_metric(dnbr: ee.Image, fire: ee.Feature) -> ee.Number:
     """Calculate the severity metric (Lutz et al., 2011) for a single fire."""
     dnbr = dnbr.rename("dnbr")
 
     # Calculate an Nx2 array of the pixel count for each dNBR value, where N is the
-    # number of bins
-    histogram = ee.Array(
-        dnbr.reduceRegion(
-            reducer=ee.Reducer.fixedHistogram(min=-200, max=1201, steps=1401),
-            geometry=fire.geometry(),
-            scale=30,
-        ).get("dnbr")
-    )
-
-    # Calculate the total number of pixels in the fire
-    n_pixels = dnbr.reduceRegion(
-        reducer=ee.Reducer.count(),
+    # number of bins, and the total number of pixels in the fire in the same pass
+    stats = dnbr.reduceRegion(
+        reducer=ee.Reducer.fixedHistogram(
+            min=-200, max=1201, steps=SEVERITY_METRIC_BINS
+        ).combine(ee.Reducer.count(), sharedInputs=True),
         geometry=fire.geometry(),
         scale=30,
-    ).getNumber("dnbr")
+    )
+    histogram = ee.Array(stats.get("dnbr_histogram"))
+    n_pixels = stats.getNumber("dnbr_count")
 
-    def iter_severity_metric(x: ee.List, previous: ee.Dictionary):
-        """Iterative one step of severity metric calculation, given a histogram bin
-        and the cumulative results from previous iterations.
-        """
-        previous = ee.Dictionary(previous)
-        prev_sum = previous.getNumber("sum")
-        prev_count = previous.getNumber("count")
+    # The metric is 1 minus the mean proportion of pixels below each bin, which is the
+    # sum of the cumulative counts preceding each bin over the pixel and bin counts
+    cumulative_counts = histogram.slice(1, 1, 2).accum(0).slice(0, 0, -1)
+    return (
+        cumulative_counts.reduce(ee.Reducer.sum(), [0])
+        .get([0, 0])
+        .divide(n_pixels)
+        .divide(SEVERITY_METRIC_BINS)
+        .multiply(-1)
+        .add(1)
+    )
 
-        count = ee.List(x).get(1)
 
-        proportion = prev_count.divide(n_pixels)
-        new_sum = prev_sum.add(proportion.divide(1401))
-        new_count = prev_count.add(count)
+def compute_severity_metrics(
+    histograms: np.ndarray, n_pixels: np.ndarray | None = None
+) -> np.ndarray:
+    """Calculate the severity metric (Lutz et al., 2011) for a batch of fires.
 
-        return ee.Dictionary({"sum": new_sum, "count": new_count})
+    This is the local equivalent of `calculate_severity_metric`, for dNBR histograms
+    that were already reduced in Earth Engine.
 
-    # We will iteratively fill this dictionary with the results of each histogram bin
-    empty_result = ee.Dictionary({"sum": 0, "count": 0})
-    # Calculate the severity metric
-    return (
-        ee.Dictionary(
-            histogram.toList().iterate(
-                lambda x, previous: iter_severity_metric(x, previous), empty_result
-            )
-        )
-        .getNumber("sum")
-        .multiply(-1)
-        .add(1)
+    Parameters
+    ----------
+    histograms : np.ndarray
+        Pixel counts for each dNBR bin with shape (..., n), where n is the number of
+        bins.
+    n_pixels : np.ndarray, optional
+        The total number of pixels in each fire, with shape (...). If none is given,
+        the sum of each histogram is used.
+
+    Returns
+    -------
+    np.ndarray
+        The severity metric for each fire, with shape (...).
+    """
+    histograms = np.asarray(histograms, dtype=np.float64)
+    n_pixels = histograms.sum(axis=-1) if n_pixels is None else np.asarray(n_pixels)
+    n_bins = histograms.shape[-1]
+
+    cumulative_sums = np.cumsum(histograms[..., :-1], axis=-1).sum(axis=-1)
+    # Match Earth Engine, where division by zero returns 0
+    proportion = np.divide(
+        cumulative_sums,
+        n_pixels,
+        out=np.zeros(cumulative_sums.shape),
+        where=n_pixels != 0,
     )
+    return 1 - proportion / n_bins
 
 
 def get_pixel_area(
@@ -149,11 +381,96 @@ def get_pixel_area(
     )
 
 
+def get_grouped_pixel_area(
+    strata: ee.Image, region: ee.Feature, scale=30, unit: AreaUnit = "ha", **kwargs
+) -> ee.Dictionary:
+    """Calculate the pixel area of every integer stratum code in a given region in a
+    single pass, returning a dictionary of areas keyed by the code as a string.
+    Strata without pixels are excluded.
+    """
+    area_scaler = AREA_SCALERS[unit]
+    strata = strata.int().rename("stratum")
+
+    groups = ee.List(
+        ee.Image.pixelArea()
+        .multiply(area_scaler)
+        .updateMask(strata.mask())
+        .addBands(strata)
+        .reduceRegion(
+            reducer=ee.Reducer.sum().group(groupField=1, groupName="stratum"),
+            geometry=region.geometry(),
+            scale=scale,
+            maxPixels=1e13,
+            **kwargs,
+        )
+        .get("groups")
+    )
+
+    return ee.Dictionary.fromLists(
+        groups.map(lambda g: ee.Number(ee.Dictionary(g).get("stratum")).format("%d")),
+        groups.map(lambda g: ee.Dictionary(g).get("sum")),
+    )
+
+
+def compute_stratified_areas(
+    strata: list[np.ndarray],
+    n_classes: list[int],
+    *,
+    mask: np.ndarray | None = None,
+    scale: int = 30,
+    unit: AreaUnit = "ha",
+) -> np.ndarray:
+    """Calculate the pixel area of every combination of local strata in one pass.
+
+    This is the local equivalent of `get_grouped_pixel_area`, using one bincount over
+    the combined stratum codes.
+
+    Parameters
+    ----------
+    strata : list[np.ndarray]
+        Integer arrays of class codes for each stratification, e.g. owner, severity,
+        and timing, with identical shapes. Codes must be between 0 and the number of
+        classes in the stratification.
+    n_classes : list[int]
+        The number of classes in each stratification.
+    mask : np.ndarray, optional
+        A boolean array of pixels to include, e.g. burned forest within a fire. Codes
+        outside of the mask are ignored.
+    scale : int, optional
+        The pixel size, in meters. Defaults to 30.
+    unit : str, optional
+        The area unit. Defaults to hectares.
+
+    Returns
+    -------
+    np.ndarray
+        The area of each combination of strata, with shape `n_classes`.
+    """
+    strata = [np.asarray(s) for s in strata]
+    if mask is not None:
+        strata = [s[np.asarray(mask, dtype=bool)] for s in strata]
+
+    codes = np.ravel_multi_index([s.reshape(-1) for s in strata], n_classes)
+    counts = np.bincount(codes, minlength=np.prod(n_classes))
+    return counts.reshape(n_classes) * scale**2 * AREA_SCALERS[unit]
+
+
 def get_fire_year(fire: ee.Feature) -> ee.Number:
     """Get the fire year from a given MTBS fire."""
     return ee.Date(ee.Feature(fire).get("Ig_Date")).get("year")
 
 
+def filter_fire_year(fires: ee.FeatureCollection, year: int) -> ee.FeatureCollection:
+    """Filter a collection of MTBS fires to those ignited in a given year."""
+    start_date = ee.Date.fromYMD(year, 1, 1)
+    return fires.filter(
+        ee.Filter.And(
+            ee.Filter.gte("Ig_Date", start_date.millis()),
+            ee.Filter.lt("Ig_Date", start_date.advance(1, "year").millis()),
+        )
+    )
+
+
 def calculate_patch_areas(
     image: ee.Image,
     classes: tuple[int, ...] | ee.List,
@@ -210,3 +527,167 @@ def calculate_patch_areas(
 
     patch_areas = patches.map(set_patch_area)
     return patch_areas.select(["label", "area"], retainGeometry=retain_geometry)
+
+
+def _find_roots(a: np.ndarray, b: np.ndarray, n: int) -> np.ndarray:
+    """Find the root of each of n nodes given edges between nodes a and b, using a
+    vectorized union-find that hooks larger roots onto smaller roots until no edges
+    cross components.
+    """
+    parent = np.arange(n)
+
+    while True:
+        # Compress every path so that each node points directly to its root
+        while True:
+            grandparent = parent[parent]
+            if (grandparent == parent).all():
+                break
+            parent = grandparent
+
+        root_a, root_b = parent[a], parent[b]
+        crossing = root_a != root_b
+        if not crossing.any():
+            return parent
+
+        low = np.minimum(root_a[crossing], root_b[crossing])
+        high = np.maximum(root_a[crossing], root_b[crossing])
+        np.minimum.at(parent, high, low)
+
+
+def _pixel_edges(
+    upper: np.ndarray, lower: np.ndarray, eight_connected: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find edges between pixels of the same class in two adjacent rows (or columns),
+    returning the indices of each connected pair. Pixels with class -1 are ignored.
+    """
+    offsets = [0, 1, -1] if eight_connected else [0]
+    a, b = [], []
+    n = upper.size
+    for offset in offsets:
+        upper_idx = np.arange(max(-offset, 0), n - max(offset, 0))
+        lower_idx = upper_idx + offset
+        same = (upper[upper_idx] == lower[lower_idx]) & (upper[upper_idx] >= 0)
+        a.append(upper_idx[same])
+        b.append(lower_idx[same])
+
+    return np.concatenate(a), np.concatenate(b)
+
+
+def _label_tile(tile: np.ndarray, eight_connected: bool) -> tuple[np.ndarray, int]:
+    """Label connected components of equal, non-negative classes in a single tile,
+    returning labels (-1 for background) and the number of components.
+    """
+    rows, cols = tile.shape
+    idx = np.arange(tile.size).reshape(tile.shape)
+    a, b = [], []
+
+    # Horizontal edges, then vertical and diagonal edges between consecutive rows
+    same = (tile[:, :-1] == tile[:, 1:]) & (tile[:, :-1] >= 0)
+    a.append(idx[:, :-1][same])
+    b.append(idx[:, 1:][same])
+    offsets = [0, 1, -1] if eight_connected else [0]
+    for offset in offsets:
+        upper = tile[:-1, max(-offset, 0) : cols - max(offset, 0)]
+        lower = tile[1:, max(offset, 0) : cols - max(-offset, 0)]
+        same = (upper == lower) & (upper >= 0)
+        a.append(idx[:-1, max(-offset, 0) : cols - max(offset, 0)][same])
+        b.append(idx[1:, max(offset, 0) : cols - max(-offset, 0)][same])
+
+    roots = _find_roots(np.concatenate(a), np.concatenate(b), tile.size)
+    labels = np.full(tile.size, -1)
+    foreground = tile.reshape(-1) >= 0
+    _, labels[foreground] = np.unique(roots[foreground], return_inverse=True)
+    return labels.reshape(tile.shape), int(labels.max()) + 1
+
+
+def compute_patch_areas(
+    image: np.ndarray,
+    classes: tuple[int, ...],
+    *,
+    scale: int = 30,
+    eight_connected: bool = True,
+    tile_size: int = 2048,
+) -> pd.DataFrame:
+    """
+    Calculate patch areas from a local classified image.
+
+    This is the local equivalent of `calculate_patch_areas`, with areas calculated from
+    pixel counts. Patches are labeled one tile at a time and stitched across tile edges,
+    so large rasters (e.g. memory-mapped) can be processed in bounded memory.
+
+    Parameters
+    ---------
+    image : np.ndarray
+        A 2D array containing integer labeled classes, e.g. 0 for background.
+    classes : tuple[int, ...]
+        A list of classes to include in the analysis, by value.
+    scale : int, optional
+        The pixel size, in meters. Defaults to 30.
+    eight_connected : bool, optional
+        Whether to use 8-connected pixels for analysis. Defaults to True.
+    tile_size : int, optional
+        The width and height of each tile, in pixels. Defaults to 2048.
+
+    Returns
+    -------
+    pd.DataFrame
+        A table of patches containing class labels and areas in hectares.
+    """
+    rows, cols = image.shape
+
+    # Pixel counts and classes of the components in each tile, and edges between
+    # components that touch across tile edges
+    counts, component_classes, edges_a, edges_b = [], [], [], []
+    n_components = 0
+    prev_bottom = prev_bottom_class = None
+
+    for row0 in range(0, rows, tile_size):
+        row1 = min(row0 + tile_size, rows)
+        top, top_class = np.full(cols, -1), np.full(cols, -1)
+        bottom, bottom_class = np.full(cols, -1), np.full(cols, -1)
+        prev_right = prev_right_class = None
+
+        for col0 in range(0, cols, tile_size):
+            col1 = min(col0 + tile_size, cols)
+            tile = np.asarray(image[row0:row1, col0:col1])
+            tile = np.where(np.isin(tile, classes), tile, -1)
+
+            labels, n = _label_tile(tile, eight_connected)
+            foreground = labels >= 0
+            counts.append(np.bincount(labels[foreground], minlength=n))
+            tile_classes = np.empty(n, dtype=tile.dtype)
+            tile_classes[labels[foreground]] = tile[foreground]
+            component_classes.append(tile_classes)
+
+            labels[foreground] += n_components
+            n_components += n
+
+            # Join components across the edge with the previous tile in this row
+            if prev_right is not None:
+                a, b = _pixel_edges(prev_right_class, tile[:, 0], eight_connected)
+                edges_a.append(prev_right[a])
+                edges_b.append(labels[b, 0])
+
+            prev_right, prev_right_class = labels[:, -1], tile[:, -1]
+            top[col0:col1], top_class[col0:col1] = labels[0], tile[0]
+            bottom[col0:col1], bottom_class[col0:col1] = labels[-1], tile[-1]
+
+        # Join components across the edge with the previous row of tiles
+        if prev_bottom is not None:
+            a, b = _pixel_edges(prev_bottom_class, top_class, eight_connected)
+            edges_a.append(prev_bottom[a])
+            edges_b.append(top[b])
+
+        prev_bottom, prev_bottom_class = bottom, bottom_class
+
+    empty = np.zeros(0, dtype=int)
+    roots = _find_roots(
+        np.concatenate([empty, *edges_a]),
+        np.concatenate([empty, *edges_b]),
+        n_components,
+    )
+    patch_roots, patch_ids = np.unique(roots, return_inverse=True)
+    pixel_counts = np.bincount(patch_ids, weights=np.concatenate([empty, *counts]))
+    patch_classes = np.concatenate([empty, *component_classes])[patch_roots]
+
+    return pd.DataFrame({"label": patch_classes, "area": pixel_counts * scale**2 / 1e4})
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pfh import accuracy
+
+
+@pytest.fixture
+def plots():
+    rng = np.random.default_rng(0)
+    plots = pd.DataFrame({
+        "severity": rng.integers(0, 4, 300),
+        "owner": rng.choice([1, 2, 5], 300),
+        "mapped": rng.integers(0, 2, 300),
+    })
+    plots["reference"] = np.where(rng.random(300) < 0.8, plots.mapped, 1 - plots.mapped)
+    return plots
+
+
+def test_bootstrap_indices():
+    """Test that resamples only draw from, and preserve the size of, each group."""
+    groups = np.array([2, 0, 2, 1, 2, 0])
+    indices = accuracy.bootstrap_indices(groups, 100, rng=np.random.default_rng(0))
+
+    assert indices.shape == (100, 6)
+    for group in range(3):
+        counts = (groups[indices] == group).sum(axis=1)
+        assert np.all(counts == (groups == group).sum())
+    assert len(np.unique(indices)) == 6
+
+
+def test_compute_confusion_matrices(plots):
+    """Test that batched confusion matrices match counting each resample and stratum."""
+    indices = accuracy.bootstrap_indices(
+        plots.severity, 20, rng=np.random.default_rng(0)
+    )
+    matrices = accuracy.compute_confusion_matrices(
+        plots.reference,
+        plots.mapped,
+        strata=[plots.severity],
+        n_strata=[4],
+        indices=indices,
+    )
+
+    assert matrices.shape == (20, 4, 2, 2)
+    for i, resample in enumerate(indices):
+        expected = np.zeros((4, 2, 2))
+        for plot in plots.iloc[resample].itertuples():
+            expected[plot.severity, plot.reference, plot.mapped] += 1
+        np.testing.assert_array_equal(matrices[i], expected)
+
+
+def test_compute_accuracy_metrics():
+    matrices = np.array([[[50, 10], [5, 35]], [[10, 0], [0, 0]]])
+    metrics = accuracy.compute_accuracy_metrics(matrices)
+
+    np.testing.assert_allclose(metrics["precision"], [35 / 45, np.nan])
+    np.testing.assert_allclose(metrics["recall"], [35 / 40, np.nan])
+    np.testing.assert_allclose(metrics["overall_accuracy"], [0.85, 1])
+
+
+def test_compute_adjusted_areas():
+    """Test that reference areas are estimated from the mapped class proportions."""
+    matrices = np.array([[[90, 20], [10, 80]], [[10, 0], [0, 0]]])
+    mapped_areas = np.array([[1_000, 200], [500, 0]])
+
+    areas = accuracy.compute_adjusted_areas(matrices, mapped_areas)
+
+    np.testing.assert_allclose(areas, [[900 + 40, 100 + 160], [500, 0]])
+    np.testing.assert_allclose(areas.sum(axis=-1), mapped_areas.sum(axis=-1))
+
+
+def test_bootstrap_accuracy(plots):
+    """Test that intervals contain the estimate of each stratum."""
+    results = accuracy.bootstrap_accuracy(
+        plots, "reference", "mapped", by=["severity", "owner"], n_resamples=500
+    )
+
+    assert len(results) == 12
+    assert results["n"].sum() == len(plots)
+    for metric in ["precision", "recall", "overall_accuracy"]:
+        assert np.all(results[f"{metric}_lower"] <= results[metric])
+        assert np.all(results[f"{metric}_upper"] >= results[metric])
+
+    overall = accuracy.bootstrap_accuracy(plots, "reference", "mapped")
+    assert overall.loc["Overall", "overall_accuracy"] == pytest.approx(
+        np.mean(plots.reference == plots.mapped)
+    )
+
+
+def test_bootstrap_adjusted_areas(plots):
+    """Test that stratified area estimates preserve the mapped area of each stratum."""
+    index = pd.Index([0, 1, 2, 3], name="severity")
+    mapped_areas = pd.DataFrame(
+        {"unharvested": [900, 800, 700, 600], "harvested": [100, 200, 300, 400]},
+        index=index,
+    )
+
+    results = accuracy.bootstrap_adjusted_areas(
+        plots, "reference", "mapped", mapped_areas, by=["severity"], n_resamples=500
+    )
+
+    assert list(results.columns) == [
+        "unharvested",
+        "unharvested_lower",
+        "unharvested_upper",
+        "harvested",
+        "harvested_lower",
+        "harvested_upper",
+    ]
+    np.testing.assert_allclose(results.unharvested + results.harvested, 1_000)
+    assert np.all(results.harvested_lower <= results.harvested)
+    assert np.all(results.harvested_upper >= results.harvested)
+
+
+def test_bootstrap_missing_plots(plots):
+    """Test that plots with a missing class or stratum are dropped with a warning."""
+    missing = plots.astype({"mapped": float, "severity": float})
+    missing.loc[0, "mapped"] = np.nan
+    missing.loc[1, "severity"] = np.nan
+    mapped_areas = pd.DataFrame(
+        {"unharvested": [900] * 4, "harvested": [100] * 4},
+        index=pd.Index([0.0, 1.0, 2.0, 3.0], name="severity"),
+    )
+
+    with pytest.warns(UserWarning, match="Dropped 2 of 300 plots"):
+        results = accuracy.bootstrap_accuracy(
+            missing, "reference", "mapped", by=["severity"], n_resamples=10
+        )
+    expected = accuracy.bootstrap_accuracy(
+        plots.drop([0, 1]), "reference", "mapped", by=["severity"], n_resamples=10
+    )
+    np.testing.assert_allclose(results.to_numpy(), expected.to_numpy())
+
+    with pytest.warns(UserWarning, match="Dropped 2 of 300 plots"):
+        areas = accuracy.bootstrap_adjusted_areas(
+            missing, "reference", "mapped", mapped_areas, by=["severity"]
+        )
+    assert np.all(np.isfinite(areas.to_numpy()))
@@ -0,0 +1,109 @@
+import ee
+import pytest
+
+from pfh.cache import GetInfoCache
+
+
+def load_collection(asset_id: str, n: int = 0) -> ee.ComputedObject:
+    """Build a computation that loads an asset, without initializing Earth Engine."""
+    collection = ee.ComputedObject("ImageCollection.load", {"id": asset_id})
+    return ee.ComputedObject("Collection.limit", {"collection": collection, "limit": n})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Replace Earth Engine requests with a fake server that counts requests."""
+    server = {"computed": 0, "asset_checks": 0, "versions": {}}
+
+    def compute_value(obj):
+        server["computed"] += 1
+        return {"n": server["computed"]}
+
+    def get_asset(asset_id):
+        server["asset_checks"] += 1
+        return {"updateTime": server["versions"].get(asset_id, "v1")}
+
+    monkeypatch.setattr(ee.data, "computeValue", compute_value)
+    monkeypatch.setattr(ee.data, "getAsset", get_asset)
+    return server
+
+
+def test_cache_hit(tmp_path, server):
+    """Test that repeated computations are only computed once, across sessions."""
+    cache = GetInfoCache(tmp_path)
+    first = cache.get_info(load_collection("a"))
+    assert cache.get_info(load_collection("a")) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A new session with the same directory reuses results with no requests
+    requests = server["computed"] + server["asset_checks"]
+    cache = GetInfoCache(tmp_path)
+    assert cache.get_info(load_collection("a")) == first
+    assert server["computed"] + server["asset_checks"] == requests
+    assert cache.hits == 1
+    assert cache.seconds_saved >= 0
+
+
+def test_cache_different_graphs(tmp_path, server):
+    """Test that different computations are cached separately."""
+    cache = GetInfoCache(tmp_path)
+    assert cache.get_info(load_collection("a", 1)) != cache.get_info(
+        load_collection("a", 2)
+    )
+    assert cache.misses == 2
+
+
+def test_cache_asset_update(tmp_path, server):
+    """Test that results are recomputed after assets they load are modified."""
+    cache = GetInfoCache(tmp_path, asset_ttl=0)
+    first = cache.get_info(load_collection("a"))
+
+    server["versions"]["a"] = "v2"
+    assert cache.get_info(load_collection("a")) != first
+    assert cache.misses == 2
+
+
+def test_cache_asset_ttl(tmp_path, server):
+    """Test that asset versions are only checked again after invalidation or expiry."""
+    cache = GetInfoCache(tmp_path)
+    first = cache.get_info(load_collection("a"))
+    server["versions"]["a"] = "v2"
+    assert cache.get_info(load_collection("a")) == first
+
+    cache.invalidate_asset("a")
+    assert cache.get_info(load_collection("a")) != first
+
+
+def test_cache_invalidate(tmp_path, server):
+    """Test invalidating one result or all results."""
+    cache = GetInfoCache(tmp_path)
+    a = cache.get_info(load_collection("a"))
+    b = cache.get_info(load_collection("b"))
+
+    cache.invalidate(load_collection("a"))
+    assert cache.get_info(load_collection("a")) != a
+    assert cache.get_info(load_collection("b")) == b
+
+    cache.invalidate()
+    assert cache.size == 0
+
+
+def test_cache_eviction(tmp_path, server):
+    """Test that the least recently used results are evicted above the size limit."""
+    cache = GetInfoCache(tmp_path)
+    cache.get_info(load_collection("a"))
+    entry_size = cache.size
+    # Fit two results, allowing for the varying length of their timings
+    cache.max_bytes = entry_size * 5 // 2
+
+    a = cache.get_info(load_collection("a", 1))
+    cache.get_info(load_collection("b", 1))
+    # Use the first result so that the second is evicted instead
+    cache.get_info(load_collection("a", 1))
+    cache.get_info(load_collection("c", 1))
+
+    assert cache.size <= cache.max_bytes
+    misses = cache.misses
+    assert cache.get_info(load_collection("a", 1)) == a
+    cache.get_info(load_collection("b", 1))
+    assert cache.misses == misses + 1
@@ -1,6 +1,8 @@
 import ee
+import numpy as np
 
 from pfh import composites
+from pfh.profiling import profile_graph
 
 
 def test_get_landsat_composites():
@@ -31,3 +33,85 @@ def test_match_pairs():
     assert len(matched) == 3
     assert matched[0]["start"].bandNames().getInfo() == ["NIR"]
     assert matched[0]["end"].bandNames().getInfo() == ["NIR"]
+
+
+def test_get_landsat_composites_shared(monkeypatch):
+    """Test that annual composites are built once and shared between consecutive
+    pairs, rather than rebuilt for each pair.
+    """
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fire = mtbs.filter(ee.Filter.eq("Event_ID", "OR4236212395219870830")).first()
+
+    median = ee.ImageCollection.median
+    evaluations = []
+
+    def counting_median(self, *args, **kwargs):
+        evaluations.append(self)
+        return median(self, *args, **kwargs)
+
+    monkeypatch.setattr(ee.ImageCollection, "median", counting_median)
+    pairs = composites.get_landsat_composites(fire, years=5)
+    imgs = ee.List([pair[img] for pair in pairs for img in ["start", "end"]])
+    graph = profile_graph(imgs)
+
+    # Two containment-based composites, plus one composite per later year, compared
+    # to two composites per pair (10) when building each pair independently
+    assert len(evaluations) == 7
+    for i in range(1, len(pairs) - 1):
+        assert pairs[i]["end"] is pairs[i + 1]["start"]
+    # Shared composites are referenced rather than repeated in the serialized graph
+    assert graph["shared"] > 0
+    assert graph["nodes"] < graph["tree_nodes"]
+
+
+def test_get_landsat_composites_precomputed_dates():
+    """Test that precomputed containment and end dates define the first window."""
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fire = mtbs.filter(ee.Filter.eq("Event_ID", "OR4236212395219870830")).first()
+    containment_date = ee.Date("1987-09-20")
+    end_date = ee.Date("1987-11-15")
+    fire = fire.set({
+        "containment_date": containment_date.millis(),
+        "end_date": end_date.millis(),
+    })
+
+    start = composites.get_landsat_composites(fire, years=1)[0]["start"]
+
+    time_start = ee.Date(start.get("system:time_start")).millis().getInfo()
+    time_end = ee.Date(start.get("system:time_end")).millis().getInfo()
+    assert time_start == containment_date.advance(1, "day").millis().getInfo()
+    assert time_end == end_date.millis().getInfo()
+
+
+def test_compute_max_difference():
+    """Test that streaming maximum differences match a stacked calculation."""
+    rng = np.random.default_rng(0)
+    pairs = [
+        (rng.integers(0, 5_000, (3, 20, 30)), rng.integers(0, 5_000, (3, 20, 30)))
+        for _ in range(5)
+    ]
+
+    max_diff, year_of_max, valid = composites.compute_max_difference(
+        iter(pairs), timing_band=1
+    )
+
+    diffs = np.stack([post - pre for pre, post in pairs])
+    np.testing.assert_array_equal(max_diff, diffs.max(axis=0))
+    np.testing.assert_array_equal(year_of_max, diffs[:, 1].argmax(axis=0))
+    assert valid.all()
+
+
+def test_compute_max_difference_masked():
+    """Test that masked pixels are ignored."""
+    pre = np.zeros((1, 2, 2))
+    post_1 = np.array([[[1, 5], [np.nan, np.nan]]])
+    post_2 = np.array([[[3, np.nan], [2, np.nan]]])
+
+    max_diff, year_of_max, valid = composites.compute_max_difference([
+        (pre, post_1),
+        (pre, post_2),
+    ])
+
+    assert max_diff[0, :, :].tolist() == [[3, 5], [2, 0]]
+    assert year_of_max.tolist() == [[1, 0], [1, 0]]
+    assert valid[0].tolist() == [[True, True], [True, False]]
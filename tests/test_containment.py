@@ -1,4 +1,5 @@
 import ee
+import numpy as np
 
 from pfh import containment
 
@@ -15,3 +16,26 @@ def test_get_containment_date():
     # Post-MODIS
     fire = mtbs.filter(ee.Filter.eq("Event_ID", "CA4099512207820120818")).first()
     assert containment.get_containment_date(fire).millis().getInfo() == 1346889600000
+
+
+def test_get_containment_date_annual_hotspots():
+    """Test that precomputed annual hotspots match per-fire hotspots."""
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fire = mtbs.filter(ee.Filter.eq("Event_ID", "CA4099512207820120818")).first()
+    hotspots = containment.get_annual_hotspots(2012, fire.geometry().bounds())
+
+    containment_date = containment.get_containment_date(fire, hotspots=hotspots)
+    assert containment_date.millis().getInfo() == 1346889600000
+
+
+def test_compute_last_hotspots():
+    """Test that streaming last hotspot dates match a stacked maximum."""
+    rng = np.random.default_rng(0)
+    hotspots = rng.random((6, 20, 30)) > 0.8
+    dates = np.sort(rng.integers(0, 1e12, size=6))
+
+    last_hotspots = containment.compute_last_hotspots(iter(hotspots), dates)
+
+    expected = np.where(hotspots, dates[:, None, None], 0).max(axis=0)
+    assert last_hotspots.dtype == np.int64
+    np.testing.assert_array_equal(last_hotspots, expected)
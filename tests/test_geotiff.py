@@ -0,0 +1,162 @@
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pfh.geotiff import GeoTIFF
+
+OWNERSHIP = Path(__file__).parents[1] / "data" / "ownership.tif"
+
+
+def write_tiff(path, image, *, tile_size=None, deflate=False, predictor=1):
+    """Write a minimal single-band uint16 GeoTIFF with 30m pixels in EPSG:5070."""
+    rows, cols = image.shape
+    if tile_size:
+        blocks = [
+            np.pad(
+                image[r : r + tile_size, c : c + tile_size],
+                ((0, max(r + tile_size - rows, 0)), (0, max(c + tile_size - cols, 0))),
+            )
+            for r in range(0, rows, tile_size)
+            for c in range(0, cols, tile_size)
+        ]
+    else:
+        blocks = [image[r : r + 4] for r in range(0, rows, 4)]
+
+    data = []
+    for block in blocks:
+        block = block.astype("<u2")
+        if predictor == 2:
+            block = np.diff(block, axis=1, prepend=0).astype("<u2")
+        raw = block.tobytes()
+        data.append(zlib.compress(raw) if deflate else raw)
+
+    offsets = np.cumsum([0, *[len(d) for d in data[:-1]]]) + 8
+    ifd = 8 + sum(len(d) for d in data)
+    layout = [(322, 323, 324, 325), (256, 278, 273, 279)][tile_size is None]
+    block_width = tile_size or cols
+    block_height = tile_size or 4
+    tags = [
+        (256, 3, [cols]),
+        (257, 3, [rows]),
+        (258, 3, [16]),
+        (259, 3, [8 if deflate else 1]),
+        (277, 3, [1]),
+        (317, 3, [predictor]),
+        (layout[0], 3, [block_width]),
+        (layout[1], 3, [block_height]),
+        (layout[2], 4, list(offsets)),
+        (layout[3], 4, [len(d) for d in data]),
+        (33550, 12, [30.0, 30.0, 0.0]),
+        (33922, 12, [0.0, 0.0, 0.0, 1000.0, 2000.0, 0.0]),
+        (34735, 3, [1, 1, 0, 1, 3072, 0, 1, 5070]),
+    ]
+    tags = sorted({tag: t for tag, *t in tags}.items())
+
+    # Values that don't fit in an entry are written after the directory
+    extra_offset = ifd + 2 + 12 * len(tags) + 4
+    entries, extra = b"", b""
+    for tag, (field_type, values) in tags:
+        fmt = {3: "H", 4: "I", 12: "d"}[field_type]
+        packed = struct.pack(f"<{len(values)}{fmt}", *values)
+        if len(packed) <= 4:
+            value = packed.ljust(4, b"\0")
+        else:
+            value = struct.pack("<I", extra_offset + len(extra))
+            extra += packed
+        entries += struct.pack("<HHI", tag, field_type, len(values)) + value
+
+    header = b"II" + struct.pack("<HI", 42, ifd)
+    directory = struct.pack("<H", len(tags)) + entries + b"\0\0\0\0"
+    path.write_bytes(header + b"".join(data) + directory + extra)
+
+
+@pytest.fixture
+def image():
+    return np.arange(37 * 45, dtype=np.uint16).reshape(37, 45)
+
+
+def test_read_ownership():
+    """Test reading windows across LZW compressed tiles in the ownership map."""
+    with GeoTIFF(OWNERSHIP) as tif:
+        assert tif.epsg == 5070
+        # Read a window spanning four tiles, and each of its parts within one tile
+        window = tif.read_window(8150, 5100, 100, 150)
+        rows = [(8150, 42), (8192, 58)]
+        cols = [(5100, 20), (5120, 130)]
+        parts = np.vstack([
+            np.hstack([tif.read_window(r, c, h, w) for c, w in cols]) for r, h in rows
+        ])
+        cached = tif.read_window(0, 0, 10, 10)
+
+        assert set(np.unique(window)) <= set(range(9))
+        assert len(np.unique(window)) > 1
+        np.testing.assert_array_equal(window, parts)
+        assert np.shares_memory(cached, tif.read_window(0, 0, 10, 10))
+
+
+@pytest.mark.parametrize(
+    ("tile_size", "deflate", "predictor"),
+    [(None, False, 1), (16, False, 1), (16, True, 1), (None, True, 2)],
+)
+def test_read_window(tmp_path, image, tile_size, deflate, predictor):
+    """Test that windows match the source image for each storage layout."""
+    path = tmp_path / "image.tif"
+    write_tiff(path, image, tile_size=tile_size, deflate=deflate, predictor=predictor)
+
+    with GeoTIFF(path) as tif:
+        assert (tif.height, tif.width) == image.shape
+        np.testing.assert_array_equal(tif.read_window(0, 0, 37, 45), image)
+        np.testing.assert_array_equal(tif.read_window(3, 5, 20, 30), image[3:23, 5:35])
+
+        # Windows beyond the image are filled
+        window = tif.read_window(-2, 40, 5, 10, fill=99)
+        np.testing.assert_array_equal(window[2:, :5], image[:3, 40:])
+        assert (window[:2] == 99).all()
+        assert (window[:, 5:] == 99).all()
+
+
+def test_read_window_zero_copy(tmp_path, image):
+    """Test that uncompressed strips are read as views of the file."""
+    path = tmp_path / "image.tif"
+    write_tiff(path, image)
+
+    tif = GeoTIFF(path)
+    window = tif.read_window(3, 5, 20, 30)
+
+    assert not window.flags.owndata
+    assert not window.flags.writeable
+
+
+def test_read_bounds(tmp_path, image):
+    """Test reading a window from projected bounds."""
+    path = tmp_path / "image.tif"
+    write_tiff(path, image, tile_size=16)
+
+    with GeoTIFF(path) as tif:
+        window, transform = tif.read_bounds(1065, 1400, 1150, 1940)
+
+    assert transform == (30.0, 1060.0, 30.0, 1940.0)
+    np.testing.assert_array_equal(window, image[2:20, 2:5])
+
+
+@pytest.mark.parametrize(
+    ("tile_size", "deflate"), [(None, False), (16, False), (16, True), (None, True)]
+)
+def test_sample(tmp_path, image, tile_size, deflate):
+    """Test that sampled points match indexing the source image for each layout."""
+    path = tmp_path / "image.tif"
+    write_tiff(path, image, tile_size=tile_size, deflate=deflate)
+    rng = np.random.default_rng(0)
+    rows, cols = rng.integers(0, 37, 500), rng.integers(0, 45, 500)
+    x, y = 1000 + (cols + rng.uniform(size=500)) * 30, 2000 - (rows + 0.5) * 30
+
+    with GeoTIFF(path) as tif:
+        np.testing.assert_array_equal(tif.sample(x, y), image[rows, cols])
+        # Points beyond the image and invalid points are filled
+        outside = tif.sample([999, 1000, 2351, np.nan], [1990, 889, 1990, 1990], fill=9)
+
+        assert tif.bounds == (1000, 890, 2350, 2000)
+        np.testing.assert_array_equal(outside, [9, 9, 9, 9])
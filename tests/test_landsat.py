@@ -0,0 +1,135 @@
+import ee
+import numpy as np
+import pytest
+
+from pfh import landsat
+from pfh.profiling import profile_graph
+
+
+def bit(qa, n):
+    return (qa >> n) & 1 == 1
+
+
+def test_decode_qa():
+    """Test that lookup table decoding matches bitwise decoding of every flag."""
+    rng = np.random.default_rng(0)
+    qa_pixel = rng.integers(0, 2**16, size=(3, 50, 40), dtype=np.uint16)
+    qa_radsat = rng.integers(0, 2**16, size=(3, 50, 40), dtype=np.uint16)
+    # Ensure both masks contain True values
+    qa_pixel[:, :10] = 0b1000000
+    qa_radsat[:, :5] = 0
+    qa_radsat[:, 5:10] = 0b1000000
+
+    clear, hotspot = landsat.decode_qa(qa_pixel, qa_radsat, chunk_size=777)
+
+    expected_clear = (
+        bit(qa_pixel, 6)
+        & ~bit(qa_pixel, 5)
+        & ~bit(qa_pixel, 2)
+        & ~bit(qa_pixel, 4)
+        & (qa_radsat == 0)
+    )
+    expected_hotspot = bit(qa_radsat, 6) & ~bit(qa_radsat, 0)
+
+    assert clear.any()
+    assert hotspot.any()
+    np.testing.assert_array_equal(clear, expected_clear)
+    np.testing.assert_array_equal(hotspot, expected_hotspot)
+
+
+def test_decode_qa_memmap(tmp_path):
+    """Test decoding memory-mapped scene stacks into memory-mapped outputs."""
+    shape = (2, 64, 64)
+    qa_pixel = np.memmap(tmp_path / "pixel", dtype=np.uint16, mode="w+", shape=shape)
+    qa_radsat = np.memmap(tmp_path / "radsat", dtype=np.uint16, mode="w+", shape=shape)
+    clear = np.memmap(tmp_path / "clear", dtype=bool, mode="w+", shape=shape)
+    hotspot = np.memmap(tmp_path / "hotspot", dtype=bool, mode="w+", shape=shape)
+    qa_pixel[:] = 0b1000000
+    qa_radsat[1] = 0b1000000
+
+    landsat.decode_qa(
+        qa_pixel, qa_radsat, chunk_size=1_000, clear=clear, hotspot=hotspot
+    )
+
+    assert clear[0].all()
+    assert not clear[1].any()
+    assert hotspot[1].all()
+    assert not hotspot[0].any()
+
+
+@pytest.mark.parametrize(
+    ("clear", "hotspot"),
+    [
+        (np.zeros((4, 8), dtype=bool)[:, :4], np.zeros((4, 4), dtype=bool)),
+        (np.zeros((4, 4), dtype=bool), np.zeros((4, 4), dtype=np.uint8)),
+        (np.zeros((4, 4), dtype=bool), np.zeros(16, dtype=bool)),
+    ],
+    ids=["non_contiguous", "dtype", "shape"],
+)
+def test_decode_qa_invalid_out(clear, hotspot):
+    """Test that outputs that can't be written through a flat view raise an error
+    rather than being silently left unwritten.
+    """
+    qa = np.zeros((4, 4), dtype=np.uint16)
+    with pytest.raises(ValueError, match="C-contiguous boolean array"):
+        landsat.decode_qa(qa, qa, clear=clear, hotspot=hotspot)
+
+
+def test_load_landsat_filters():
+    """Test that filters select scenes within the bounds, date range, and season."""
+    bounds = ee.Geometry.Point([-122.5, 43.5])
+    imgs = landsat.load_landsat(
+        bounds=bounds, start_date="2015-01-01", end_date="2017-01-01", season=(166, 258)
+    )
+    dates = imgs.aggregate_array("system:time_start").map(
+        lambda t: ee.Date(t).getRelative("day", "year").add(1)
+    )
+
+    assert imgs.size().getInfo() > 0
+    assert imgs.first().bandNames().getInfo()[:6] == [
+        "Blue",
+        "Green",
+        "Red",
+        "NIR",
+        "SWIR1",
+        "SWIR2",
+    ]
+    assert dates.reduce(ee.Reducer.min()).getInfo() >= 166
+    assert dates.reduce(ee.Reducer.max()).getInfo() <= 258
+
+
+def test_load_landsat_graph_size():
+    """Compare graph sizes for a year of fires when Landsat imagery is filtered before
+    bands are prepared, versus filtering one shared collection after preparation.
+    """
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fires = mtbs.filter(ee.Filter.stringStartsWith("Event_ID", "OR")).filterDate(
+        "1987", "1988"
+    )
+    fire_list = fires.toList(50)
+    fire_geoms = [
+        ee.Feature(fire_list.get(i)).geometry()
+        for i in range(fire_list.size().getInfo())
+    ]
+
+    def load(prefilter: bool) -> list[ee.ImageCollection]:
+        imgs = []
+        for geom in fire_geoms:
+            if prefilter:
+                imgs.append(landsat.load_landsat(bounds=geom, start_date="1987-01-01"))
+            else:
+                imgs.append(
+                    landsat.load_landsat()
+                    .filterBounds(geom)
+                    .filterDate("1987-01-01", "2100-01-01")
+                )
+        return imgs
+
+    prefiltered = profile_graph(load(prefilter=True))
+    postfiltered = profile_graph(load(prefilter=False))
+
+    assert len(fire_geoms) > 1
+    # Prefiltering builds a filtered merge of every sensor per fire, trading a larger
+    # graph for preparing only the scenes each fire uses, while postfiltering adds
+    # two filters per fire to one shared collection
+    assert prefiltered["nodes"] > postfiltered["nodes"]
@@ -0,0 +1,60 @@
+import ee
+
+from pfh.profiling import check_baseline, load_baseline, profile_graph, save_baseline
+
+
+def call(name: str, **kwargs) -> ee.ComputedObject:
+    """Build a function call without initializing Earth Engine."""
+    return ee.ComputedObject(name, kwargs)
+
+
+def test_profile_graph_chain():
+    """Test metrics of a graph with no shared sub-expressions."""
+    obj = call("Image.load", id="a")
+    for _ in range(3):
+        obj = call("Image.abs", value=obj)
+
+    profile = profile_graph(obj)
+    assert profile["nodes"] == 4
+    assert profile["tree_nodes"] == 4
+    assert profile["depth"] == 4
+    assert profile["shared"] == 0
+    assert profile["bytes"] > 0
+
+
+def test_profile_graph_shared():
+    """Test that shared sub-expressions are counted once in the graph, but repeatedly
+    in the expanded tree.
+    """
+    shared = call("Image.abs", value=call("Image.load", id="a"))
+    obj = call("Image.add", image1=shared, image2=shared)
+    obj = call("Image.add", image1=obj, image2=obj)
+
+    profile = profile_graph(obj)
+    assert profile["nodes"] == 4
+    # 1 + 2 * (1 + 2 * 2)
+    assert profile["tree_nodes"] == 11
+    assert profile["depth"] == 4
+    assert profile["shared"] == 2
+
+
+def test_profile_graph_collections():
+    """Test profiling lists and dicts of objects, e.g. Landsat pairs."""
+    pair = {"start": call("Image.load", id="a"), "end": call("Image.load", id="b")}
+    assert profile_graph([pair, pair])["nodes"] == 2
+
+
+def test_check_baseline(tmp_path):
+    """Test that only metrics that grow beyond the tolerance are flagged."""
+    path = tmp_path / "baseline.json"
+    save_baseline({"fire/max_difference": {"nodes": 100, "depth": 10}}, path)
+    baseline = load_baseline(path)
+
+    profiles = {
+        "fire/max_difference": {"nodes": 104, "depth": 12},
+        "fire/new_builder": {"nodes": 1_000},
+    }
+    regressions = check_baseline(profiles, baseline, tolerance=0.05)
+
+    assert regressions == ["fire/max_difference depth: 10 -> 12"]
+    assert load_baseline(tmp_path / "missing.json") == {}
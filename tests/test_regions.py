@@ -0,0 +1,97 @@
+import ee
+import numpy as np
+import pytest
+
+from pfh import regions
+
+
+def test_plan_export_regions_clusters():
+    """Test that distant groups of fires are exported as separate regions."""
+    rng = np.random.default_rng(0)
+    centers = np.concatenate([
+        rng.normal([0, 0], 5_000, (10, 2)),
+        rng.normal([500_000, 200_000], 5_000, (10, 2)),
+        rng.normal([900_000, 900_000], 5_000, (10, 2)),
+    ])
+    boxes = np.concatenate([centers - 2_000, centers + 2_000], axis=1)
+
+    planned, labels, report = regions.plan_export_regions(boxes, max_regions=3)
+
+    assert len(planned) == 3
+    assert [len(set(labels[i : i + 10])) for i in range(0, 30, 10)] == [1, 1, 1]
+    # Every fire is covered by its region
+    assert np.all(boxes[:, :2] >= planned[labels, :2])
+    assert np.all(boxes[:, 2:] <= planned[labels, 2:])
+    assert report["pixels_saved"] > 0.99 * report["bbox_pixels"]
+
+
+def test_plan_export_regions_report():
+    """Test pixel counts of two distant fires."""
+    boxes = [[0, 0, 300, 300], [2_700, 2_700, 3_000, 3_000]]
+    planned, labels, report = regions.plan_export_regions(boxes, max_regions=2)
+
+    np.testing.assert_array_equal(planned, boxes)
+    np.testing.assert_array_equal(labels, [0, 1])
+    assert report == {
+        "bbox_pixels": 10_000,
+        "region_pixels": 200,
+        "pixels_saved": 9_800,
+    }
+
+
+@pytest.mark.parametrize("max_regions", [1, 2, 5])
+def test_plan_export_regions_max_regions(max_regions):
+    """Test that no more than the maximum number of regions are created."""
+    boxes = np.array([[i * 1_000, 0, i * 1_000 + 100, 100] for i in range(10)])
+    planned, labels, _ = regions.plan_export_regions(boxes, max_regions=max_regions)
+
+    assert len(planned) == max_regions
+    assert set(labels) == set(range(max_regions))
+
+
+def test_plan_export_regions_overlapping():
+    """Test that overlapping fires are merged when it adds no area."""
+    boxes = [[0, 0, 100, 100], [0, 0, 100, 100], [0, 50, 100, 150]]
+    planned, _, report = regions.plan_export_regions(boxes, max_regions=3)
+
+    np.testing.assert_array_equal(planned, [[0, 0, 100, 150]])
+    assert report["pixels_saved"] == 0
+
+
+def test_get_annual_mosaics():
+    """Test that tiles are mosaicked into one image per year."""
+    tiles = ee.ImageCollection([
+        ee.Image(1).set({"year": 2000, "system:time_start": 0}),
+        ee.Image(2).set({"year": 2000, "system:time_start": 0}),
+        ee.Image(3).set({"year": 2001, "system:time_start": 1}),
+    ])
+    mosaics = regions.get_annual_mosaics(tiles)
+
+    assert mosaics.aggregate_array("year").getInfo() == [2000, 2001]
+
+
+def test_get_export_regions_refreshed(monkeypatch):
+    """Test that regions are planned from the current fires, so that fires added to a
+    collection since the last run are covered, and that every fire is assigned to
+    exactly one region.
+    """
+    fires = {
+        "event_ids": ["a"],
+        "bounds": [[[0, 0], [3_000, 0], [3_000, 3_000], [0, 3_000], [0, 0]]],
+    }
+    monkeypatch.setattr(ee.data, "computeValue", lambda _: fires)
+    collection = ee.FeatureCollection("projects/pfh/assets/fires")
+
+    assert [ids for _, ids in regions.get_export_regions(collection)] == [["a"]]
+
+    fires = {
+        "event_ids": ["a", "b", "c"],
+        "bounds": [
+            *fires["bounds"],
+            [[900_000, 0], [903_000, 0], [903_000, 3_000], [900_000, 3_000]],
+            # Crosses into the region of "a", but is exported in its own region
+            [[2_000, 2_000], [6_000, 2_000], [6_000, 6_000], [2_000, 6_000]],
+        ],
+    }
+    assigned = [ids for _, ids in regions.get_export_regions(collection)]
+    assert sorted(assigned) == [["a"], ["b"], ["c"]]
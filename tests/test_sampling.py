@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from pfh import sampling
+from pfh.geotiff import GeoTIFF
+from tests.test_geotiff import write_tiff
+
+
+def test_to_export_crs_equal_area():
+    """Test that the projection origin is (0, 0) and that areas are preserved."""
+    assert sampling.to_export_crs(-96, 23) == pytest.approx((0, 0), abs=1e-6)
+
+    lon, lat = np.meshgrid(np.linspace(-125, -100, 6), np.linspace(30, 49, 5))
+    step = 1e-4
+    x, y = sampling.to_export_crs(lon, lat)
+    x_lon, y_lon = sampling.to_export_crs(lon + step, lat)
+    x_lat, y_lat = sampling.to_export_crs(lon, lat + step)
+    projected_area = np.abs((x_lon - x) * (y_lat - y) - (x_lat - x) * (y_lon - y))
+
+    # The area of a small cell on the GRS80 ellipsoid
+    a, f = 6_378_137, 1 / 298.257222101
+    e2 = 2 * f - f**2
+    phi = np.radians(lat)
+    area = a**2 * (1 - e2) * np.cos(phi) / (1 - e2 * np.sin(phi) ** 2) ** 2
+    np.testing.assert_allclose(projected_area, area * np.radians(step) ** 2, rtol=1e-6)
+
+
+def test_sample_plots(tmp_path):
+    """Test sampling a static map and annual maps, including plots outside of the maps
+    and in years without a map."""
+    image = np.arange(37 * 45, dtype=np.uint16).reshape(37, 45)
+    write_tiff(tmp_path / "static.tif", image)
+    write_tiff(tmp_path / "annual.tif", image * 2, tile_size=16)
+    # Projected points on pixel centers of the test images
+    x = 1000 + np.array([0.5, 10.5, 44.5, 60]) * 30
+    y = 2000 - np.array([0.5, 20.5, 36.5, 1]) * 30
+
+    features = [
+        {"geometry": {"type": "Point", "coordinates": [i, i]}, "properties": {"i": i}}
+        for i in range(4)
+    ]
+    path = tmp_path / "plots.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    plots = sampling.read_plots(path)
+    plots["x"], plots["y"], plots["year"] = x, y, [2000, 2000, 2001, 2000]
+
+    with (
+        GeoTIFF(tmp_path / "static.tif") as static,
+        GeoTIFF(tmp_path / "annual.tif") as annual,
+    ):
+        sampled = sampling.sample_plots(
+            plots,
+            {"static": static, "annual": {2000: [annual]}},
+            year_column="year",
+        )
+
+    assert sampled["i"].tolist() == [0, 1, 2, 3]
+    np.testing.assert_array_equal(
+        sampled["static"], [image[0, 0], image[20, 10], image[36, 44], np.nan]
+    )
+    np.testing.assert_array_equal(
+        sampled["annual"], [image[0, 0] * 2, image[20, 10] * 2, np.nan, np.nan]
+    )
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from pfh import snic
+
+
+@pytest.fixture
+def two_region_image():
+    """An image with two spectrally distinct halves and one masked pixel."""
+    rng = np.random.default_rng(0)
+    image = rng.normal(0, 1, size=(2, 40, 60))
+    image[:, :, 30:] += 100
+    image[0, 0, 0] = np.nan
+    return image
+
+
+def test_compute_snic(two_region_image):
+    """Test that clusters do not cross a strong spectral edge."""
+    labels = snic.compute_snic(two_region_image, size=5)
+
+    assert labels[0, 0] == -1
+    assert (labels[1:] >= 0).all()
+    assert not np.isin(labels[:, :30], labels[:, 30:]).any()
+
+
+def test_compute_cluster_medians():
+    """Test that cluster medians match NumPy medians, ignoring masked pixels."""
+    image = np.array([[[1, 2, 10], [3, 4, np.nan]]])
+    labels = np.array([[0, 0, 1], [0, 5, -1]])
+
+    smoothed = snic.compute_cluster_medians(image, labels)
+
+    np.testing.assert_array_equal(smoothed, [[[2, 2, 10], [2, 4, np.nan]]])
+
+
+@pytest.fixture
+def patchy_image():
+    """An image of spectrally distinct 8 x 8 patches, e.g. forest stands, with one
+    masked pixel. SNIC clusters don't cross patch edges, so no cluster is larger than
+    a patch.
+    """
+    rng = np.random.default_rng(0)
+    patches = rng.uniform(0, 100, size=(2, 8, 8))
+    image = patches.repeat(8, axis=1).repeat(8, axis=2)
+    image += rng.normal(0, 1, size=image.shape)
+    image[0, 0, 0] = np.nan
+    return image
+
+
+def test_compute_snic_tiled(patchy_image):
+    """Test that tiling with a halo smaller than the image matches untiled labels and
+    medians when clusters fit within the halo."""
+    kwargs = {"tile_size": 16, "neighborhoodSize": 8}
+
+    labels = snic.compute_snic(patchy_image)
+    tiled_labels = snic.compute_snic(patchy_image, **kwargs)
+    smoothed = snic.compute_snic_cluster(patchy_image, cluster_bands=[0, 1])
+    tiled = snic.compute_snic_cluster(patchy_image, cluster_bands=[0, 1], **kwargs)
+
+    np.testing.assert_array_equal(tiled_labels, labels)
+    np.testing.assert_array_equal(tiled, smoothed)
+    for label in np.unique(labels[labels >= 0]):
+        assert np.unique(smoothed[1][labels == label]).size == 1
@@ -0,0 +1,75 @@
+import ee
+import numpy as np
+import shapely
+
+from pfh import spatial
+
+
+def square(x: float, y: float, size: float) -> list[list[float]]:
+    """Build a closed ring for a square with a lower-left corner at x, y."""
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+
+
+def test_rasterize_polygons():
+    """Test that rasterized pixels match testing every pixel center in each polygon."""
+    polygons = np.array([
+        shapely.Polygon(square(0, 0, 100), [square(40, 40, 20)]),
+        shapely.MultiPolygon([
+            shapely.Polygon(square(50, 50, 30)),
+            shapely.Polygon([[-50, 90], [45, 130], [70, 95]]),
+        ]),
+        shapely.Polygon(square(500, 500, 10)),  # Off the grid
+        shapely.Polygon(square(12, 12, 1)),  # Between centers
+        shapely.Polygon(),
+    ])
+    shape, transform = (40, 30), (5, -20, 4, 120)
+
+    pixels, zones = spatial.rasterize_polygons(polygons, shape, transform)
+
+    rows, cols = np.indices(shape).reshape(2, -1)
+    x, y = -20 + (cols + 0.5) * 5, 120 - (rows + 0.5) * 4
+    expected = [
+        (pixel, zone)
+        for zone, polygon in enumerate(polygons)
+        for pixel in np.flatnonzero(shapely.contains_xy(polygon, x, y))
+    ]
+    assert sorted(zip(pixels, zones, strict=True)) == sorted(expected)
+    assert set(zones) == {0, 1}
+
+
+def test_difference_all():
+    """Test that differencing in a process pool matches removing the union of every
+    intersecting geometry from each geometry, one at a time.
+    """
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 1_000, (200, 2))
+    geometries = shapely.box(*corners.T, *(corners + 50).T)
+    # Disjoint grid cells, like dissolved unmanaged lands
+    cells = np.array([
+        shapely.Point(x, y).buffer(40) for x in range(0, 1_000, 100) for y in [250, 750]
+    ])
+
+    differences = spatial.difference_all(
+        geometries, cells, max_workers=2, chunk_size=16
+    )
+
+    expected = shapely.difference(geometries, shapely.union_all(cells))
+    assert len(differences) == len(geometries)
+    assert shapely.equals(differences, expected).all()
+    assert shapely.area(differences).sum() < shapely.area(geometries).sum()
+
+
+def test_get_centroids_refreshed(monkeypatch):
+    """Test that centroids are requested from the current features, rather than
+    cached.
+    """
+    centroids = [[0, 0], [1, 2]]
+    monkeypatch.setattr(ee.data, "computeValue", lambda _: centroids)
+    collection = ee.FeatureCollection("projects/pfh/assets/fires")
+
+    points = spatial.get_centroids(collection)
+    assert shapely.get_coordinates(points).tolist() == [[0, 0], [1, 2]]
+
+    centroids = [[3, 4]]
+    points = spatial.get_centroids(collection)
+    assert shapely.get_coordinates(points).tolist() == [[3, 4]]
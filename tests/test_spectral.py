@@ -1,4 +1,6 @@
 import ee
+import numpy as np
+import pytest
 
 from pfh import spectral
 
@@ -43,3 +45,82 @@ def test_classify_harvests():
     harvest = spectral.classify_harvests(image, bands=["SR_B3"], thresholds=[1000])
 
     assert "salvage_year" in harvest.bandNames().getInfo()
+
+
+def test_compute_otsu_thresholds():
+    """Test that batched Otsu thresholds match a brute-force search."""
+
+    def brute_force_threshold(counts, means):
+        total = counts.sum()
+        mean = (counts * means).sum() / total
+        best, best_bss = None, -1
+        for i in range(1, len(counts)):
+            a, b = counts[:i], counts[i:]
+            a_mean = (a * means[:i]).sum() / a.sum() if a.sum() else 0
+            b_mean = (b * means[i:]).sum() / b.sum() if b.sum() else 0
+            bss = a.sum() * (a_mean - mean) ** 2 + b.sum() * (b_mean - mean) ** 2
+            if bss >= best_bss:
+                best, best_bss = means[i - 1], bss
+        return best
+
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 100, size=(2, 3, 255))
+    means = np.sort(rng.normal(0, 1_000, size=(2, 3, 255)), axis=-1)
+
+    thresholds = spectral.compute_otsu_thresholds(counts, means)
+
+    assert thresholds.shape == (2, 3)
+    for idx in np.ndindex(2, 3):
+        expected = brute_force_threshold(counts[idx], means[idx])
+        assert thresholds[idx] == pytest.approx(expected)
+
+
+def test_compute_otsu_thresholds_bimodal():
+    """Test that the threshold separates a bimodal histogram."""
+    means = np.arange(10)
+    counts = np.array([0, 50, 100, 50, 0, 0, 50, 100, 50, 0])
+
+    assert 3 <= spectral.compute_otsu_thresholds(counts, means) < 6
+
+
+def test_compute_pif_match():
+    """Test that local PIF matching recovers a linear relationship between bands."""
+    rng = np.random.default_rng(0)
+    target = rng.normal(1_000, 200, size=(3, 40, 50))
+    source = (target - [[[10]], [[20]], [[30]]]) / [[[2]], [[3]], [[4]]]
+    # Simulate changed pixels that should be excluded from matching
+    source[:, :10] += 5_000
+
+    matched, pif_mask = spectral.compute_pif_match(source, target, percentile=50)
+
+    assert pif_mask.shape == (40, 50)
+    assert not pif_mask[:10].any()
+    np.testing.assert_allclose(matched[:, 10:], target[:, 10:])
+
+
+def test_compute_pif_match_empty():
+    """Test that matching without valid pixels leaves the source unchanged."""
+    source = np.ones((2, 5, 5))
+    target = np.full((2, 5, 5), np.nan)
+
+    matched, pif_mask = spectral.compute_pif_match(source, target)
+
+    assert not pif_mask.any()
+    np.testing.assert_array_equal(matched, source)
+
+
+def test_compute_pif_match_offset_only():
+    """Test that a band with a fitted offset but no scale keeps its offset, matching
+    the independent defaults of `pif_match`.
+    """
+    rng = np.random.default_rng(0)
+    target = rng.normal(1_000, 200, size=(2, 10, 10))
+    source = target / 2
+    # A constant source band can't be scaled, but still has a fitted offset
+    source[1] = 5
+    target[1] = 105
+
+    matched, _ = spectral.compute_pif_match(source, target, percentile=100)
+
+    np.testing.assert_allclose(matched[0], target[0])
+    np.testing.assert_allclose(matched[1], source[1] + 105)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pfh import store
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(0)
+    n = 1_000
+    return pd.DataFrame({
+        "system:index": [f"{i}_0" for i in range(n)],
+        "event_id": rng.choice(["CA01", "OR02", "WA03"], n),
+        "year": rng.choice([1986, 1990, 2017], n),
+        "owner": rng.choice(["usfs", "blm", "private"], n),
+        "severity": rng.choice(["Low", "High", "Very low"], n),
+        "timing": rng.integers(1, 6, n),
+        "harvest_area": rng.uniform(0, 100, n),
+        ".geo": '{"type":"MultiPoint","coordinates":[]}',
+    })
+
+
+def test_write_read_table(tmp_path, results):
+    """Test that a table round trips with typed and dictionary-encoded columns."""
+    categories = {"severity": ["Very low", "Low", "Moderate", "High"]}
+    store.write_table(results, tmp_path / "results", categories=categories)
+
+    table = store.read_table(tmp_path / "results")
+    expected = (
+        results.drop(columns=["system:index", ".geo"])
+        .sort_values("year", kind="stable")
+        .reset_index(drop=True)
+    )
+
+    assert list(table.columns) == ["year", *expected.columns.drop("year")]
+    assert table.timing.dtype == np.int8
+    assert table.severity.cat.ordered
+    assert list(table.severity.cat.categories) == categories["severity"]
+    assert list(table.owner.cat.categories) == ["blm", "private", "usfs"]
+    pd.testing.assert_frame_equal(
+        table[expected.columns].astype({c: object for c in ["event_id", "owner"]}),
+        expected.astype({"severity": table.severity.dtype}),
+        check_dtype=False,
+    )
+
+
+def test_read_table_selection(tmp_path, results):
+    """Test reading a subset of columns and partitions."""
+    path = tmp_path / "results"
+    store.write_table(results, path)
+
+    table = store.read_table(path, columns=["owner", "harvest_area"], partitions=[2017])
+
+    expected = results[results.year == 2017]
+    assert list(table.columns) == ["owner", "harvest_area"]
+    np.testing.assert_array_equal(table.harvest_area, expected.harvest_area)
+    np.testing.assert_array_equal(table.owner, expected.owner)
+
+    assert len(store.read_table(path, partitions=[])) == 0
+    with pytest.raises(KeyError, match="Unknown partitions"):
+        store.read_table(path, partitions=[2000])
+    with pytest.raises(KeyError, match="Unknown columns"):
+        store.read_table(path, columns=["missing"])
+
+
+def test_write_table_unknown_category(tmp_path, results):
+    with pytest.raises(ValueError, match="not in categories"):
+        store.write_table(results, tmp_path, categories={"severity": ["Low", "High"]})
@@ -0,0 +1,432 @@
+import asyncio
+import http.client
+import itertools
+import json
+import socket
+import time
+
+import ee
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from pfh.tasks import (
+    COMPLETED,
+    FAILED,
+    SKIPPED,
+    ExportJob,
+    is_transient,
+    run_exports,
+    submit_jobs,
+    watch_tasks,
+)
+
+
+class FakeTaskService:
+    """An in-process task service where each task runs for a fixed number of polls.
+
+    Submissions take `latency` seconds, and the first `flaky` submission attempts of
+    each job raise a transient error.
+    """
+
+    def __init__(self, polls=1, fail=(), latency=0, flaky=0):
+        self.polls = polls
+        self.fail = set(fail)
+        self.latency = latency
+        self.flaky = flaky
+        self.attempts = {}
+        self.ids = itertools.count()
+        self.tasks = {}
+        self.submitted = []
+        self.max_running = 0
+
+    def submit(self, job):
+        job.build()
+        time.sleep(self.latency)
+        self.attempts[job.name] = self.attempts.get(job.name, 0) + 1
+        if self.attempts[job.name] <= self.flaky:
+            raise ee.EEException("Too many concurrent requests.")
+
+        task_id = f"task_{next(self.ids)}"
+        self.tasks[task_id] = {"name": job.name, "polls": 0}
+        self.submitted.append(job.name)
+        return task_id
+
+    def get_states(self, task_ids):
+        self.max_running = max(self.max_running, len(task_ids))
+        states = {}
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if task is None:
+                states[task_id] = "UNKNOWN"
+                continue
+            task["polls"] += 1
+            if task["polls"] < self.polls:
+                states[task_id] = "RUNNING"
+            elif task["name"] in self.fail:
+                states[task_id] = FAILED
+            else:
+                states[task_id] = COMPLETED
+        return states
+
+
+async def no_sleep(seconds):
+    """Skip waiting between status checks."""
+
+
+def get_jobs():
+    """Get a small pipeline of per-year maxdiff and harvest jobs."""
+    return [
+        ExportJob("maxdiff_2000", lambda: None),
+        ExportJob("maxdiff_2001", lambda: None),
+        ExportJob("thresholds", lambda: None, ["maxdiff_2000", "maxdiff_2001"]),
+        ExportJob("harvest_2000", lambda: None, ["thresholds", "maxdiff_2000"]),
+        ExportJob("harvest_2001", lambda: None, ["thresholds", "maxdiff_2001"]),
+    ]
+
+
+def test_run_exports_in_dependency_order():
+    """Test that jobs are only submitted after their dependencies complete."""
+    service = FakeTaskService(polls=2)
+    states = run_exports(get_jobs(), service=service, sleep=no_sleep)
+
+    assert set(states.values()) == {COMPLETED}
+    order = service.submitted
+    assert order.index("thresholds") > order.index("maxdiff_2001")
+    assert order.index("harvest_2000") > order.index("thresholds")
+
+
+def test_run_exports_max_concurrent():
+    """Test that no more than the maximum number of tasks run at once."""
+    jobs = [ExportJob(f"job_{i}", lambda: None) for i in range(10)]
+    service = FakeTaskService(polls=3)
+    states = run_exports(jobs, service=service, max_concurrent=3, sleep=no_sleep)
+
+    assert len(states) == 10
+    assert service.max_running == 3
+
+
+def test_run_exports_skips_failed_dependents():
+    """Test that jobs depending on a failed job are skipped and others complete."""
+    service = FakeTaskService(fail=["maxdiff_2001"])
+    states = run_exports(get_jobs(), service=service, sleep=no_sleep)
+
+    assert states["maxdiff_2000"] == COMPLETED
+    assert states["maxdiff_2001"] == FAILED
+    assert states["thresholds"] == SKIPPED
+    assert states["harvest_2000"] == SKIPPED
+    assert "harvest_2000" not in service.submitted
+
+
+def test_run_exports_backoff():
+    """Test that polling backs off while tasks run and resets after changes."""
+    waits = []
+
+    async def record_wait(seconds):
+        waits.append(seconds)
+
+    service = FakeTaskService(polls=5)
+    run_exports(
+        [ExportJob("a", lambda: None), ExportJob("b", lambda: None, ["a"])],
+        service=service,
+        poll_interval=1,
+        max_poll_interval=4,
+        sleep=record_wait,
+    )
+
+    # States are first checked immediately, and "a" completing starts "b"
+    assert waits == [1, 2, 4, 4, 1, 1, 2, 4, 4]
+
+
+def test_run_exports_resume(tmp_path):
+    """Test that a previous run's tasks are resumed rather than resubmitted, except
+    for failed tasks.
+    """
+    state_path = tmp_path / "state.json"
+    service = FakeTaskService(fail=["maxdiff_2001"])
+    run_exports(get_jobs(), service=service, state_path=state_path, sleep=no_sleep)
+    saved = json.loads(state_path.read_text())
+    assert saved["maxdiff_2000"]["state"] == COMPLETED
+
+    service.fail.clear()
+    service.submitted.clear()
+    states = run_exports(
+        get_jobs(), service=service, state_path=state_path, sleep=no_sleep
+    )
+
+    assert set(states.values()) == {COMPLETED}
+    assert "maxdiff_2000" not in service.submitted
+    assert service.submitted[0] == "maxdiff_2001"
+
+
+def test_run_exports_shared_state(tmp_path):
+    """Test that runs of different jobs sharing a state file keep each other's
+    tasks.
+    """
+    state_path = tmp_path / "state.json"
+    service = FakeTaskService()
+    first = [ExportJob("maxdiff_2000", lambda: None)]
+    second = [ExportJob("harvest_2000", lambda: None)]
+    run_exports(first, service=service, state_path=state_path, sleep=no_sleep)
+    run_exports(second, service=service, state_path=state_path, sleep=no_sleep)
+
+    assert set(json.loads(state_path.read_text())) == {"maxdiff_2000", "harvest_2000"}
+    run_exports(first, service=service, state_path=state_path, sleep=no_sleep)
+    assert service.submitted == ["maxdiff_2000", "harvest_2000"]
+
+
+def test_run_exports_saves_started_tasks_on_error(tmp_path):
+    """Test that tasks started alongside a job that raises an error are saved, so that
+    they aren't resubmitted.
+    """
+
+    def build():
+        raise ValueError("Invalid export.")
+
+    state_path = tmp_path / "state.json"
+    service = FakeTaskService(latency=0.05)
+    with pytest.raises(ValueError, match="Invalid export"):
+        run_exports(
+            [ExportJob("a", lambda: None), ExportJob("b", build)],
+            service=service,
+            state_path=state_path,
+            rate_limit=1_000,
+        )
+
+    assert service.submitted == ["a"]
+    saved = json.loads(state_path.read_text())
+    assert saved == {"a": {"id": "task_0", "state": "READY"}}
+
+
+def test_run_exports_resume_running(tmp_path):
+    """Test that tasks that were running when a run was interrupted are polled."""
+    state_path = tmp_path / "state.json"
+    service = FakeTaskService()
+    task_id = service.submit(ExportJob("a", lambda: None))
+    state_path.write_text(json.dumps({"a": {"id": task_id, "state": "RUNNING"}}))
+
+    states = run_exports(
+        [ExportJob("a", lambda: None)],
+        service=service,
+        state_path=state_path,
+        sleep=no_sleep,
+    )
+
+    assert states == {"a": COMPLETED}
+    assert service.submitted == ["a"]
+
+
+def test_run_exports_resume_unknown(tmp_path):
+    """Test that resumed tasks the service doesn't recognize fail, and are
+    resubmitted by the next run.
+    """
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"a": {"id": "expired", "state": "RUNNING"}}))
+    jobs = [ExportJob("a", lambda: None), ExportJob("b", lambda: None, ["a"])]
+    service = FakeTaskService()
+
+    states = run_exports(jobs, service=service, state_path=state_path, sleep=no_sleep)
+    assert states == {"a": FAILED, "b": SKIPPED}
+    assert not service.submitted
+
+    states = run_exports(jobs, service=service, state_path=state_path, sleep=no_sleep)
+    assert states == {"a": COMPLETED, "b": COMPLETED}
+
+
+@pytest.mark.parametrize(
+    "jobs",
+    [
+        [ExportJob("a", lambda: None, ["missing"])],
+        [ExportJob("a", lambda: None, ["b"]), ExportJob("b", lambda: None, ["a"])],
+    ],
+    ids=["missing", "cycle"],
+)
+def test_run_exports_invalid_dependencies(jobs):
+    """Test that unknown or circular dependencies raise before any submission."""
+    service = FakeTaskService()
+    with pytest.raises(ValueError, match="depend"):
+        run_exports(jobs, service=service)
+
+    assert not service.submitted
+
+
+def test_submit_jobs_concurrent():
+    """Test that jobs are submitted concurrently rather than one at a time."""
+    jobs = [ExportJob(f"maxdiff_{year}", lambda: None) for year in range(1986, 2018)]
+    service = FakeTaskService(latency=0.05)
+
+    start = time.perf_counter()
+    task_ids = asyncio.run(
+        submit_jobs(jobs, service=service, max_concurrent=8, rate_limit=1_000)
+    )
+    elapsed = time.perf_counter() - start
+
+    assert len(set(task_ids.values())) == len(jobs)
+    # Submitting one at a time would take 1.6 seconds
+    assert elapsed < 0.8
+
+
+def test_submit_jobs_rate_limit():
+    """Test that submissions are started no faster than the rate limit."""
+    jobs = [ExportJob(f"job_{i}", lambda: None) for i in range(6)]
+    service = FakeTaskService()
+
+    start = time.perf_counter()
+    asyncio.run(submit_jobs(jobs, service=service, rate_limit=20))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 5 / 20 * 0.9
+
+
+@pytest.mark.parametrize(("flaky", "submitted"), [(2, True), (4, False)])
+def test_submit_jobs_retries(flaky, submitted):
+    """Test that transient errors are retried up to the retry limit."""
+    service = FakeTaskService(flaky=flaky)
+    task_ids = asyncio.run(
+        submit_jobs(
+            [ExportJob("a", lambda: None)],
+            service=service,
+            retries=3,
+            retry_delay=0.001,
+        )
+    )
+
+    assert (task_ids["a"] is not None) == submitted
+    assert service.attempts["a"] == min(flaky + 1, 4)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ValueError("Invalid export."),
+        ee.EEException("Asset 'a' not found."),
+        FileNotFoundError("inputs.json"),
+    ],
+    ids=["python", "earth_engine", "local_file"],
+)
+def test_submit_jobs_raises_other_errors(error):
+    """Test that errors that aren't transient are raised rather than retried."""
+    builds = []
+
+    def build():
+        builds.append(None)
+        raise error
+
+    with pytest.raises(type(error), match=str(error)):
+        asyncio.run(submit_jobs([ExportJob("a", build)], service=FakeTaskService()))
+    assert len(builds) == 1
+
+
+def http_error(status: int, message: str) -> ee.EEException:
+    """Raise an HTTP error as Earth Engine does, keeping the original as context."""
+    try:
+        try:
+            raise HttpError(httplib2.Response({"status": status}), b"")
+        except HttpError:
+            # Earth Engine raises without `from`, so the HTTP error is only the context
+            raise ee.EEException(message)  # noqa: B904
+    except ee.EEException as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    ("error", "transient"),
+    [
+        (http_error(429, "Too many concurrent aggregations."), True),
+        (http_error(503, "The service is currently unavailable."), True),
+        (http_error(400, "Asset 'a' not found."), False),
+        (http_error(403, "Quota exceeded for 429 exports."), False),
+        (ee.EEException("Computation timed out: deadline exceeded."), True),
+        (ee.EEException("Too many tasks already in the queue (3000)."), True),
+        (ee.EEException("Image.select: Band 'x' not found."), False),
+        (ConnectionResetError(), True),
+        (TimeoutError(), True),
+        (socket.gaierror(), True),
+        (http.client.IncompleteRead(b""), True),
+        (FileNotFoundError("inputs.json"), False),
+        (PermissionError("inputs.json"), False),
+        (ValueError("Invalid export."), False),
+    ],
+)
+def test_is_transient(error, transient):
+    """Test that only rate limits, server errors, deadlines, and connection errors are
+    retried, using the HTTP status when it is known.
+    """
+    assert is_transient(error) == transient
+
+
+def test_watch_tasks():
+    """Test that state changes are streamed until all tasks finish."""
+    service = FakeTaskService(polls=3, fail=["b"])
+    task_ids = [service.submit(ExportJob(name, lambda: None)) for name in "ab"]
+
+    async def watch():
+        return [
+            update
+            async for update in watch_tasks(
+                task_ids, service=service, poll_interval=0.001
+            )
+        ]
+
+    updates = asyncio.run(watch())
+    assert updates == [
+        ("task_0", "RUNNING"),
+        ("task_1", "RUNNING"),
+        ("task_0", COMPLETED),
+        ("task_1", FAILED),
+    ]
+
+
+def test_run_exports_in_running_loop():
+    """Test that exports can be run from a running event loop, e.g. in Jupyter."""
+
+    async def run():
+        return run_exports(
+            [ExportJob("a", lambda: None), ExportJob("b", lambda: None, ["a"])],
+            service=FakeTaskService(),
+            sleep=no_sleep,
+        )
+
+    assert asyncio.run(run()) == {"a": COMPLETED, "b": COMPLETED}
+
+
+def test_watch_tasks_send():
+    """Test that task IDs sent to the watcher are watched until they finish."""
+    service = FakeTaskService(polls=2)
+    first = service.submit(ExportJob("a", lambda: None))
+
+    async def watch():
+        updates = []
+        watcher = watch_tasks([first], service=service, sleep=no_sleep)
+        started = None
+        while True:
+            try:
+                update = await watcher.asend(started)
+            except StopAsyncIteration:
+                return updates
+            updates.append(update)
+            # Start another task once the first completes
+            if update == (first, COMPLETED):
+                started = [service.submit(ExportJob("b", lambda: None))]
+            else:
+                started = None
+
+    assert asyncio.run(watch()) == [
+        ("task_0", "RUNNING"),
+        ("task_0", COMPLETED),
+        ("task_1", "RUNNING"),
+        ("task_1", COMPLETED),
+    ]
+
+
+def test_run_exports_submission_failure():
+    """Test that jobs that can't be submitted fail and their dependents are skipped."""
+    service = FakeTaskService(flaky=10)
+    states = run_exports(
+        [ExportJob("a", lambda: None), ExportJob("b", lambda: None, ["a"])],
+        service=service,
+        sleep=no_sleep,
+        retry_delay=0.001,
+    )
+
+    assert states == {"a": FAILED, "b": SKIPPED}
@@ -1,5 +1,8 @@
 import ee
+import numpy as np
+import pandas as pd
 import pytest
+import shapely
 
 from pfh import utils
 
@@ -21,3 +24,196 @@ def test_percent_forest():
     pct_forest = utils.calculate_percent_forest(fire).getInfo()
 
     assert pct_forest == pytest.approx(89.13, 0.1)
+
+
+def test_calculate_zonal_means():
+    """Test that batched percent forest matches reducing each fire separately."""
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fires = mtbs.filter(
+        ee.Filter.inList("Event_ID", ["CA3785712008620130817", "OR4236212395219870830"])
+    )
+    batched = utils.calculate_zonal_means(fires, utils.get_forest_cover)
+    separate = fires.map(
+        lambda fire: fire.set("percent_forest", utils.calculate_percent_forest(fire))
+    )
+
+    def get_percent_forest(fires: ee.FeatureCollection) -> list[float]:
+        return fires.sort("Event_ID").aggregate_array("percent_forest").getInfo()
+
+    assert get_percent_forest(batched) == pytest.approx(
+        get_percent_forest(separate), abs=0.5
+    )
+
+
+def test_compute_zonal_means():
+    """Test that zonal means of overlapping zones match averaging each zone."""
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 1, (2, 20, 30))
+    values[0, :5] = np.nan
+    pixels = np.concatenate([np.arange(0, 200), np.arange(100, 600), [0]])
+    zones = np.repeat([0, 1, 3], [200, 500, 1])
+
+    means = utils.compute_zonal_means(values, pixels, zones, 4)
+
+    flat = values.reshape(2, -1)
+    expected = [
+        [np.nanmean(band[pixels[zones == zone]]) for zone in range(2)] for band in flat
+    ]
+    np.testing.assert_allclose(means[:, :2], expected)
+    # Zones with no pixels or only NaN pixels are NaN
+    np.testing.assert_array_equal(
+        means[:, 2:], [[np.nan, np.nan], [np.nan, flat[1, 0]]]
+    )
+    np.testing.assert_allclose(
+        utils.compute_zonal_means(values[1], pixels, zones, 4), means[1]
+    )
+
+
+def iterative_severity_metric(histogram, n_pixels):
+    """A port of the original iterative severity metric, for parity testing."""
+    total, count = 0, 0
+    for bin_count in histogram:
+        total += (count / n_pixels) / len(histogram)
+        count += bin_count
+    return 1 - total
+
+
+def test_compute_severity_metrics():
+    """Test that batched severity metrics match the iterative calculation."""
+    rng = np.random.default_rng(0)
+    histograms = rng.integers(0, 50, size=(10, utils.SEVERITY_METRIC_BINS))
+    # Include pixels that fall outside of the histogram range
+    n_pixels = histograms.sum(axis=-1) + 100
+
+    metrics = utils.compute_severity_metrics(histograms, n_pixels)
+
+    expected = [
+        iterative_severity_metric(h, n)
+        for h, n in zip(histograms, n_pixels, strict=True)
+    ]
+    assert metrics == pytest.approx(expected)
+
+
+def test_compute_severity_metrics_empty():
+    """Test that fires without pixels return a metric of 1, matching Earth Engine."""
+    histograms = np.zeros((2, utils.SEVERITY_METRIC_BINS))
+    assert utils.compute_severity_metrics(histograms).tolist() == [1, 1]
+
+
+def test_severity_metric_parity():
+    """Test that the Earth Engine severity metric matches the iterative calculation."""
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fire = mtbs.filter(ee.Filter.eq("Event_ID", "CA3785712008620130817")).first()
+    dnbr = ee.Image.random(0).multiply(1_000).int().rename("dnbr")
+
+    metric = utils.calculate_severity_metric(dnbr, fire).getInfo()
+    stats = dnbr.reduceRegion(
+        reducer=ee.Reducer.fixedHistogram(-200, 1201, utils.SEVERITY_METRIC_BINS),
+        geometry=fire.geometry(),
+        scale=30,
+    ).getInfo()
+    counts = np.array(stats["dnbr"])[:, 1]
+
+    assert metric == pytest.approx(iterative_severity_metric(counts, counts.sum()))
+
+
+def test_compute_reburn_index():
+    """Test that reburns must overlap, or fall within the tolerance, and ignite within
+    n years after the fire.
+    """
+    polygons = shapely.polygons([
+        [[0, 0], [10, 0], [10, 10], [0, 10]],
+        [[5, 5], [15, 5], [15, 15], [5, 15]],
+        [[2, 2], [4, 2], [4, 4], [2, 4]],
+        [[50, 50], [60, 50], [60, 60], [50, 60]],
+        # One unit away from the first fire
+        [[11, 0], [12, 0], [12, 1], [11, 1]],
+    ])
+    dates = np.array(
+        ["2000-08-01", "2005-12-31", "2006-01-01", "2001-01-01", "2003-01-01"],
+        dtype="datetime64[ms]",
+    ).astype(np.int64)
+
+    fire, reburn = utils.compute_reburn_index(dates, polygons, years=5)
+    assert sorted(zip(fire, reburn, strict=True)) == [(0, 1)]
+
+    fire, reburn = utils.compute_reburn_index(dates, polygons, years=6)
+    assert sorted(zip(fire, reburn, strict=True)) == [(0, 1), (0, 2)]
+
+    fire, reburn = utils.compute_reburn_index(dates, polygons, years=5, tolerance=2)
+    assert sorted(zip(fire, reburn, strict=True)) == [(0, 1), (0, 4), (1, 2)]
+
+
+def test_generate_reburn_mask_index():
+    """Test that reburn masks from a precomputed index match searching MTBS."""
+    mtbs = ee.FeatureCollection("USFS/GTAC/MTBS/burned_area_boundaries/v1")
+    fire = mtbs.filter(ee.Filter.eq("Event_ID", "CA3785712008620130817")).first()
+    nearby = mtbs.filterBounds(fire.geometry()).filter(
+        ee.Filter.gte("Ig_Date", fire.get("Ig_Date"))
+    )
+    reburns = utils.get_reburn_index(nearby)["CA3785712008620130817"]
+
+    def reburn_area(fire: ee.Feature) -> float:
+        mask = utils.generate_reburn_mask(fire)
+        return utils.get_pixel_area(mask.selfMask(), fire).getInfo()
+
+    indexed = ee.Feature(fire).set("reburns", reburns)
+    assert reburn_area(indexed) == pytest.approx(reburn_area(ee.Feature(fire)))
+
+
+def test_compute_patch_areas():
+    """Test that tiled patch labeling matches untiled labeling."""
+    rng = np.random.default_rng(0)
+    image = rng.choice([0, 1, 2, 3], p=[0.5, 0.2, 0.2, 0.1], size=(97, 83))
+
+    for eight_connected in [True, False]:
+        untiled = utils.compute_patch_areas(
+            image, classes=(1, 2), eight_connected=eight_connected, tile_size=1_000
+        )
+        tiled = utils.compute_patch_areas(
+            image, classes=(1, 2), eight_connected=eight_connected, tile_size=16
+        )
+
+        assert set(untiled.label) == {1, 2}
+        assert untiled.area.sum() == pytest.approx(np.isin(image, (1, 2)).sum() * 0.09)
+        pd.testing.assert_frame_equal(
+            tiled.sort_values(["label", "area"], ignore_index=True),
+            untiled.sort_values(["label", "area"], ignore_index=True),
+        )
+
+
+def test_compute_patch_areas_connectivity():
+    """Test that diagonal pixels are only joined with 8-connectivity, including across
+    tile corners."""
+    image = np.array([
+        [1, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 1, 0],
+        [0, 0, 0, 2],
+    ])
+
+    eight = utils.compute_patch_areas(image, classes=(1, 2), tile_size=2)
+    four = utils.compute_patch_areas(
+        image, classes=(1, 2), eight_connected=False, tile_size=2
+    )
+
+    assert sorted(eight.area.round(2)) == [0.09, 0.27]
+    assert sorted(four.area.round(2)) == [0.09] * 4
+
+
+def test_compute_stratified_areas():
+    """Test that stratified areas match areas calculated one stratum at a time."""
+    rng = np.random.default_rng(0)
+    owner = rng.integers(0, 3, size=(50, 60))
+    severity = rng.integers(0, 4, size=(50, 60))
+    timing = rng.integers(0, 6, size=(50, 60))
+    mask = rng.random((50, 60)) > 0.3
+
+    areas = utils.compute_stratified_areas(
+        [owner, severity, timing], [3, 4, 6], mask=mask
+    )
+
+    assert areas.shape == (3, 4, 6)
+    for o, s, t in np.ndindex(3, 4, 6):
+        stratum = (owner == o) & (severity == s) & (timing == t) & mask
+        assert areas[o, s, t] == pytest.approx(stratum.sum() * 0.09)